@@ -1,21 +1,26 @@
-import ccxt
+import asyncio
+
+from ticker_service import TickerService, format_spread
+
 
 def fetch_ticker_price(exchange_name, symbol):
-    try:
-        exchange_class = getattr(ccxt, exchange_name)
-        exchange = exchange_class()
-        ticker = exchange.fetch_ticker(symbol)
-        print(f"{exchange_name} {symbol} latest price: {ticker['last']}")
-        return ticker['last']
-    except Exception as e:
-        print(f"Failed to fetch {symbol} price from {exchange_name}: {e}")
-        return None
+    async def fetch():
+        async with TickerService([exchange_name]) as service:
+            return (await service.prices([symbol]))[symbol].get(exchange_name)
+
+    price = asyncio.run(fetch())
+    if price is not None:
+        print(f"{exchange_name} {symbol} latest price: {price}")
+    return price
+
+
+async def main(symbols):
+    async with TickerService(["binance", "okx"]) as service:
+        print(format_spread(await service.spread(symbols)))
+
 
 if __name__ == "__main__":
     symbol = "BTC/USDT"
 
-    print("Fetching Binance BTC/USDT price...")
-    binance_price = fetch_ticker_price("binance", symbol)
-
-    print("\nFetching OKX BTC/USDT price...")
-    okx_price = fetch_ticker_price("okx", symbol)
+    print("Fetching Binance and OKX BTC/USDT prices...")
+    asyncio.run(main([symbol]))
@@ -0,0 +1,165 @@
+"""
+TickerService against a local aiohttp app standing in for binance and okx
+(markets and ticker endpoints only, clients pointed at it through ccxt's `urls`).
+
+    python -m pytest mytest/test_ticker_service.py
+"""
+import asyncio
+import logging
+import time
+from collections import Counter
+
+from aiohttp import web
+
+from ticker_service import TickerService
+
+# exchange -> {symbol: last price}; a symbol missing here isn't listed, None fails with a 500
+PRICES = {
+    "binance": {"BTC/USDT": 100.5, "ETH/USDT": 2000.0, "SOL/USDT": None},
+    "okx": {"BTC/USDT": 101.0, "ETH/USDT": 1990.0},
+}
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def _binance_symbol(symbol):
+    base, quote = symbol.split("/")
+    return {"symbol": base + quote, "status": "TRADING", "baseAsset": base, "quoteAsset": quote,
+            "baseAssetPrecision": 8, "quoteAssetPrecision": 8, "orderTypes": ["LIMIT", "MARKET"],
+            "isSpotTradingAllowed": True, "isMarginTradingAllowed": False, "permissions": ["SPOT"],
+            "filters": [{"filterType": "PRICE_FILTER", "minPrice": "0.01", "maxPrice": "1000000", "tickSize": "0.01"},
+                        {"filterType": "LOT_SIZE", "minQty": "0.0001", "maxQty": "9000", "stepSize": "0.0001"}]}
+
+
+def _okx_instrument(symbol):
+    base, quote = symbol.split("/")
+    return {"instType": "SPOT", "instId": f"{base}-{quote}", "baseCcy": base, "quoteCcy": quote, "state": "live",
+            "tickSz": "0.1", "lotSz": "0.0001", "minSz": "0.0001", "listTime": "1600000000000"}
+
+
+class FakeExchanges:
+    """aiohttp app with binance's and okx's spot markets / ticker endpoints, counting requests."""
+
+    def __init__(self, prices=PRICES):
+        self.prices = prices
+        self.requests = Counter()
+        self.app = web.Application()
+        self.app.router.add_get("/binance/api/v3/exchangeInfo", self.binance_markets)
+        self.app.router.add_get("/binance/api/v3/ticker/24hr", self.binance_ticker)
+        self.app.router.add_get("/okx/api/v5/public/instruments", self.okx_markets)
+        self.app.router.add_get("/okx/api/v5/market/ticker", self.okx_ticker)
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def options(self):
+        """TickerService options pointing both clients at this app."""
+        spot = {"fetchMarkets": {"types": ["spot"]}}
+        return {"binance": {"urls": {"api": {"public": f"{self.url}/binance/api/v3"}}, "options": spot},
+                "okx": {"urls": {"api": {"rest": f"{self.url}/okx"}}, "options": spot}}
+
+    def _last(self, name, symbol):
+        self.requests[name, "ticker"] += 1
+        last = self.prices[name][symbol]
+        if last is None:
+            raise web.HTTPInternalServerError()
+        return str(last)
+
+    async def binance_markets(self, request):
+        self.requests["binance", "markets"] += 1
+        return web.json_response({"timezone": "UTC", "serverTime": _now_ms(),
+                                  "symbols": [_binance_symbol(s) for s in self.prices["binance"]]})
+
+    async def binance_ticker(self, request):
+        symbol = next(s for s in self.prices["binance"] if s.replace("/", "") == request.query["symbol"])
+        return web.json_response({"symbol": request.query["symbol"], "lastPrice": self._last("binance", symbol),
+                                  "closeTime": _now_ms()})
+
+    async def okx_markets(self, request):
+        self.requests["okx", "markets"] += 1
+        return web.json_response({"code": "0", "msg": "",
+                                  "data": [_okx_instrument(s) for s in self.prices["okx"]]})
+
+    async def okx_ticker(self, request):
+        symbol = request.query["instId"].replace("-", "/")
+        return web.json_response({"code": "0", "msg": "", "data": [
+            {"instType": "SPOT", "instId": request.query["instId"], "last": self._last("okx", symbol),
+             "ts": str(_now_ms())}]})
+
+
+def run(test):
+    """Run `await test(service, fake)` with a TickerService on a fresh FakeExchanges."""
+    async def main():
+        fake = FakeExchanges()
+        await fake.start()
+        try:
+            async with TickerService(["binance", "okx"], fake.options()) as service:
+                return await test(service, fake)
+        finally:
+            await fake.stop()
+
+    return asyncio.run(main())
+
+
+def test_markets_loaded_once_per_exchange():
+    async def test(service, fake):
+        # concurrent first calls share one load_markets, later calls reuse it
+        await asyncio.gather(service.prices(["BTC/USDT", "ETH/USDT"]), service.prices(["BTC/USDT"]))
+        await service.prices(["ETH/USDT"])
+        return fake.requests
+
+    requests = run(test)
+    assert requests["binance", "markets"] == 1
+    assert requests["okx", "markets"] == 1
+    assert requests["binance", "ticker"] == 4
+    assert requests["okx", "ticker"] == 4
+
+
+def test_unlisted_symbol_is_none_without_request():
+    async def test(service, fake):
+        return await service.tickers(["SOL/USDT", "XRP/USDT"]), fake.requests
+
+    tickers, requests = run(test)
+    assert tickers["okx"] == {"SOL/USDT": None, "XRP/USDT": None}
+    assert tickers["binance"]["XRP/USDT"] is None
+    assert requests["okx", "ticker"] == 0
+
+
+def test_failed_ticker_is_none_and_logged(caplog):
+    async def test(service, fake):
+        return await service.ticker("binance", "SOL/USDT")
+
+    with caplog.at_level(logging.WARNING, logger="ticker_service"):
+        assert run(test) is None
+    assert "Failed to fetch SOL/USDT price from binance" in caplog.text
+
+
+def test_spread():
+    async def test(service, fake):
+        return await service.spread(["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT"])
+
+    spreads = run(test)
+    btc = spreads["BTC/USDT"]
+    assert btc["prices"] == {"binance": 100.5, "okx": 101.0}
+    assert btc["low"] == ("binance", 100.5)
+    assert btc["high"] == ("okx", 101.0)
+    assert btc["spread"] == (101.0 - 100.5) / 100.5
+    eth = spreads["ETH/USDT"]
+    assert eth["low"] == ("okx", 1990.0)
+    assert eth["high"] == ("binance", 2000.0)
+    assert eth["spread"] == (2000.0 - 1990.0) / 1990.0
+    # failed on binance, not listed on okx / listed nowhere: no price, no spread
+    for symbol in ("SOL/USDT", "XRP/USDT"):
+        assert spreads[symbol]["prices"] == {}
+        assert spreads[symbol]["low"] is spreads[symbol]["high"] is spreads[symbol]["spread"] is None
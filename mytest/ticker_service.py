@@ -0,0 +1,154 @@
+"""
+Ticker prices from several exchanges at once.
+
+ccxt_test.py created a new synchronous ccxt exchange per price and asked
+binance, then okx. TickerService keeps one async ccxt client per exchange
+(markets loaded once, http session reused) and fetches every symbol on every
+exchange concurrently. Each client throttles itself with ccxt's rate limiter,
+and at most `concurrency` requests per exchange are in flight.
+
+    async with TickerService(["binance", "okx"]) as service:
+        prices = await service.prices(["BTC/USDT", "ETH/USDT"])   # {symbol: {exchange: last}}
+        spreads = await service.spread(["BTC/USDT", "ETH/USDT"])
+
+    python ticker_service.py BTC/USDT ETH/USDT
+    python ticker_service.py BTC/USDT --exchanges binance okx bybit --proxy http://127.0.0.1:10808
+
+`options` per exchange go to the ccxt constructor (proxies, `urls` to point a
+client at another host, ...).
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import ccxt.async_support as ccxt_async
+
+logger = logging.getLogger(__name__)
+
+EXCHANGES = ("binance", "okx")
+CONCURRENCY = 5
+
+
+class TickerService:
+    def __init__(self, exchanges=EXCHANGES, options=None, concurrency=CONCURRENCY):
+        self.exchanges = list(exchanges)
+        self.options = options or {}
+        self.concurrency = concurrency
+        self._clients = {}
+        self._limits = {}
+        self._markets = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        clients, self._clients = self._clients, {}
+        self._markets.clear()
+        await asyncio.gather(*(client.close() for client in clients.values()), return_exceptions=True)
+
+    async def client(self, name):
+        """Pooled client of exchange `name` with its markets loaded."""
+        client = self._clients.get(name)
+        if client is None:
+            options = {"enableRateLimit": True, **self.options.get(name, {})}
+            client = self._clients[name] = getattr(ccxt_async, name)(options)
+            self._limits[name] = asyncio.Semaphore(self.concurrency)
+        if name not in self._markets:
+            # concurrent first calls share one load_markets
+            self._markets[name] = asyncio.ensure_future(client.load_markets())
+        markets = self._markets[name]
+        try:
+            await asyncio.shield(markets)
+        except Exception:
+            # load again on the next call
+            if self._markets.get(name) is markets:
+                del self._markets[name]
+            raise
+        return client
+
+    async def ticker(self, name, symbol):
+        """ccxt ticker of `symbol` on `name`, None if the exchange doesn't list it or fails."""
+        try:
+            client = await self.client(name)
+            if symbol not in client.markets:
+                return None
+            async with self._limits[name]:
+                return await client.fetch_ticker(symbol)
+        except ccxt_async.BaseError as e:
+            logger.warning(f"Failed to fetch {symbol} price from {name}: {e.__class__.__name__} {e}")
+            return None
+
+    async def tickers(self, symbols, exchanges=None):
+        """{exchange: {symbol: ticker or None}} for every exchange and symbol, all requests in parallel."""
+        exchanges = list(exchanges or self.exchanges)
+        jobs = [(name, symbol) for name in exchanges for symbol in symbols]
+        results = await asyncio.gather(*(self.ticker(name, symbol) for name, symbol in jobs))
+        out = {name: {} for name in exchanges}
+        for (name, symbol), ticker in zip(jobs, results):
+            out[name][symbol] = ticker
+        return out
+
+    async def prices(self, symbols, exchanges=None):
+        """{symbol: {exchange: last price}} - exchanges without a price are left out."""
+        tickers = await self.tickers(symbols, exchanges)
+        out = {symbol: {} for symbol in symbols}
+        for name, by_symbol in tickers.items():
+            for symbol, ticker in by_symbol.items():
+                if ticker and ticker.get("last") is not None:
+                    out[symbol][name] = ticker["last"]
+        return out
+
+    async def spread(self, symbols, exchanges=None):
+        """
+        Cross-exchange snapshot per symbol.
+        :return: {symbol: {"prices", "low": (exchange, price), "high": (exchange, price),
+                           "spread": (high - low) / low, "time": unix seconds}}
+        """
+        fetched_at = time.time()
+        out = {}
+        for symbol, by_exchange in (await self.prices(symbols, exchanges)).items():
+            entry = {"prices": by_exchange, "low": None, "high": None, "spread": None, "time": fetched_at}
+            if by_exchange:
+                entry["low"] = min(by_exchange.items(), key=lambda kv: kv[1])
+                entry["high"] = max(by_exchange.items(), key=lambda kv: kv[1])
+                if len(by_exchange) > 1 and entry["low"][1]:
+                    entry["spread"] = (entry["high"][1] - entry["low"][1]) / entry["low"][1]
+            out[symbol] = entry
+        return out
+
+
+def format_spread(spreads):
+    lines = []
+    for symbol, entry in spreads.items():
+        prices = "  ".join(f"{name} {price}" for name, price in sorted(entry["prices"].items()))
+        spread = f"{entry['spread']:.4%} ({entry['low'][0]} -> {entry['high'][0]})" if entry["spread"] is not None else "-"
+        lines.append(f"{symbol:15} {prices or 'no price':60} spread {spread}")
+    return "\n".join(lines)
+
+
+async def _run(args):
+    options = {}
+    if args.proxy:
+        options = {name: {"httpsProxy": args.proxy} for name in args.exchanges}
+    async with TickerService(args.exchanges, options) as service:
+        started = time.monotonic()
+        spreads = await service.spread(args.symbols)
+        print(format_spread(spreads))
+        print(f"{len(args.symbols) * len(args.exchanges)} tickers in {time.monotonic() - started:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Last prices and cross-exchange spread.")
+    parser.add_argument("symbols", nargs="*", default=["BTC/USDT"])
+    parser.add_argument("--exchanges", nargs="+", default=list(EXCHANGES))
+    parser.add_argument("--proxy", help="https proxy for all exchanges")
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Long-lived backtest worker, so a backtest doesn't pay freqtrade's start-up cost.
+
+`freqtrade backtesting` re-imports freqtrade / talib / pandas_ta / ccxt, loads the
+exchange markets and reads the feather files on every call. The worker does that
+once: the interpreter stays up, the exchange is kept per exchange settings and
+loaded candles stay in memory (keyed by pairs, timeframe, timerange and the
+mtimes of the files). Every job still reads the config, the strategy file and
+the helper modules it imports from strategies/ fresh, takes params as the same
+extra --config file as the cli and writes the same archive to backtest_results/.
+
+Jobs come in over a local unix socket (multiprocessing.connection, auth key in
+cache/backtest_worker.key). Jobs run one at a time; further clients wait.
+
+    python backtest_worker.py --serve                    # keep running in another terminal
+    python backtest_worker.py --run mini --timeframe 1h --timerange 20240101-
+    python backtest_worker.py --stop
+
+result_cache.backtest() uses a running worker automatically and falls back to
+`freqtrade backtesting` when there is none.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from pathlib import Path
+
+from datafiles import CACHE_DIR, pair_to_file
+from strategy_index import STRATEGIES_DIR
+
+SOCKET_PATH = CACHE_DIR / "backtest_worker.sock"
+KEY_PATH = CACHE_DIR / "backtest_worker.key"
+# loaded candle sets kept in memory (one set = all pairs of one load_data call)
+DATA_CACHE_SIZE = 8
+# exchange settings that don't change markets / fees / leverage tiers
+EXCHANGE_IGNORED_KEYS = ("pair_whitelist", "pair_blacklist", "key", "secret", "password", "uid")
+
+
+def _data_mtimes(datadir, pairs, timeframe):
+    """mtime of every file of `pairs` / `timeframe`, so a download invalidates the cache."""
+    datadir = Path(datadir)
+    out = []
+    for pair in pairs:
+        for path in sorted(datadir.rglob(f"{pair_to_file(pair)}-{timeframe}*")):
+            out.append((path.name, path.stat().st_mtime_ns))
+    return tuple(out)
+
+
+def _drop_strategy_modules(strategies_dir=STRATEGIES_DIR):
+    """Forget modules loaded from strategies/ (helpers), the next import reads them fresh."""
+    strategies_dir = Path(strategies_dir).resolve()
+    for name, module in list(sys.modules.items()):
+        file = getattr(module, "__file__", None)
+        if file and Path(file).resolve().is_relative_to(strategies_dir):
+            del sys.modules[name]
+
+
+class Worker:
+    def __init__(self):
+        # the slow imports, once per process
+        from freqtrade.commands import Arguments
+        from freqtrade.commands.optimize_commands import setup_optimize_configuration
+        from freqtrade.data import history
+        from freqtrade.enums import RunMode
+        from freqtrade.optimize.backtesting import Backtesting
+        from freqtrade.resolvers import ExchangeResolver
+
+        self.Arguments = Arguments
+        self.setup = lambda args: setup_optimize_configuration(args, RunMode.BACKTEST)
+        self.Backtesting = Backtesting
+        self.ExchangeResolver = ExchangeResolver
+        self.exchanges = {}
+        self.data = OrderedDict()
+        self.hits = self.misses = 0
+        # Backtesting loads candles through history.load_data (also for timeframe_detail)
+        self._load_data = history.load_data
+        history.load_data = self.load_data
+
+    def load_data(self, *args, **kwargs):
+        if args:
+            return self._load_data(*args, **kwargs)
+        tr = kwargs.get("timerange")
+        pairs = tuple(kwargs.get("pairs", ()))
+        key = tuple(sorted((k, str(v)) for k, v in kwargs.items() if k not in ("pairs", "timerange")))
+        key += (pairs, (tr.starttype, tr.startts, tr.stoptype, tr.stopts) if tr else None,
+                _data_mtimes(kwargs.get("datadir"), pairs, kwargs.get("timeframe")))
+        if key in self.data:
+            self.hits += 1
+            self.data.move_to_end(key)
+        else:
+            self.misses += 1
+            self.data[key] = self._load_data(**kwargs)
+            while len(self.data) > DATA_CACHE_SIZE:
+                self.data.popitem(last=False)
+        # strategies add columns, hand out copies
+        return {pair: df.copy() for pair, df in self.data[key].items()}
+
+    def exchange(self, config):
+        section = {k: v for k, v in config["exchange"].items() if k not in EXCHANGE_IGNORED_KEYS}
+        key = json.dumps([section, config.get("trading_mode"), config.get("margin_mode")],
+                         sort_keys=True, default=str)
+        if key not in self.exchanges:
+            self.exchanges[key] = self.ExchangeResolver.load_exchange(config, load_leverage_tiers=True)
+        return self.exchanges[key]
+
+    def backtest(self, job):
+        from result_cache import backtest_args, latest_result, params_config  # result_cache imports this module
+
+        _drop_strategy_modules()
+        configs = list(job.get("configs", ("config.json",)))
+        if job.get("params"):
+            configs.append(params_config(job["params"]))
+        args = self.Arguments(backtest_args(job["strategy"], job["timeframe"], job["timerange"],
+                                            configs, job.get("extra_args", ""))).get_parsed_arg()
+        config = self.setup(args)
+        export_dir = Path(job["export_dir"]) if job.get("export_dir") else config["exportdirectory"]
+        export_dir.mkdir(parents=True, exist_ok=True)
+        config["exportdirectory"] = export_dir
+        before = latest_result(export_dir)
+        start = time.perf_counter()
+        bt = self.Backtesting(config, exchange=self.exchange(config))
+        bt.start()
+        archive = latest_result(export_dir)
+        return {"archive": archive if archive != before else None,
+                "elapsed": time.perf_counter() - start, "data_hits": self.hits, "data_misses": self.misses}
+
+    def handle(self, job):
+        cmd = job.get("cmd", "backtest")
+        if cmd == "ping":
+            return {"ok": True, "pid": os.getpid(), "cached_data": len(self.data)}
+        if cmd == "clear":
+            self.data.clear()
+            self.exchanges.clear()
+            return {"ok": True}
+        if cmd == "backtest":
+            return self.backtest(job)
+        raise ValueError(f"unknown command {cmd}")
+
+
+def serve(socket_path=SOCKET_PATH, key_path=KEY_PATH):
+    worker = Worker()
+    socket_path, key_path = Path(socket_path), Path(key_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    socket_path.unlink(missing_ok=True)
+    key = os.urandom(32)
+    fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    print(f"backtest worker {os.getpid()} listening on {socket_path}")
+    with Listener(str(socket_path), family="AF_UNIX", authkey=key) as listener:
+        while True:
+            try:
+                conn = listener.accept()
+            except AuthenticationError:
+                continue
+            with conn:
+                try:
+                    job = conn.recv()
+                except EOFError:
+                    continue
+                if job.get("cmd") == "stop":
+                    conn.send({"ok": True})
+                    break
+                try:
+                    reply = worker.handle(job)
+                except Exception as e:
+                    traceback.print_exc()
+                    reply = {"error": f"{type(e).__name__}: {e}"}
+                try:
+                    conn.send(reply)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+    socket_path.unlink(missing_ok=True)
+    key_path.unlink(missing_ok=True)
+
+
+def submit(job, socket_path=SOCKET_PATH, key_path=KEY_PATH):
+    """Send one job to the worker and wait for its reply."""
+    with Client(str(socket_path), family="AF_UNIX", authkey=Path(key_path).read_bytes()) as conn:
+        conn.send(job)
+        return conn.recv()
+
+
+def available(socket_path=SOCKET_PATH, key_path=KEY_PATH):
+    """True if a worker answers on the socket."""
+    if not Path(socket_path).exists() or not Path(key_path).exists():
+        return False
+    try:
+        return submit({"cmd": "ping"}, socket_path, key_path).get("ok", False)
+    except (OSError, EOFError, AuthenticationError):
+        return False
+
+
+def backtest(strategy, timeframe, timerange, configs=("config.json",), extra_args="", params=None,
+             export_dir=None):
+    """
+    Run one backtest on the worker.
+    :param export_dir: where freqtrade writes the archive (default backtest_results/)
+    :return: archive file name (or None if the run failed)
+    """
+    reply = submit({"cmd": "backtest", "strategy": strategy, "timeframe": timeframe, "timerange": timerange,
+                    "configs": [str(c) for c in configs], "extra_args": extra_args, "params": params or {},
+                    "export_dir": str(export_dir) if export_dir else None})
+    if "error" in reply:
+        print(f"worker: {reply['error']}")
+        return None
+    print(f"worker: {strategy} {timeframe} {timerange} -> {reply['archive']} in {reply['elapsed']:.1f}s "
+          f"(data cache {reply['data_hits']} hits / {reply['data_misses']} loads)")
+    return reply["archive"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent freqtrade backtest worker.")
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--stop", action="store_true")
+    parser.add_argument("--clear", action="store_true", help="drop cached data and exchanges")
+    parser.add_argument("--run", metavar="STRATEGY")
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--timerange", default="20240101-")
+    parser.add_argument("--config", nargs="+", default=["config.json"])
+    parser.add_argument("--params", default=None, help="config overrides as json")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve()
+    elif args.stop or args.clear:
+        print(submit({"cmd": "stop" if args.stop else "clear"}))
+    elif args.run:
+        backtest(args.run, args.timeframe, args.timerange, args.config,
+                 params=json.loads(args.params) if args.params else None)
+
+
+if __name__ == "__main__":
+    main()
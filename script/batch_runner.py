@@ -0,0 +1,253 @@
+"""
+Run a strategy x timeframe x timerange x config matrix of backtests on all cores.
+
+A matrix spec is a json file (or the same keys as cli arguments):
+    {
+        "name": "yearly",
+        "strategies": ["mini", "advanced", "raindow"],
+        "timeframes": ["1h", "15m"],
+        "timeranges": ["y2022", "y2023", "20240101-20241231"],
+        "configs": ["config-backtest-usdt.json", "config-backtest-busd.json"],
+        "params": {"max_open_trades": 5}
+    }
+"yYYYY" is the calendar year, a config entry may be a list of files (merged).
+
+Jobs go through result_cache.backtest, so anything that was run before is a
+cache hit. Each pool process keeps a backtest_worker.Worker (freqtrade imported
+once, data cached) and lets freqtrade write into its own staging directory.
+How many jobs run at once is limited by cpu count and by an estimate of each
+job's memory (data file sizes of its whitelist) against the available memory.
+
+Progress goes to stdout, the state of every job to cache/batch/<name>.json after
+each job - running the same spec again resumes where it stopped. At the end the
+metrics of all jobs are collected from the catalog into cache/batch/<name>.csv.
+
+    python batch_runner.py spec.json
+    python batch_runner.py --strategy mini advanced --timeframe 1h --timerange y2022 y2023 y2024 \\
+        --config config-backtest-usdt.json config-backtest-busd.json --name usdt-busd
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+
+import ftconfig
+import result_cache
+import result_catalog
+from datafiles import CACHE_DIR, DATA_DIR, pair_to_file
+
+BATCH_DIR = CACHE_DIR / "batch"
+# rough memory use of one job: interpreter with freqtrade + data files x factor
+BASE_JOB_BYTES = 600 << 20
+DATA_FACTOR = 8
+MEMORY_FRACTION = 0.8
+PROGRESS_EVERY = 30  # seconds between status lines while nothing finishes
+
+TABLE_METRICS = ("total_trades", "profit_total", "profit_total_abs", "max_drawdown_account", "winrate",
+                 "profit_factor", "sharpe", "sortino", "calmar", "cagr")
+
+_YEAR_RE = re.compile(r"^y(\d{4})$")
+
+
+def resolve_timerange(timerange):
+    match = _YEAR_RE.match(timerange)
+    return f"{match.group(1)}0101-{match.group(1)}1231" if match else timerange
+
+
+def expand(spec):
+    """All jobs of a matrix spec."""
+    configs = [c if isinstance(c, list) else [c] for c in spec.get("configs") or ["config.json"]]
+    jobs = []
+    for strategy, timeframe, timerange, config in itertools.product(
+            spec["strategies"], spec["timeframes"], spec["timeranges"], configs):
+        job = {"strategy": strategy, "timeframe": timeframe, "timerange": resolve_timerange(timerange),
+               "configs": config, "params": spec.get("params") or {}, "extra_args": spec.get("extra_args", "")}
+        job["id"] = hashlib.sha256(json.dumps(job, sort_keys=True).encode()).hexdigest()[:16]
+        job["label"] = f"{strategy} {timeframe} {timerange} {'+'.join(Path(c).stem for c in config)}"
+        jobs.append(job)
+    return jobs
+
+
+def available_memory():
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES")
+
+
+def job_memory(job, datadir=DATA_DIR):
+    """Estimated peak memory of one job from the size of the data files it loads."""
+    config = ftconfig.load_config(*job["configs"])
+    exchange = config.get("exchange", {})
+    root = Path(datadir) / exchange.get("name", "binance")
+    prefixes = tuple(f"{pair_to_file(p)}-{job['timeframe']}-" for p in exchange.get("pair_whitelist", []))
+    size = sum(p.stat().st_size for p in root.rglob("*.feather") if p.name.startswith(prefixes)) \
+        if prefixes and root.exists() else 0
+    return BASE_JOB_BYTES + DATA_FACTOR * size
+
+
+_worker = None
+
+
+def _inprocess(strategy, timeframe, timerange, configs, extra_args, params, export_dir):
+    """result_cache runner on a Worker living in this pool process."""
+    global _worker
+    import backtest_worker
+    if _worker is None:
+        _worker = backtest_worker.Worker()
+    reply = _worker.backtest({"strategy": strategy, "timeframe": timeframe, "timerange": timerange,
+                              "configs": configs, "extra_args": extra_args, "params": params,
+                              "export_dir": str(export_dir)})
+    return reply["archive"]
+
+
+def run_job(job, runner="inprocess", staging_root=BATCH_DIR / "staging"):
+    start = time.perf_counter()
+    archive = result_cache.backtest(job["strategy"], job["timeframe"], job["timerange"], job["configs"],
+                                    job["extra_args"], params=job["params"],
+                                    staging_dir=Path(staging_root) / str(os.getpid()),
+                                    runner=_inprocess if runner == "inprocess" else result_cache.run_cli)
+    return {"archive": archive, "elapsed": time.perf_counter() - start}
+
+
+def load_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"jobs": {}}
+
+
+def save_state(state, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=1)
+    tmp.replace(path)
+
+
+def run(spec, workers=None, runner="inprocess", retry_failed=True):
+    """
+    Run (or resume) a matrix.
+    :return: DataFrame with one row per job and its metrics
+    """
+    name = spec.get("name") or hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+    state_path = BATCH_DIR / f"{name}.json"
+    state = load_state(state_path)
+    state["spec"] = spec
+    jobs = expand(spec)
+    todo = [j for j in jobs if state["jobs"].get(j["id"], {}).get("status") != "done"
+            and (retry_failed or state["jobs"].get(j["id"], {}).get("status") != "failed")]
+    print(f"{name}: {len(jobs)} job(s), {len(jobs) - len(todo)} finished before")
+
+    workers = workers or os.cpu_count() or 1
+    budget = available_memory() * MEMORY_FRACTION
+    for job in todo:
+        job["memory"] = job_memory(job)
+    workers = max(1, min(workers, len(todo) or 1, int(budget // max(j["memory"] for j in todo)) if todo else 1))
+    print(f"{workers} worker(s), memory budget {budget / 2**30:.1f} GiB")
+
+    pending, running, used = deque(todo), {}, 0
+    done_count, started = len(jobs) - len(todo), time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            # start jobs while cores and memory allow (always at least one)
+            while pending and len(running) < workers and (not running or used + pending[0]["memory"] <= budget):
+                job = pending.popleft()
+                running[pool.submit(run_job, job, runner)] = (job, time.time())
+                used += job["memory"]
+            finished, _ = wait(running, timeout=PROGRESS_EVERY, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job, t0 = running.pop(future)
+                used -= job["memory"]
+                try:
+                    out = future.result()
+                    status = "done" if out["archive"] else "failed"
+                except Exception as e:
+                    out, status = {"archive": None, "error": f"{type(e).__name__}: {e}"}, "failed"
+                state["jobs"][job["id"]] = {**{k: job[k] for k in ("strategy", "timeframe", "timerange",
+                                                                   "configs", "params", "label")},
+                                            **out, "status": status, "finished": int(time.time())}
+                save_state(state, state_path)
+                done_count += 1
+                elapsed = time.time() - started
+                remaining = len(pending) + len(running)
+                eta = elapsed / max(done_count - (len(jobs) - len(todo)), 1) * remaining
+                print(f"[{done_count}/{len(jobs)}] {status:6} {job['label']} -> {out.get('archive')} "
+                      f"{time.time() - t0:.0f}s | running {len(running)}, eta {eta / 60:.1f} min"
+                      + (f" | {out['error']}" if out.get("error") else ""))
+            if not finished:
+                print(f"... {len(running)} running: " + ", ".join(
+                    f"{j['label']} ({time.time() - t0:.0f}s)" for j, t0 in running.values()))
+
+    table = results_table(state)
+    if len(table):
+        table.to_csv(BATCH_DIR / f"{name}.csv", index=False)
+    return table
+
+
+def results_table(state):
+    """Jobs of a batch state joined with their catalog metrics."""
+    result_catalog.ingest(verbose=False)
+    conn = result_catalog.connect()
+    rows = []
+    for job in state["jobs"].values():
+        row = {k: job.get(k) for k in ("strategy", "timeframe", "timerange", "status", "archive")}
+        row["configs"] = "+".join(Path(c).stem for c in job["configs"])
+        if job.get("archive"):
+            hit = conn.execute(f"SELECT {', '.join(TABLE_METRICS)} FROM runs WHERE filename = ? AND strategy = ?",
+                               (job["archive"], job["strategy"])).fetchone()
+            if hit:
+                row.update(dict(hit))
+        rows.append(row)
+    conn.close()
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch backtests over a strategy / timeframe / timerange matrix.")
+    parser.add_argument("spec", nargs="?", help="matrix spec json")
+    parser.add_argument("--name", default=None)
+    parser.add_argument("--strategy", nargs="+")
+    parser.add_argument("--timeframe", nargs="+", default=["1h"])
+    parser.add_argument("--timerange", nargs="+", default=["20240101-"])
+    parser.add_argument("--config", nargs="+", default=["config.json"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cli", action="store_true", help="run `freqtrade backtesting` per job")
+    parser.add_argument("--skip-failed", action="store_true", help="don't retry failed jobs on resume")
+    args = parser.parse_args()
+
+    if args.spec:
+        spec = ftconfig.load_file(args.spec)
+    elif args.strategy:
+        spec = {"name": args.name, "strategies": args.strategy, "timeframes": args.timeframe,
+                "timeranges": args.timerange, "configs": args.config}
+    else:
+        parser.error("a spec file or --strategy is required")
+    table = run(spec, args.workers, "cli" if args.cli else "inprocess", retry_failed=not args.skip_failed)
+    if len(table):
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(table.sort_values("profit_total", ascending=False, na_position="last")
+                  .to_string(index=False, float_format="%.4f") if "profit_total" in table else table)
+
+
+if __name__ == "__main__":
+    main()
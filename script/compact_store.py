@@ -0,0 +1,244 @@
+"""
+Compact OHLCV representation for holding lots of 1m data in memory (hyperopt).
+
+    date    int64 ns      -> first date + int32 deltas in seconds
+    prices  float64       -> int32 ticks (price * 10**decimals) when exact,
+                             otherwise float32 when exact
+    volume  float64       -> int32 lot steps when exact, otherwise float32 when exact
+
+Every conversion is verified against the original frame; if any column can't
+be stored bit-exact the conversion is refused (LossyConversionError) and
+nothing is written.
+
+    python compact_store.py --convert --timeframe 1m
+    python compact_store.py --verify
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from datafiles import (CACHE_DIR, DATA_DIR, NS_PER_SECOND, TRADE_CANDLE_TYPES, dates_to_ns,
+                       is_stale, iter_data_files, load_candles)
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+MAX_DECIMALS = 10
+INT32_MAX = np.iinfo(np.int32).max
+
+
+class LossyConversionError(ValueError):
+    pass
+
+
+def _tick_decimals(values):
+    """Smallest number of decimals that stores values as int32 ticks bit-exact, or None."""
+    if not len(values) or np.isnan(values).any():
+        return None
+    for decimals in range(MAX_DECIMALS + 1):
+        scale = 10 ** decimals
+        ticks = np.rint(values * scale)
+        if np.abs(ticks).max() > INT32_MAX:
+            return None
+        if np.array_equal(ticks / scale, values):
+            return decimals
+    return None
+
+
+def _float32_exact(values):
+    return np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True)
+
+
+class CompactCandles:
+    """
+    OHLCV arrays in compact form. Columns are decoded to float64 on access,
+    so only the columns actually used are expanded.
+    """
+
+    def __init__(self, date0, date_delta, columns, meta):
+        self.date0 = int(date0)
+        self.date_delta = date_delta
+        self.columns = columns
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.date_delta)
+
+    @classmethod
+    def encode(cls, df, tick_decimals=None):
+        """
+        :param tick_decimals: force the price decimals (e.g. from the market's tick size),
+                              otherwise they are inferred per column
+        """
+        dates = dates_to_ns(df["date"])
+        if len(dates) and np.any(dates % NS_PER_SECOND):
+            raise LossyConversionError("dates are not whole seconds")
+        date0 = int(dates[0]) if len(dates) else 0
+        seconds = (dates - date0) // NS_PER_SECOND
+        delta = np.diff(seconds, prepend=0)
+        if len(delta) and (delta.min() < np.iinfo(np.int32).min or delta.max() > INT32_MAX):
+            raise LossyConversionError("date deltas don't fit int32")
+
+        columns, meta = {}, {"decimals": {}}
+        for col in PRICE_COLUMNS:
+            values = df[col].to_numpy(dtype=np.float64)
+            decimals = tick_decimals if tick_decimals is not None else _tick_decimals(values)
+            if decimals is not None:
+                scale = 10 ** decimals
+                ticks = np.rint(values * scale)
+                if (not np.isnan(values).any() and np.abs(ticks).max(initial=0) <= INT32_MAX
+                        and np.array_equal(ticks / scale, values)):
+                    columns[col] = ticks.astype(np.int32)
+                    meta["decimals"][col] = decimals
+                    continue
+            if not _float32_exact(values):
+                raise LossyConversionError(f"{col} can't be stored as int32 ticks or float32 without loss")
+            columns[col] = values.astype(np.float32)
+            meta["decimals"][col] = None
+
+        # volume has its own step size (contract lot), never the price tick
+        volume = df["volume"].to_numpy(dtype=np.float64)
+        decimals = _tick_decimals(volume)
+        if decimals is not None:
+            columns["volume"] = np.rint(volume * 10 ** decimals).astype(np.int32)
+            meta["decimals"]["volume"] = decimals
+        elif _float32_exact(volume):
+            columns["volume"] = volume.astype(np.float32)
+            meta["decimals"]["volume"] = None
+        else:
+            raise LossyConversionError("volume can't be stored as int32 steps or float32 without loss")
+        return cls(date0, delta.astype(np.int32), columns, meta)
+
+    def dates_ns(self):
+        return self.date0 + np.cumsum(self.date_delta, dtype=np.int64) * NS_PER_SECOND
+
+    def column(self, name):
+        """Decode one column to float64 (or the dates to datetime64)."""
+        if name == "date":
+            return pd.to_datetime(self.dates_ns(), utc=True)
+        values = self.columns[name]
+        decimals = self.meta["decimals"].get(name)
+        if decimals is not None:
+            return values / (10 ** decimals)
+        return values.astype(np.float64)
+
+    def to_dataframe(self):
+        df = pd.DataFrame({"date": self.column("date")})
+        for col in PRICE_COLUMNS + ("volume",):
+            df[col] = self.column(col)
+        return df
+
+    @property
+    def nbytes(self):
+        return self.date_delta.nbytes + sum(v.nbytes for v in self.columns.values())
+
+    def verify(self, original):
+        """
+        Raise LossyConversionError unless decoding gives back the original frame bit-exact.
+        """
+        if len(self) != len(original):
+            raise LossyConversionError(f"row count {len(self)} != {len(original)}")
+        if not np.array_equal(self.dates_ns(), dates_to_ns(original["date"])):
+            raise LossyConversionError("dates differ after round-trip")
+        for col in PRICE_COLUMNS + ("volume",):
+            decoded = self.column(col)
+            expected = original[col].to_numpy(dtype=np.float64)
+            if not np.array_equal(decoded, expected, equal_nan=True):
+                bad = int((decoded != expected).sum())
+                raise LossyConversionError(f"{col} differs after round-trip in {bad} rows")
+        return True
+
+    def write(self, path):
+        arrays = {"date_delta": self.date_delta}
+        arrays.update(self.columns)
+        table = pa.table(arrays)
+        meta = {"date0": self.date0, **self.meta}
+        table = table.replace_schema_metadata({b"compact_store": json.dumps(meta).encode()})
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        feather.write_feather(table, tmp, compression="lz4")
+        tmp.replace(path)
+
+    @classmethod
+    def read(cls, path, memory_map=True):
+        table = feather.read_table(path, memory_map=memory_map)
+        meta = json.loads(table.schema.metadata[b"compact_store"])
+        date0 = meta.pop("date0")
+        columns = {name: table.column(name).to_numpy() for name in PRICE_COLUMNS + ("volume",)}
+        return cls(date0, table.column("date_delta").to_numpy(), columns, meta)
+
+
+def compact_path(exchange, source, cachedir=CACHE_DIR):
+    return Path(cachedir) / "compact" / exchange / Path(source).name.replace(".feather", ".compact.feather")
+
+
+def convert_file(exchange, source, cachedir=CACHE_DIR, tick_decimals=None, force=False):
+    """
+    Encode one candle file, verify the round-trip and write it.
+    :return: (target, original_bytes, compact_bytes) or None if up to date
+    """
+    target = compact_path(exchange, source, cachedir)
+    if not force and not is_stale(target, source):
+        return None
+    original = load_candles(source)
+    compact = CompactCandles.encode(original, tick_decimals)
+    compact.verify(original)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    compact.write(target)
+    # verify what is on disk, not just what is in memory
+    CompactCandles.read(target).verify(original)
+    return target, original.memory_usage(index=False, deep=True).sum(), compact.nbytes
+
+
+def load_compact(exchange, pair_file, cachedir=CACHE_DIR, decode=True):
+    """
+    Load a compact file by its original name (e.g. 'BTC_USDT_USDT-1m-futures.feather').
+    :param decode: return a float64 DataFrame; False returns the CompactCandles object
+    """
+    compact = CompactCandles.read(compact_path(exchange, pair_file, cachedir))
+    return compact.to_dataframe() if decode else compact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact float32/int32 OHLCV storage.")
+    parser.add_argument("--convert", action="store_true", help="convert stale files (verified)")
+    parser.add_argument("--verify", action="store_true", help="re-verify existing compact files")
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--exchange", nargs="*", default=None)
+    parser.add_argument("--timeframe", nargs="*", default=None)
+    parser.add_argument("--decimals", type=int, default=None, help="price decimals from the tick size")
+    args = parser.parse_args()
+
+    files = list(iter_data_files(DATA_DIR, exchanges=args.exchange, candle_types=TRADE_CANDLE_TYPES,
+                                 timeframes=args.timeframe))
+    total_in = total_out = 0
+    for exchange, path, _ in files:
+        if args.convert:
+            try:
+                result = convert_file(exchange, path, tick_decimals=args.decimals, force=args.force)
+            except LossyConversionError as e:
+                print(f"refused  {exchange} {path.name}: {e}")
+                continue
+            if result:
+                _, size_in, size_out = result
+                total_in += size_in
+                total_out += size_out
+                print(f"compact  {exchange} {path.name}: {size_in / 1e6:.1f} MB -> {size_out / 1e6:.1f} MB")
+        if args.verify:
+            target = compact_path(exchange, path)
+            if not target.exists():
+                continue
+            try:
+                CompactCandles.read(target).verify(load_candles(path))
+                print(f"ok       {exchange} {path.name}")
+            except LossyConversionError as e:
+                print(f"MISMATCH {exchange} {path.name}: {e}")
+    if total_in:
+        print(f"total {total_in / 1e6:.1f} MB -> {total_out / 1e6:.1f} MB in memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Data-quality index over the feather candle files.
+
+For every (exchange, pair, timeframe, candle_type) it records missing-candle gaps,
+duplicate timestamps, zero-volume runs and the first traded candle, and stores the
+result in one json file per exchange (cache/quality_index-<exchange>.json).
+
+Strategies read it with strategies/quality_index.py (QualityIndex.live_data_ok /
+listed_days) instead of per-run checks like
+    dataframe['volume'].rolling(72).min() > 0
+
+    python data_quality.py --scan
+    python data_quality.py --scan --repair fill
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from datafiles import (CACHE_DIR, DATA_DIR, NS_PER_SECOND, TRADE_CANDLE_TYPES, dates_to_ns,
+                       iter_data_files, load_candles, timeframe_to_seconds,
+                       write_feather_atomic)
+from strategy_index import STRATEGIES_DIR
+
+sys.path.append(str(STRATEGIES_DIR))
+
+from quality_index import entry_key, index_path, read_index_file  # noqa: E402
+
+
+def find_runs(mask):
+    """
+    Start/end positions (inclusive) of consecutive True values in a boolean array.
+    """
+    mask = np.asarray(mask, dtype=np.int8)
+    if not mask.size:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    edges = np.diff(np.concatenate(([0], mask, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return starts, ends
+
+
+def scan_frame(df, timeframe, candle_type):
+    """
+    Vectorized quality pass over one candle frame.
+    :param candle_type: from the file name (datafiles.parse_data_filename)
+    :return: dict ready to be stored in the index (timestamps as int64 ns)
+    """
+    step = timeframe_to_seconds(timeframe) * NS_PER_SECOND
+    dates = dates_to_ns(df["date"])
+    entry = {
+        "step": step,
+        "rows": int(len(dates)),
+        "first_date": int(dates[0]) if len(dates) else None,
+        "last_date": int(dates[-1]) if len(dates) else None,
+        "unsorted": 0,
+        "duplicates": 0,
+        "gap_count": 0,
+        "missing_candles": 0,
+        "gaps": [],
+        "first_trade_date": None,
+        "zero_volume_candles": 0,
+        "zero_volume_runs": [],
+    }
+    if len(dates) < 2:
+        return entry
+
+    diff = np.diff(dates)
+    entry["unsorted"] = int((diff < 0).sum())
+    entry["duplicates"] = int((diff == 0).sum())
+
+    gap_idx = np.flatnonzero(diff > step)
+    missing = diff[gap_idx] // step - 1
+    entry["gap_count"] = int(gap_idx.size)
+    entry["missing_candles"] = int(missing.sum())
+    # gap = (last candle before the hole, first candle after it, missing candles)
+    entry["gaps"] = np.column_stack((dates[gap_idx], dates[gap_idx + 1], missing)).tolist()
+
+    if candle_type in TRADE_CANDLE_TYPES and "volume" in df.columns:
+        volume = df["volume"].to_numpy()
+        traded = np.flatnonzero(volume > 0)
+        if traded.size:
+            entry["first_trade_date"] = int(dates[traded[0]])
+        zero = ~(volume > 0)
+        starts, ends = find_runs(zero)
+        entry["zero_volume_candles"] = int(zero.sum())
+        entry["zero_volume_runs"] = np.column_stack((dates[starts], dates[ends], ends - starts + 1)).tolist()
+    return entry
+
+
+def repair_frame(df, timeframe, mode):
+    """
+    Fix a candle frame.
+    fill: sort, merge duplicate timestamps and insert missing candles
+          (open/high/low = previous close, volume 0) - same as freqtrade's fill up.
+    drop: sort, merge duplicate timestamps and drop zero-volume candles.
+    """
+    df = df.sort_values("date", kind="stable")
+    df = df.groupby("date", as_index=False, sort=True).agg({
+        "open": "first",
+        "high": "max",
+        "low": "min",
+        "close": "last",
+        "volume": "max",
+    })
+    if mode == "drop":
+        return df[df["volume"] > 0].reset_index(drop=True)
+    if not len(df):
+        return df
+
+    freq = pd.Timedelta(seconds=timeframe_to_seconds(timeframe))
+    full = pd.date_range(df["date"].iloc[0], df["date"].iloc[-1], freq=freq)
+    df = df.set_index("date").reindex(full)
+    df["close"] = df["close"].ffill()
+    for col in ("open", "high", "low"):
+        df[col] = df[col].fillna(df["close"])
+    df["volume"] = df["volume"].fillna(0)
+    df.index.name = "date"
+    return df.reset_index()
+
+
+def build_index(datadir=DATA_DIR, exchanges=None, timeframes=None, repair=None, verbose=True,
+                cachedir=CACHE_DIR):
+    """
+    Scan all candle files and write one index json per exchange to `cachedir`.
+    Files whose mtime/size didn't change since the last scan are not re-read.
+    """
+    datadir = Path(datadir)
+    indexes = {}
+    for exchange, path, info in iter_data_files(datadir, exchanges=exchanges, timeframes=timeframes):
+        if exchange not in indexes:
+            indexes[exchange] = read_index_file(index_path(exchange, cachedir))
+        entries = indexes[exchange]["entries"]
+        key = entry_key(info["pair"], info["timeframe"], info["candle_type"])
+        stat = path.stat()
+        old = entries.get(key)
+        if (repair is None and old and old.get("mtime_ns") == stat.st_mtime_ns
+                and old.get("size") == stat.st_size):
+            continue
+
+        start = time.perf_counter()
+        df = load_candles(path)
+        entry = scan_frame(df, info["timeframe"], info["candle_type"])
+        bad = entry["unsorted"] or entry["duplicates"] or entry["missing_candles"]
+        if info["candle_type"] in TRADE_CANDLE_TYPES and repair == "drop":
+            bad = bad or entry["zero_volume_candles"]
+        if repair and bad and info["candle_type"] in TRADE_CANDLE_TYPES:
+            df = repair_frame(df, info["timeframe"], repair)
+            write_feather_atomic(df, path)
+            entry = scan_frame(df, info["timeframe"], info["candle_type"])
+            entry["repaired"] = repair
+            stat = path.stat()
+        entry.update({"file": str(path.relative_to(datadir / exchange)),
+                      "mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+        entries[key] = entry
+        if verbose:
+            print(f"{exchange:8} {key:40} rows={entry['rows']:>8} gaps={entry['gap_count']:>4} "
+                  f"dup={entry['duplicates']:>4} zero_vol={entry['zero_volume_candles']:>6} "
+                  f"{time.perf_counter() - start:.2f}s")
+
+    Path(cachedir).mkdir(parents=True, exist_ok=True)
+    for exchange, index in indexes.items():
+        _write_index_file(index_path(exchange, cachedir), index)
+    return indexes
+
+
+def _write_index_file(path, index):
+    tmp = Path(str(path) + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    tmp.replace(path)
+
+
+def summary(indexes):
+    rows = []
+    for exchange, index in indexes.items():
+        for key, e in index["entries"].items():
+            pair, tf, ct = key.split("|")
+            rows.append({
+                "exchange": exchange, "pair": pair, "timeframe": tf, "candle_type": ct,
+                "rows": e["rows"], "gaps": e["gap_count"], "missing": e["missing_candles"],
+                "duplicates": e["duplicates"], "zero_volume": e["zero_volume_candles"],
+                "first_trade": (pd.Timestamp(e["first_trade_date"], tz="UTC").date()
+                                if e.get("first_trade_date") else None),
+            })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build / show the data-quality index.")
+    parser.add_argument("--scan", action="store_true", help="scan changed files and update the index")
+    parser.add_argument("--repair", choices=["fill", "drop"], default=None,
+                        help="rewrite bad files in place: fill gaps, or drop zero-volume rows")
+    parser.add_argument("--exchange", nargs="*", default=None)
+    parser.add_argument("--timeframe", nargs="*", default=None)
+    parser.add_argument("--datadir", default=str(DATA_DIR))
+    parser.add_argument("--cachedir", default=str(CACHE_DIR))
+    args = parser.parse_args()
+
+    if args.scan or args.repair:
+        indexes = build_index(args.datadir, args.exchange, args.timeframe, repair=args.repair,
+                              cachedir=args.cachedir)
+    else:
+        indexes = {p.stem.split("-", 1)[1]: read_index_file(p)
+                   for p in Path(args.cachedir).glob(index_path("*").name)}
+    df = summary(indexes)
+    if len(df):
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(df.sort_values(["exchange", "pair", "timeframe"]).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
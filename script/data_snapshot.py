@@ -0,0 +1,225 @@
+"""
+Content-addressed snapshots of data/ instead of committing the feather files to git.
+
+Every candle file is split into monthly chunks. A chunk is stored once under
+snapshots/chunks/<hash[:2]>/<hash>.feather, keyed by the sha256 of its column
+data, so a new download only adds the chunks that actually changed (usually the
+last month of each file). Each snapshot is a manifest json listing the chunks
+of every file.
+
+    python data_snapshot.py --create -m "after download 2025-06"
+    python data_snapshot.py --list
+    python data_snapshot.py --diff 20250601-120000 20250701-090000
+    python data_snapshot.py --restore 20250601-120000 --target /tmp/data
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from datafiles import DATA_DIR, USER_DATA, dates_to_ns, load_candles, write_feather_atomic
+
+SNAPSHOT_DIR = USER_DATA / "snapshots"
+
+
+def chunk_hash(df):
+    """sha256 over column names, dtypes and raw values - independent of the file encoding."""
+    h = hashlib.sha256()
+    for col in df.columns:
+        values = dates_to_ns(df[col]) if col == "date" else df[col].to_numpy()
+        h.update(f"{col}:{values.dtype.str};".encode())
+        h.update(np.ascontiguousarray(values).tobytes())
+    return h.hexdigest()
+
+
+def split_months(df):
+    """Yield (month, chunk) for every calendar month in the frame."""
+    if not len(df):
+        return
+    months = dates_to_ns(df["date"]).astype("datetime64[ns]").astype("datetime64[M]")
+    bounds = np.flatnonzero(months[1:] != months[:-1]) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(df)]))
+    for start, end in zip(starts, ends):
+        yield str(months[start]), df.iloc[start:end]
+
+
+class SnapshotStore:
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = Path(root)
+        self.chunks = self.root / "chunks"
+        self.manifests = self.root / "manifests"
+
+    def chunk_path(self, digest):
+        return self.chunks / digest[:2] / f"{digest}.feather"
+
+    def _put_chunk(self, df):
+        digest = chunk_hash(df)
+        path = self.chunk_path(digest)
+        if path.exists():
+            return digest, False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_feather_atomic(df, path)
+        return digest, True
+
+    def create(self, datadir=DATA_DIR, message=""):
+        """
+        Snapshot every feather file under datadir.
+        :return: (snapshot id, number of new chunks, bytes written)
+        """
+        datadir = Path(datadir)
+        previous = self.latest()
+        prev_files = previous["files"] if previous else {}
+        files, new_chunks, new_bytes = {}, 0, 0
+        for path in sorted(datadir.rglob("*.feather")):
+            rel = path.relative_to(datadir).as_posix()
+            stat = path.stat()
+            old = prev_files.get(rel)
+            # unchanged since the last snapshot - reuse its chunk list without reading the file
+            if old and old.get("mtime_ns") == stat.st_mtime_ns and old.get("size") == stat.st_size:
+                files[rel] = old
+                continue
+            df = load_candles(path)
+            chunks = []
+            for month, chunk in split_months(df):
+                digest, created = self._put_chunk(chunk)
+                if created:
+                    new_chunks += 1
+                    new_bytes += self.chunk_path(digest).stat().st_size
+                chunks.append({"month": month, "hash": digest, "rows": len(chunk)})
+            files[rel] = {"rows": len(df), "columns": list(df.columns),
+                          "dtypes": {c: str(t) for c, t in df.dtypes.items()}, "chunks": chunks,
+                          "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+        snapshot_id = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        if (self.manifests / f"{snapshot_id}.json").exists():
+            snapshot_id += f"-{len(self.ids())}"
+        manifest = {"id": snapshot_id, "created": int(time.time()), "message": message, "files": files}
+        self.manifests.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifests / f"{snapshot_id}.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1)
+        tmp.replace(self.manifests / f"{snapshot_id}.json")
+        return snapshot_id, new_chunks, new_bytes
+
+    def ids(self):
+        if not self.manifests.exists():
+            return []
+        return sorted(p.name[:-len(".json")] for p in self.manifests.glob("*.json"))
+
+    def load(self, snapshot_id):
+        with open(self.manifests / f"{snapshot_id}.json") as f:
+            return json.load(f)
+
+    def latest(self):
+        ids = self.ids()
+        return self.load(ids[-1]) if ids else None
+
+    def read_file(self, manifest, rel):
+        """Rebuild one data file of a snapshot as a DataFrame."""
+        entry = manifest["files"][rel]
+        parts = [pd.read_feather(self.chunk_path(c["hash"])) for c in entry["chunks"]]
+        if not parts:
+            # no chunk to take the dtypes from (manifests before "dtypes": object columns)
+            dtypes = entry.get("dtypes") or dict.fromkeys(entry["columns"], "object")
+            return pd.DataFrame({c: pd.Series(dtype=t) for c, t in dtypes.items()})
+        return pd.concat(parts, ignore_index=True)
+
+    def restore(self, snapshot_id, target=DATA_DIR, files=None):
+        """
+        Write the files of a snapshot into target. Files that already match
+        (same chunk hashes) are left untouched.
+        """
+        manifest = self.load(snapshot_id)
+        target = Path(target)
+        restored = []
+        for rel, entry in manifest["files"].items():
+            if files and rel not in files:
+                continue
+            path = target / rel
+            if path.exists():
+                current = [chunk_hash(c) for _, c in split_months(load_candles(path))]
+                if current == [c["hash"] for c in entry["chunks"]]:
+                    continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_feather_atomic(self.read_file(manifest, rel), path)
+            restored.append(rel)
+        return restored
+
+    def diff(self, a, b):
+        """
+        Compare two snapshots file by file.
+        :return: list of dicts (file, status, rows_a, rows_b, changed_months)
+        """
+        files_a, files_b = self.load(a)["files"], self.load(b)["files"]
+        out = []
+        for rel in sorted(set(files_a) | set(files_b)):
+            ea, eb = files_a.get(rel), files_b.get(rel)
+            if ea is None or eb is None:
+                out.append({"file": rel, "status": "added" if ea is None else "removed",
+                            "rows_a": ea and ea["rows"], "rows_b": eb and eb["rows"], "changed_months": []})
+                continue
+            ma = {c["month"]: c["hash"] for c in ea["chunks"]}
+            mb = {c["month"]: c["hash"] for c in eb["chunks"]}
+            changed = sorted(m for m in set(ma) | set(mb) if ma.get(m) != mb.get(m))
+            if changed:
+                out.append({"file": rel, "status": "changed", "rows_a": ea["rows"], "rows_b": eb["rows"],
+                            "changed_months": changed})
+        return out
+
+    def gc(self):
+        """Delete chunks no manifest refers to."""
+        used = set()
+        for snapshot_id in self.ids():
+            for entry in self.load(snapshot_id)["files"].values():
+                used.update(c["hash"] for c in entry["chunks"])
+        removed = 0
+        for path in self.chunks.rglob("*.feather"):
+            if path.stem not in used:
+                os.remove(path)
+                removed += 1
+        return removed
+
+
+def create_snapshot(message=""):
+    snapshot_id, new_chunks, new_bytes = SnapshotStore().create(message=message)
+    print(f"snapshot {snapshot_id}: {new_chunks} new chunk(s), {new_bytes / 1e6:.2f} MB")
+    return snapshot_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked, content-addressed data snapshots.")
+    parser.add_argument("--create", action="store_true")
+    parser.add_argument("-m", "--message", default="")
+    parser.add_argument("--list", action="store_true")
+    parser.add_argument("--diff", nargs=2, metavar=("A", "B"))
+    parser.add_argument("--restore", metavar="ID")
+    parser.add_argument("--target", default=str(DATA_DIR))
+    parser.add_argument("--gc", action="store_true", help="remove unreferenced chunks")
+    args = parser.parse_args()
+
+    store = SnapshotStore()
+    if args.create:
+        create_snapshot(args.message)
+    if args.list:
+        for snapshot_id in store.ids():
+            manifest = store.load(snapshot_id)
+            rows = sum(e["rows"] for e in manifest["files"].values())
+            print(f"{snapshot_id}  files={len(manifest['files']):>4} rows={rows:>10}  {manifest['message']}")
+    if args.diff:
+        for d in store.diff(*args.diff):
+            print(f"{d['status']:8} {d['file']:50} {d['rows_a']} -> {d['rows_b']} {','.join(d['changed_months'])}")
+    if args.restore:
+        restored = store.restore(args.restore, args.target)
+        print(f"restored {len(restored)} file(s) into {args.target}")
+    if args.gc:
+        print(f"removed {store.gc()} chunk(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Helpers for locating and reading the candle files under user_data/data."""
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+USER_DATA = Path(__file__).resolve().parent.parent
+DATA_DIR = USER_DATA / "data"
+# derived files (sidecars, indexes, ...) - can always be rebuilt from data/
+CACHE_DIR = USER_DATA / "cache"
+
+# BTC_USDT_USDT-1h-futures.feather / BTC_USDT_USDT-8h-funding_rate.feather
+FILE_RE = re.compile(r"^(?P<pair>.+?)-(?P<timeframe>\d+[smhdwM])-(?P<candle_type>[a-z_]+)\.feather$")
+
+# candle types that carry real trading volume
+TRADE_CANDLE_TYPES = ("futures", "spot")
+
+NS_PER_SECOND = 1_000_000_000
+
+
+def timeframe_to_seconds(timeframe):
+    """'5m' -> 300, '1d' -> 86400"""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    amount, unit = int(timeframe[:-1]), timeframe[-1]
+    if unit == "M":
+        # 近似为 30 天, 只用于 bucket 计算
+        return amount * 30 * 86400
+    return amount * units[unit]
+
+
+def file_to_pair(file_pair):
+    """'BTC_USDT_USDT' -> 'BTC/USDT:USDT', 'BTC_USDT' -> 'BTC/USDT'"""
+    parts = file_pair.split("_")
+    if len(parts) >= 3:
+        return f"{'_'.join(parts[:-2])}/{parts[-2]}:{parts[-1]}"
+    return f"{parts[0]}/{parts[1]}"
+
+
+def pair_to_file(pair):
+    """'BTC/USDT:USDT' -> 'BTC_USDT_USDT'"""
+    return pair.replace("/", "_").replace(":", "_")
+
+
+def parse_data_filename(path):
+    """
+    Split a data file name into its parts.
+    :return: dict with pair, timeframe, candle_type or None if the name doesn't match
+    """
+    m = FILE_RE.match(Path(path).name)
+    if not m:
+        return None
+    return {
+        "pair": file_to_pair(m.group("pair")),
+        "timeframe": m.group("timeframe"),
+        "candle_type": m.group("candle_type"),
+    }
+
+
+def candle_path(exchange, pair, timeframe, candle_type="futures", datadir=DATA_DIR):
+    market = "futures" if candle_type != "spot" else ""
+    return Path(datadir) / exchange / market / f"{pair_to_file(pair)}-{timeframe}-{candle_type}.feather"
+
+
+def iter_data_files(datadir=DATA_DIR, exchanges=None, candle_types=None, timeframes=None):
+    """
+    Yield (exchange, path, info) for every feather candle file under datadir.
+    """
+    datadir = Path(datadir)
+    for exchange_dir in sorted(p for p in datadir.iterdir() if p.is_dir()):
+        exchange = exchange_dir.name
+        if exchanges and exchange not in exchanges:
+            continue
+        for root, _, files in os.walk(exchange_dir):
+            for name in sorted(files):
+                info = parse_data_filename(name)
+                if info is None:
+                    continue
+                if candle_types and info["candle_type"] not in candle_types:
+                    continue
+                if timeframes and info["timeframe"] not in timeframes:
+                    continue
+                yield exchange, Path(root) / name, info
+
+
+def is_stale(target, *sources):
+    """True if target is missing or older than any of the source files."""
+    target = Path(target)
+    if not target.exists():
+        return True
+    mtime = target.stat().st_mtime_ns
+    return any(Path(s).stat().st_mtime_ns > mtime for s in sources)
+
+
+def load_candles(path, columns=None):
+    """Read a candle file, dates as tz-aware UTC like freqtrade does."""
+    df = pd.read_feather(path, columns=columns)
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"], utc=True)
+    return df
+
+
+def dates_to_ns(dates):
+    """Series/Index/array of datetimes -> int64 nanoseconds since epoch."""
+    if isinstance(dates, (pd.Series, pd.Index)):
+        dates = pd.to_datetime(dates, utc=True)
+        values = dates.values if isinstance(dates, pd.Index) else dates.dt.tz_convert(None).values
+        return np.asarray(values).astype("datetime64[ns]").astype(np.int64)
+    arr = np.asarray(dates)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype("datetime64[ns]").astype(np.int64)
+    return arr.astype(np.int64)
+
+
+def write_feather_atomic(df, path):
+    """Write next to the target and rename, so a crash never leaves half a file."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    df.reset_index(drop=True).to_feather(tmp, compression="lz4")
+    os.replace(tmp, path)
@@ -0,0 +1,311 @@
+"""
+Per-candle equity / drawdown for many backtest runs at once, straight from the
+columnar trade tables (trade_extract.py) - no per-trade python loop.
+
+All runs are put on one common candle grid; the result is a (runs x candles)
+matrix, so comparing mini / advanced / raindow / VolatilitySystem or hundreds of
+hyperopt iterations is a handful of numpy calls.
+
+    runs = load_runs(strategies=["mini", "advanced"], timeframe="1h")
+    res = equity_curves(runs, timeframe="1h")
+    res.summary()
+    rolling_ratios(res, window=24 * 30)
+
+    python equity.py --strategy mini advanced raindow VolatilitySystem --timeframe 1h
+"""
+import argparse
+import heapq
+import io
+import zipfile
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from datafiles import NS_PER_SECOND, dates_to_ns, timeframe_to_seconds
+from result_catalog import RESULTS_DIR, connect
+from result_store import ResultStore
+from trade_extract import extract_archive, read_trades
+
+SECONDS_PER_YEAR = 365 * 86400
+
+# trade columns the equity engine needs
+EQUITY_COLUMNS = ["pair", "open_date", "close_date", "is_short", "amount", "open_rate",
+                  "stake_amount", "profit_abs", "profit_ratio"]
+
+
+@dataclass
+class Run:
+    name: str
+    trades: pd.DataFrame
+    starting_balance: float
+    max_open_trades: int = -1
+    market_change: pd.DataFrame = None
+    backtest_start: pd.Timestamp = None
+    backtest_end: pd.Timestamp = None
+
+
+def read_market_change(stem, store=None):
+    """The _market_change.feather stored in an archive (date, mean, rel_mean, count)."""
+    if store is not None:
+        return pd.read_feather(io.BytesIO(store.member(f"{stem}.zip", "_market_change.feather")))
+    with zipfile.ZipFile(RESULTS_DIR / f"{stem}.zip") as zf:
+        return pd.read_feather(io.BytesIO(zf.read(f"{stem}_market_change.feather")))
+
+
+def load_runs(strategies=None, timeframe=None, filenames=None, with_market_change=False,
+              columns=EQUITY_COLUMNS):
+    """
+    Runs from the catalog (result_catalog.py) with their trade tables.
+    :param columns: trade columns to read, None for all
+    """
+    where, params = [], []
+    if strategies:
+        where.append(f"strategy IN ({', '.join('?' * len(strategies))})")
+        params += list(strategies)
+    if timeframe:
+        where.append("timeframe = ?")
+        params.append(timeframe)
+    if filenames:
+        where.append(f"filename IN ({', '.join('?' * len(filenames))})")
+        params += list(filenames)
+    sql = ("SELECT filename, strategy, starting_balance, max_open_trades, backtest_start_ts, "
+           "backtest_end_ts FROM runs")
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    conn = connect()
+    rows = conn.execute(sql + " ORDER BY filename", params).fetchall()
+    conn.close()
+
+    runs, store = [], None
+    for r in rows:
+        stem = r["filename"][:-len(".zip")]
+        stored = not (RESULTS_DIR / r["filename"]).exists()
+        if stored:
+            # compacted into the result store
+            store = store or ResultStore()
+            trades = store.run_trades(r["filename"], r["strategy"], columns=columns)
+        else:
+            extract_archive(RESULTS_DIR / r["filename"])
+            trades = read_trades(stem, r["strategy"], columns=columns)
+        runs.append(Run(
+            name=f"{r['strategy']}@{stem[len('backtest-result-'):]}",
+            trades=trades,
+            starting_balance=r["starting_balance"] or 1000.0,
+            max_open_trades=int(r["max_open_trades"] if r["max_open_trades"] is not None else -1),
+            market_change=read_market_change(stem, store if stored else None) if with_market_change else None,
+            backtest_start=_ts(r["backtest_start_ts"]),
+            backtest_end=_ts(r["backtest_end_ts"]),
+        ))
+    return runs
+
+
+def _ts(ms):
+    return None if ms is None else pd.Timestamp(int(ms), unit="ms", tz="UTC")
+
+
+def apply_max_open_trades(trades, max_open_trades):
+    """
+    Drop the trades that could not have been opened with `max_open_trades` slots
+    (trades are taken in open order, a slot is freed at close).
+    """
+    if max_open_trades is None or max_open_trades < 0 or len(trades) <= max_open_trades:
+        return trades
+    order = np.argsort(dates_to_ns(trades["open_date"]), kind="stable")
+    opens = dates_to_ns(trades["open_date"])[order]
+    closes = dates_to_ns(trades["close_date"])[order]
+    keep = np.zeros(len(trades), dtype=bool)
+    busy = []
+    for i in range(len(order)):
+        while busy and busy[0] <= opens[i]:
+            heapq.heappop(busy)
+        if len(busy) < max_open_trades:
+            heapq.heappush(busy, closes[i])
+            keep[order[i]] = True
+    return trades[keep]
+
+
+@dataclass
+class EquityResult:
+    names: list
+    dates: pd.DatetimeIndex
+    equity: np.ndarray          # runs x candles
+    drawdown: np.ndarray        # runs x candles, <= 0 (underwater curve)
+    open_trades: np.ndarray     # runs x candles
+    starting_balance: np.ndarray
+    step_seconds: int
+
+    def frame(self, what="equity"):
+        return pd.DataFrame(getattr(self, what).T, index=self.dates, columns=self.names)
+
+    def summary(self):
+        final = self.equity[:, -1]
+        years = max(len(self.dates) * self.step_seconds / SECONDS_PER_YEAR, 1e-9)
+        cagr = (final / self.starting_balance) ** (1 / years) - 1
+        max_dd = -self.drawdown.min(axis=1)
+        daily = _daily_returns(self)
+        mean, std = daily.mean(axis=1), daily.std(axis=1, ddof=1)
+        down = np.sqrt(np.mean(np.minimum(daily, 0) ** 2, axis=1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = pd.DataFrame({
+                "final_balance": final,
+                "profit_total": final / self.starting_balance - 1,
+                "max_drawdown": max_dd,
+                "max_open_trades": self.open_trades.max(axis=1),
+                "cagr": cagr,
+                "sharpe": mean / std * np.sqrt(365),
+                "sortino": mean / down * np.sqrt(365),
+                "calmar": cagr / max_dd,
+            }, index=self.names)
+        return out
+
+
+def equity_curves(runs, timeframe, start=None, end=None, respect_max_open_trades=False, panel=None):
+    """
+    Per-candle equity for every run on a common grid.
+    :param runs: list of Run
+    :param respect_max_open_trades: re-apply each run's max_open_trades (apply_max_open_trades)
+    :param panel: optional panel_store.Panel of the same timeframe; open trades are
+                  then marked to market with the candle close instead of only
+                  counting realized profit at close
+    """
+    step = timeframe_to_seconds(timeframe) * NS_PER_SECOND
+    tables = [apply_max_open_trades(r.trades, r.max_open_trades) if respect_max_open_trades else r.trades
+              for r in runs]
+    opens = [dates_to_ns(t["open_date"]) for t in tables]
+    closes = [dates_to_ns(t["close_date"]) for t in tables]
+
+    if start is None:
+        candidates = [o.min() for o in opens if len(o)]
+        candidates += [dates_to_ns(r.market_change["date"])[0] for r in runs if r.market_change is not None]
+        start = min(candidates)
+    else:
+        start = pd.Timestamp(start, tz="UTC").value
+    if end is None:
+        candidates = [c.max() for c in closes if len(c)]
+        candidates += [dates_to_ns(r.market_change["date"])[-1] for r in runs if r.market_change is not None]
+        end = max(candidates)
+    else:
+        end = pd.Timestamp(end, tz="UTC").value
+    t0 = start - start % step
+    n = int((end - t0) // step) + 1
+
+    pnl = np.zeros((len(runs), n))
+    count = np.zeros((len(runs), n + 1), dtype=np.int64)
+    for i, (t, o, c) in enumerate(zip(tables, opens, closes)):
+        if not len(t):
+            continue
+        open_idx = np.clip((o - t0) // step, 0, n)
+        close_idx = np.clip((c - t0) // step, 0, n - 1)
+        np.add.at(pnl[i], close_idx, t["profit_abs"].to_numpy(dtype=np.float64))
+        # overlapping positions: +1 at open, -1 at close
+        np.add.at(count[i], open_idx, 1)
+        np.add.at(count[i], close_idx, -1)
+
+    balance = np.array([r.starting_balance for r in runs], dtype=np.float64)
+    equity = balance[:, None] + np.cumsum(pnl, axis=1)
+    if panel is not None:
+        equity += _unrealized(tables, opens, closes, panel, t0, step, n)
+    peak = np.maximum.accumulate(np.maximum(equity, balance[:, None]), axis=1)
+    drawdown = equity / peak - 1
+    open_trades = np.cumsum(count, axis=1)[:, :n]
+
+    dates = pd.to_datetime(t0 + np.arange(n, dtype=np.int64) * step, utc=True)
+    return EquityResult([r.name for r in runs], dates, equity, drawdown, open_trades, balance,
+                        step // NS_PER_SECOND)
+
+
+def _unrealized(tables, opens, closes, panel, t0, step, n):
+    """Mark-to-market of open trades on candles between open and close (exclusive)."""
+    out = np.zeros((len(tables), n))
+    close_col = panel.fields.index("close")
+    for i, (t, o, c) in enumerate(zip(tables, opens, closes)):
+        for pair, idx in t.groupby("pair", observed=True).indices.items():
+            ids = panel.column_ids(pairs=[pair], exchanges=["binance"])
+            if not ids:
+                continue
+            first = (o[idx] - t0) // step
+            last = (c[idx] - t0) // step
+            lengths = np.maximum(last - first, 0)
+            if not lengths.sum():
+                continue
+            # candle index of every (trade, candle) pair while the trade is open
+            trade_of = np.repeat(np.arange(len(idx)), lengths)
+            offset = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            grid = first[trade_of] + offset
+            panel_row = (t0 - panel.t0) // panel.step + grid
+            valid = (grid >= 0) & (grid < n) & (panel_row >= 0) & (panel_row < len(panel.values))
+            price = np.full(len(grid), np.nan)
+            price[valid] = panel.values[panel_row[valid], ids[0], close_col]
+            sub = t.iloc[idx]
+            side = np.where(sub["is_short"].to_numpy(), -1.0, 1.0)[trade_of]
+            amount = sub["amount"].to_numpy(dtype=np.float64)[trade_of]
+            open_rate = sub["open_rate"].to_numpy(dtype=np.float64)[trade_of]
+            value = np.nan_to_num(side * amount * (price - open_rate))
+            np.add.at(out[i], grid[valid], value[valid])
+    return out
+
+
+def _daily_returns(res):
+    per_day = max(int(86400 // res.step_seconds), 1)
+    daily = res.equity[:, per_day - 1::per_day]
+    daily = np.concatenate([res.starting_balance[:, None], daily], axis=1)
+    return daily[:, 1:] / daily[:, :-1] - 1
+
+
+def rolling_ratios(res, window, min_periods=None):
+    """
+    Rolling Sharpe / Sortino / Calmar per candle for every run (annualized).
+    :param window: window length in candles
+    :return: dict of (runs x candles) arrays, NaN until the window is filled
+    """
+    min_periods = min_periods or window
+    eq = res.equity
+    ret = np.zeros_like(eq)
+    ret[:, 1:] = eq[:, 1:] / eq[:, :-1] - 1
+    periods = SECONDS_PER_YEAR / res.step_seconds
+
+    def rolling_sum(x):
+        c = np.cumsum(x, axis=1)
+        out = c.copy()
+        out[:, window:] = c[:, window:] - c[:, :-window]
+        return out
+
+    count = np.minimum(np.arange(1, eq.shape[1] + 1), window)[None, :]
+    mean = rolling_sum(ret) / count
+    var = (rolling_sum(ret ** 2) - count * mean ** 2) / np.maximum(count - 1, 1)
+    down = np.sqrt(rolling_sum(np.minimum(ret, 0) ** 2) / count)
+
+    # deepest point of the underwater curve inside the window (rolling min is O(n))
+    win_dd = -pd.DataFrame(res.drawdown.T).rolling(window, min_periods=1).min().to_numpy().T
+    start = np.concatenate([np.repeat(eq[:, :1], window - 1, axis=1), eq], axis=1)[:, :eq.shape[1]]
+    win_ret = eq / start - 1
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = mean / np.sqrt(np.maximum(var, 0)) * np.sqrt(periods)
+        sortino = mean / down * np.sqrt(periods)
+        calmar = (win_ret * periods / window) / win_dd
+    mask = count < min_periods
+    for arr in (sharpe, sortino, calmar):
+        arr[np.broadcast_to(mask, arr.shape)] = np.nan
+    return {"sharpe": sharpe, "sortino": sortino, "calmar": calmar}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Equity / drawdown comparison of backtest runs.")
+    parser.add_argument("--strategy", nargs="+", default=None)
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--max-open-trades", action="store_true", help="re-apply max_open_trades")
+    args = parser.parse_args()
+
+    runs = load_runs(args.strategy, args.timeframe)
+    if not runs:
+        print("no runs found - run `python result_catalog.py --ingest` first")
+        return
+    res = equity_curves(runs, args.timeframe, respect_max_open_trades=args.max_open_trades)
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(res.summary().sort_values("profit_total", ascending=False).to_string(float_format="%.4f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Read freqtrade config files (json with // comments and trailing commas)."""
+import json
+import re
+from pathlib import Path
+
+from datafiles import USER_DATA
+
+# a json string, or a comment / trailing comma outside of strings
+_COMMENT_RE = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/', re.S)
+_TRAILING_COMMA_RE = re.compile(r'"(?:\\.|[^"\\])*"|,(?=\s*[}\]])', re.S)
+
+
+def _keep_strings(match):
+    text = match.group(0)
+    return text if text.startswith('"') else ""
+
+
+def loads(text):
+    text = _COMMENT_RE.sub(_keep_strings, text)
+    text = _TRAILING_COMMA_RE.sub(_keep_strings, text)
+    return json.loads(text)
+
+
+def load_file(path):
+    with open(path, encoding="utf-8") as f:
+        return loads(f.read())
+
+
+def deep_merge(base, override):
+    """Later configs win, dicts are merged recursively - like `--config a --config b`."""
+    out = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(out.get(key), dict):
+            out[key] = deep_merge(out[key], value)
+        else:
+            out[key] = value
+    return out
+
+
+def load_config(*paths):
+    """Effective config of one or more config files (relative to user_data)."""
+    config = {}
+    for path in paths or ("config.json",):
+        path = Path(path)
+        if not path.is_absolute() and not path.exists():
+            path = USER_DATA / path
+        config = deep_merge(config, load_file(path))
+    return config
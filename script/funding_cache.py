@@ -0,0 +1,138 @@
+"""
+Funding-rate / mark-price columns pre-aligned to every trading candle file.
+
+For each <pair>-<tf>-futures.feather a sidecar
+    cache/funding/<exchange>/<pair>-<tf>-funding_mark.feather
+is written with one row per trading candle (same dates, same order):
+
+    date            candle open time
+    funding_rate    last funding rate settled at or before the candle open (ffill)
+    funding_event   True if a funding settlement falls inside this candle
+    mark_close      close of the last *closed* mark candle at the candle close (no lookahead)
+
+Strategies join it with strategies/funding_mark.py (join_funding_mark).
+
+    python funding_cache.py --build
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from datafiles import (CACHE_DIR, DATA_DIR, NS_PER_SECOND, candle_path, dates_to_ns,
+                       is_stale, iter_data_files, load_candles, timeframe_to_seconds,
+                       write_feather_atomic)
+from strategy_index import STRATEGIES_DIR
+
+sys.path.append(str(STRATEGIES_DIR))
+
+from funding_mark import sidecar_path  # noqa: E402
+
+# mark timeframe freqtrade uses per exchange (mark_ohlcv_timeframe)
+MARK_TIMEFRAMES = {"binance": "8h", "okx": "4h"}
+
+
+def find_mark_file(exchange, pair, datadir=DATA_DIR):
+    """
+    Mark file for the pair: the exchange's mark timeframe (8h on binance, 4h on okx)
+    if present, otherwise the smallest one available.
+    """
+    preferred = MARK_TIMEFRAMES.get(exchange)
+    if preferred:
+        path = candle_path(exchange, pair, preferred, "mark", datadir)
+        if path.exists():
+            return preferred, path
+    candidates = []
+    for _, path, info in iter_data_files(datadir, exchanges=[exchange], candle_types=["mark"]):
+        if info["pair"] == pair:
+            candidates.append((timeframe_to_seconds(info["timeframe"]), info["timeframe"], path))
+    if not candidates:
+        return None, None
+    _, timeframe, path = min(candidates)
+    return timeframe, path
+
+
+def align_funding_mark(dates, timeframe, funding=None, mark=None, mark_timeframe=None):
+    """
+    Align funding and mark frames to candle dates with searchsorted.
+    :param dates: candle open dates (sorted)
+    :return: DataFrame with date + FUNDING_COLUMNS, len(dates) rows
+    """
+    ns = dates_to_ns(dates)
+    step = timeframe_to_seconds(timeframe) * NS_PER_SECOND
+    out = pd.DataFrame({"date": pd.to_datetime(ns, utc=True)})
+
+    if funding is not None and len(funding):
+        f_ns = dates_to_ns(funding["date"])
+        rate = funding["open"].to_numpy(dtype=np.float64)
+        idx = np.searchsorted(f_ns, ns, side="right") - 1
+        out["funding_rate"] = np.where(idx >= 0, rate[np.maximum(idx, 0)], np.nan)
+        # settlement inside [open, open + timeframe)
+        nxt = np.searchsorted(f_ns, ns, side="left")
+        nxt_date = f_ns[np.minimum(nxt, len(f_ns) - 1)]
+        out["funding_event"] = (nxt < len(f_ns)) & (nxt_date < ns + step)
+    else:
+        out["funding_rate"] = np.nan
+        out["funding_event"] = False
+
+    if mark is not None and len(mark):
+        m_close_time = dates_to_ns(mark["date"]) + timeframe_to_seconds(mark_timeframe) * NS_PER_SECOND
+        close = mark["close"].to_numpy(dtype=np.float64)
+        # mark candles that closed no later than this candle closes
+        idx = np.searchsorted(m_close_time, ns + step, side="right") - 1
+        out["mark_close"] = np.where(idx >= 0, close[np.maximum(idx, 0)], np.nan)
+    else:
+        out["mark_close"] = np.nan
+    return out
+
+
+def build_sidecar(exchange, pair, timeframe, datadir=DATA_DIR, cachedir=CACHE_DIR, force=False):
+    """
+    (Re)build one sidecar if any of its inputs changed.
+    :return: sidecar path or None if nothing to do
+    """
+    candles = candle_path(exchange, pair, timeframe, "futures", datadir)
+    funding_file = candle_path(exchange, pair, "8h", "funding_rate", datadir)
+    mark_tf, mark_file = find_mark_file(exchange, pair, datadir)
+    sources = [p for p in (candles, funding_file, mark_file) if p is not None and p.exists()]
+    target = sidecar_path(exchange, pair, timeframe, cachedir)
+    if not force and not is_stale(target, *sources):
+        return None
+
+    dates = load_candles(candles, columns=["date"])["date"]
+    funding = load_candles(funding_file, columns=["date", "open"]) if funding_file.exists() else None
+    mark = load_candles(mark_file, columns=["date", "close"]) if mark_file is not None else None
+    aligned = align_funding_mark(dates, timeframe, funding, mark, mark_tf)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    write_feather_atomic(aligned, target)
+    return target
+
+
+def build_all(datadir=DATA_DIR, cachedir=CACHE_DIR, exchanges=None, timeframes=None, force=False):
+    built = []
+    for exchange, _, info in iter_data_files(datadir, exchanges=exchanges, candle_types=["futures"],
+                                             timeframes=timeframes):
+        target = build_sidecar(exchange, info["pair"], info["timeframe"], datadir, cachedir, force)
+        if target is not None:
+            print(f"built {target.relative_to(cachedir)}")
+            built.append(target)
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build funding-rate / mark-price sidecars.")
+    parser.add_argument("--build", action="store_true", help="build missing or stale sidecars")
+    parser.add_argument("--force", action="store_true", help="rebuild everything")
+    parser.add_argument("--exchange", nargs="*", default=None)
+    parser.add_argument("--timeframe", nargs="*", default=None)
+    args = parser.parse_args()
+
+    if args.build or args.force:
+        built = build_all(exchanges=args.exchange, timeframes=args.timeframe, force=args.force)
+        print(f"{len(built)} sidecar(s) written")
+
+
+if __name__ == "__main__":
+    main()
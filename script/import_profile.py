@@ -0,0 +1,189 @@
+"""
+What does loading a strategy file cost in imports?
+
+Every strategy file is loaded the way freqtrade's resolver does it (its own
+directory on sys.path, exec of the module) in a fresh interpreter with
+`python -X importtime`. Time spent on modules freqtrade needs anyway (the
+baseline: freqtrade.strategy, pandas, numpy, talib) is subtracted, what's left
+is charged to the top level package that pulled it in. Imports the file never
+uses (no name reference) are listed as well - those are free to remove, heavy
+ones that are used can go through strategies/lazy_import.py.
+
+    python import_profile.py                     # all strategies, worst first
+    python import_profile.py mini MultiMA_TSL5   # some
+    python import_profile.py --top 20
+"""
+import argparse
+import ast
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+import strategy_index
+
+BASELINE = ("freqtrade.strategy", "pandas", "numpy", "talib.abstract")
+TIMEOUT = 120
+
+_LOADER = """
+import importlib.util, sys
+path = sys.argv[1]
+sys.path.insert(0, path.rsplit("/", 1)[0])
+spec = importlib.util.spec_from_file_location(path.rsplit("/", 1)[-1][:-3], path)
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+"""
+_BASELINE_LOADER = """
+import sys
+for name in sys.argv[1:]:
+    try:
+        __import__(name)
+    except ImportError:
+        pass
+"""
+
+
+def parse_importtime(stderr):
+    """
+    `-X importtime` lines -> [(depth, module, self_us, cumulative_us)] and the error text.
+    """
+    rows, other = [], []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            other.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(parts[0]), int(parts[1])))
+    return rows, "\n".join(other).strip()
+
+
+def _run(code, *args):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code, *args],
+                          capture_output=True, text=True, timeout=TIMEOUT)
+    rows, error = parse_importtime(proc.stderr)
+    return rows, (error.splitlines()[-1] if proc.returncode and error else None)
+
+
+def baseline_modules():
+    rows, _ = _run(_BASELINE_LOADER, *BASELINE)
+    return {name for _, name, _, _ in rows}
+
+
+def _string_annotation_names(tree):
+    """Names referenced in string annotations (`trade: 'Trade'`)."""
+    annotations = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.arg):
+            annotations.append(node.annotation)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            annotations.append(node.returns)
+        elif isinstance(node, ast.AnnAssign):
+            annotations.append(node.annotation)
+    names = set()
+    for annotation in filter(None, annotations):
+        for node in ast.walk(annotation):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                try:
+                    expression = ast.parse(node.value, mode="eval")
+                except SyntaxError:
+                    continue
+                names.update(n.id for n in ast.walk(expression) if isinstance(n, ast.Name))
+    return names
+
+
+def unused_imports(path):
+    """Names a file imports at module level but never references."""
+    tree = ast.parse(Path(path).read_text(encoding="utf-8", errors="replace"))
+    imported = {}
+    for stmt in tree.body:
+        if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+            for alias in stmt.names:
+                if alias.name == "*":
+                    continue
+                bound = alias.asname or alias.name.split(".")[0]
+                module = alias.name if isinstance(stmt, ast.Import) else f"{stmt.module}.{alias.name}"
+                imported[bound] = module
+    used = {n.id for n in ast.walk(tree) if isinstance(n, ast.Name)}
+    used |= _string_annotation_names(tree)
+    # names listed in __all__ don't count, strategies don't re-export
+    return {name: module for name, module in imported.items() if name not in used}
+
+
+def profile_file(path, baseline):
+    """
+    Import cost of one strategy file.
+    :return: dict total_ms (beyond baseline), by_package {package: ms}, modules (count), error, unused
+    """
+    rows, error = _run(_LOADER, str(path))
+    by_package = defaultdict(float)
+    count = 0
+    pending = 0.0
+    # importtime prints a module after everything it imported, the depth 0 line closes the group
+    for depth, name, self_us, _ in rows:
+        if name not in baseline:
+            count += 1
+            pending += self_us / 1000
+        if depth == 0:
+            if pending:
+                by_package[name.split(".")[0]] += pending
+            pending = 0.0
+    return {"total_ms": sum(by_package.values()), "by_package": dict(by_package), "modules": count,
+            "error": error, "unused": unused_imports(path)}
+
+
+def profile(names=None, verbose=True):
+    """{strategy: profile_file(...)} for `names` (default every strategy in the index)."""
+    found = strategy_index.strategies()
+    names = names or sorted(found, key=str.lower)
+    baseline = baseline_modules()
+    out, by_file = {}, {}
+    for name in names:
+        rel = found[name]["file"]
+        if rel not in by_file:
+            by_file[rel] = profile_file(strategy_index.STRATEGIES_DIR / rel, baseline)
+            if verbose:
+                print(f"{name:35} {by_file[rel]['total_ms']:8.0f} ms", file=sys.stderr)
+        out[name] = dict(by_file[rel], file=rel)
+    return out
+
+
+def report(results, top=10):
+    lines = [f"{'strategy':35} {'ms':>8} {'mods':>5}  heaviest packages / unused imports"]
+    for name, r in sorted(results.items(), key=lambda kv: -kv[1]["total_ms"]):
+        heavy = sorted(r["by_package"].items(), key=lambda kv: -kv[1])[:4]
+        line = f"{name:35} {r['total_ms']:8.0f} {r['modules']:5}  " + ", ".join(f"{p} {ms:.0f}" for p, ms in heavy)
+        if r["unused"]:
+            line += " | unused: " + ", ".join(sorted(r["unused"]))
+        if r["error"]:
+            line += f" | {r['error']}"
+        lines.append(line)
+
+    # packages over all files, each file counted once
+    totals, users = defaultdict(float), defaultdict(set)
+    for r in {r["file"]: r for r in results.values()}.values():
+        for package, ms in r["by_package"].items():
+            totals[package] += ms
+            users[package].add(r["file"])
+    lines += ["", f"{'package':25} {'ms (sum)':>9} {'files':>6}"]
+    for package, ms in sorted(totals.items(), key=lambda kv: -kv[1])[:top]:
+        lines.append(f"{package:25} {ms:9.0f} {len(users[package]):6}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import cost of strategy files beyond freqtrade's own.")
+    parser.add_argument("strategies", nargs="*")
+    parser.add_argument("--top", type=int, default=10, help="packages in the summary")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = profile(args.strategies or None)
+    print(json.dumps(results, indent=1) if args.json else report(results, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Cross-exchange panel: all pairs of all exchanges for one timeframe on a common
+UTC grid, as a single (time x column x field) float64 array.
+
+Columns are "<exchange>:<pair>", e.g. "binance:BTC/USDT:USDT". Missing candles are NaN,
+files without candles get no column (okx BTC/USDT:USDT 1h is empty) - see panel.columns.
+The array is stored as .npy in cache/panel/<timeframe>/ and opened memory-mapped,
+so slicing a date range only touches those rows.
+
+    python panel_store.py --build --timeframe 1h
+    panel = Panel.load("1h")
+    close = panel.slice(pairs=["BTC/USDT:USDT", "ETH/USDT:USDT"], start="2024-01-01", fields="close")
+    panel.basis("ETH/USDT:USDT")          # binance close / okx close - 1, needs both columns
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from datafiles import (CACHE_DIR, DATA_DIR, NS_PER_SECOND, dates_to_ns, iter_data_files,
+                       load_candles, timeframe_to_seconds)
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def panel_dir(timeframe, cachedir=CACHE_DIR):
+    return Path(cachedir) / "panel" / timeframe
+
+
+def _sources(timeframe, datadir, exchanges):
+    files = []
+    for exchange, path, info in iter_data_files(datadir, exchanges=exchanges, candle_types=["futures"],
+                                                timeframes=[timeframe]):
+        files.append((f"{exchange}:{info['pair']}", path))
+    return sorted(files)
+
+
+def build_panel(timeframe, datadir=DATA_DIR, cachedir=CACHE_DIR, exchanges=None, force=False):
+    """
+    Build (or reuse) the panel for one timeframe.
+    :return: Panel
+    """
+    target = panel_dir(timeframe, cachedir)
+    sources = _sources(timeframe, datadir, exchanges)
+    mtimes = {name: path.stat().st_mtime_ns for name, path in sources}
+    meta_file = target / "meta.json"
+    if not force and meta_file.exists():
+        with open(meta_file) as f:
+            meta = json.load(f)
+        if meta.get("mtimes") == mtimes:
+            return Panel.load(timeframe, cachedir)
+
+    step = timeframe_to_seconds(timeframe) * NS_PER_SECOND
+    frames = []
+    for name, path in sources:
+        df = load_candles(path, columns=["date", *FIELDS])
+        if len(df):
+            frames.append((name, dates_to_ns(df["date"]), df))
+    if not frames:
+        raise ValueError(f"no {timeframe} futures data found")
+
+    t0 = min(ns[0] for _, ns, _ in frames)
+    t1 = max(ns[-1] for _, ns, _ in frames)
+    t0 -= t0 % step
+    rows = int((t1 - t0) // step) + 1
+    columns = [name for name, _, _ in frames]
+
+    target.mkdir(parents=True, exist_ok=True)
+    tmp = target / "values.npy.tmp"
+    values = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64,
+                                       shape=(rows, len(columns), len(FIELDS)))
+    values[:] = np.nan
+    for col, (name, ns, df) in enumerate(frames):
+        # grid position by integer arithmetic - no join
+        pos = (ns - t0) // step
+        on_grid = (ns - t0) % step == 0
+        block = df[list(FIELDS)].to_numpy(dtype=np.float64)
+        values[pos[on_grid], col, :] = block[on_grid]
+    values.flush()
+    del values
+    tmp.replace(target / "values.npy")
+
+    meta = {"timeframe": timeframe, "t0": int(t0), "step": int(step), "rows": rows,
+            "columns": columns, "fields": list(FIELDS), "mtimes": mtimes}
+    with open(meta_file, "w") as f:
+        json.dump(meta, f)
+    return Panel.load(timeframe, cachedir)
+
+
+class Panel:
+    def __init__(self, values, meta):
+        self.values = values
+        self.meta = meta
+        self.t0 = meta["t0"]
+        self.step = meta["step"]
+        self.columns = meta["columns"]
+        self.fields = meta["fields"]
+        self._col_index = {name: i for i, name in enumerate(self.columns)}
+        self._field_index = {name: i for i, name in enumerate(self.fields)}
+
+    @classmethod
+    def load(cls, timeframe, cachedir=CACHE_DIR):
+        target = panel_dir(timeframe, cachedir)
+        with open(target / "meta.json") as f:
+            meta = json.load(f)
+        return cls(np.load(target / "values.npy", mmap_mode="r"), meta)
+
+    @property
+    def dates(self):
+        return pd.to_datetime(self.t0 + np.arange(len(self.values), dtype=np.int64) * self.step, utc=True)
+
+    def row(self, date, side="left"):
+        """Grid row of a date; dates between candles round up (left) or down (right)."""
+        ts = pd.Timestamp(date)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize("UTC")
+        offset = ts.value - self.t0
+        row = offset // self.step if side == "right" else -(-offset // self.step)
+        return int(min(max(row, 0), len(self.values)))
+
+    def column_ids(self, pairs=None, exchanges=None):
+        """
+        Column positions for pairs / exchanges. A pair without exchange matches
+        on every exchange, "okx:BTC/USDT:USDT" selects one column.
+        """
+        ids = []
+        for i, name in enumerate(self.columns):
+            exchange, pair = name.split(":", 1)
+            if exchanges and exchange not in exchanges:
+                continue
+            if pairs and pair not in pairs and name not in pairs:
+                continue
+            ids.append(i)
+        return ids
+
+    def slice(self, pairs=None, start=None, end=None, fields=None, exchanges=None):
+        """
+        Sub-array (time x column x field). A date range alone is a view on the
+        memory map; selecting columns/fields copies only the selected block.
+        A single field name returns (time x column).
+        """
+        r0 = self.row(start) if start is not None else 0
+        r1 = self.row(end, side="right") + 1 if end is not None else len(self.values)
+        out = self.values[r0:r1]
+        if pairs is not None or exchanges is not None:
+            ids = self.column_ids(pairs, exchanges)
+            if ids and ids == list(range(ids[0], ids[-1] + 1)):
+                out = out[:, ids[0]:ids[-1] + 1]
+            else:
+                out = out[:, ids]
+        if isinstance(fields, str):
+            return out[:, :, self._field_index[fields]]
+        if fields is not None:
+            out = out[:, :, [self._field_index[f] for f in fields]]
+        return out
+
+    def frame(self, field="close", pairs=None, start=None, end=None, exchanges=None):
+        """One field as a DataFrame (date index, one column per exchange:pair)."""
+        ids = self.column_ids(pairs, exchanges) if pairs is not None or exchanges is not None \
+            else list(range(len(self.columns)))
+        r0 = self.row(start) if start is not None else 0
+        r1 = self.row(end, side="right") + 1 if end is not None else len(self.values)
+        data = self.values[r0:r1, ids, self._field_index[field]]
+        return pd.DataFrame(data, index=self.dates[r0:r1], columns=[self.columns[i] for i in ids])
+
+    def series(self, exchange, pair, field="close", start=None, end=None):
+        col = self._col_index.get(f"{exchange}:{pair}")
+        if col is None:
+            raise KeyError(f"{exchange}:{pair} is not in the {self.meta['timeframe']} panel")
+        r0 = self.row(start) if start is not None else 0
+        r1 = self.row(end, side="right") + 1 if end is not None else len(self.values)
+        return self.values[r0:r1, col, self._field_index[field]]
+
+    def returns_corr(self, pairs=None, start=None, end=None, exchanges=("binance",)):
+        """Correlation of close-to-close returns between columns (NaN-aware)."""
+        df = self.frame("close", pairs, start, end, exchanges)
+        return np.log(df).diff().corr(min_periods=2)
+
+    def basis(self, pair, a="binance", b="okx", start=None, end=None):
+        """close_a / close_b - 1 on the common grid."""
+        return self.series(a, pair, "close", start, end) / self.series(b, pair, "close", start, end) - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the cross-exchange panel store.")
+    parser.add_argument("--build", action="store_true")
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--timeframe", nargs="+", default=["1h"])
+    parser.add_argument("--exchange", nargs="*", default=None)
+    args = parser.parse_args()
+
+    if args.build or args.force:
+        for timeframe in args.timeframe:
+            panel = build_panel(timeframe, exchanges=args.exchange, force=args.force)
+            print(f"{timeframe}: {panel.values.shape} {panel.dates[0]} -> {panel.dates[-1]}")
+
+
+if __name__ == "__main__":
+    main()
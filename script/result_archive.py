@@ -0,0 +1,37 @@
+"""Reading the backtest-result-*.zip archives freqtrade writes and their .meta.json."""
+import json
+import zipfile
+from pathlib import Path
+
+from datafiles import USER_DATA
+
+RESULTS_DIR = USER_DATA / "backtest_results"
+
+# headline metrics copied from the strategy block of the result json
+METRICS = (
+    "total_trades", "profit_total", "profit_total_abs", "profit_mean", "profit_median",
+    "profit_factor", "winrate", "wins", "losses", "draws", "max_drawdown_account",
+    "max_relative_drawdown", "max_drawdown_abs", "sharpe", "sortino", "calmar", "cagr",
+    "expectancy", "expectancy_ratio", "sqn", "trades_per_day", "starting_balance",
+    "final_balance", "market_change",
+)
+
+
+def read_archive(zip_path):
+    """
+    :return: (result json, config dict or None, member names) of one backtest zip
+    """
+    stem = Path(zip_path).stem
+    with zipfile.ZipFile(zip_path) as zf:
+        names = zf.namelist()
+        result = json.loads(zf.read(f"{stem}.json"))
+        config = json.loads(zf.read(f"{stem}_config.json")) if f"{stem}_config.json" in names else None
+    return result, config, names
+
+
+def read_meta(zip_path):
+    meta_path = Path(zip_path).with_suffix(".meta.json")
+    if not meta_path.exists():
+        return {}
+    with open(meta_path) as f:
+        return json.load(f)
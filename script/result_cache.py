@@ -0,0 +1,420 @@
+"""
+Reuse backtest results instead of re-running identical backtests.
+
+A run is fingerprinted from
+    source     normalized strategy source (AST dump - comments, formatting and
+               docstrings don't count), the same for every helper module it imports
+               from strategies/ (incremental, mtf_features, ... and what they import),
+               plus its hyperopt params json
+    config     the effective (merged) config, minus keys that don't affect a backtest
+    data       content hashes of the data files of the whitelisted pairs and of the
+               informative assets (BTC/{stake}, ...); all files of the exchange if
+               the whitelist is empty (dynamic pairlists)
+    run        strategy, timeframe, timerange, extra cli args, freqtrade version
+
+If the fingerprint was seen before and its archive still exists, the stored
+result is returned and `freqtrade backtesting` is not started.
+
+    python result_cache.py --run mini --timeframe 1h --timerange 20240101-
+    python result_cache.py --run mini --timeframe 1h --timerange 20240101- --no-cache
+    python result_cache.py --stale
+"""
+import argparse
+import ast
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shlex
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import ftconfig
+import strategy_index
+from data_snapshot import SnapshotStore
+from datafiles import CACHE_DIR, DATA_DIR, USER_DATA, pair_to_file
+from result_catalog import RESULTS_DIR
+from result_store import ResultStore
+from strategy_index import STRATEGIES_DIR
+INDEX_PATH = CACHE_DIR / "result_cache.json"
+
+# config keys that never change a backtest result
+IGNORED_CONFIG_KEYS = ("api_server", "telegram", "bot_name", "initial_state", "internals",
+                       "$schema", "fiat_display_currency", "webhook", "discord", "db_url")
+IGNORED_EXCHANGE_KEYS = ("key", "secret", "password", "uid", "ccxt_config", "ccxt_async_config")
+
+
+def _sha(text):
+    return hashlib.sha256(text.encode() if isinstance(text, str) else text).hexdigest()
+
+
+def find_strategy_file(name, strategies_dir=STRATEGIES_DIR):
+    """File defining `class <name>(...)` under strategies/."""
+    return strategy_index.find(name, strategies_dir)
+
+
+def _strip_docstrings(tree):
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        body = node.body
+        if (body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant)
+                and isinstance(body[0].value.value, str)):
+            node.body = body[1:] or [ast.Pass()]
+    return tree
+
+
+def _ast_dump(path):
+    tree = _strip_docstrings(ast.parse(Path(path).read_text(encoding="utf-8")))
+    return ast.dump(tree, include_attributes=False)
+
+
+def _module_file(name, directory, strategies_dir):
+    """File of module `name` if it resolves inside strategies/ (next to the importer or at the top)."""
+    for base in (directory, strategies_dir):
+        for candidate in (base / f"{name}.py", base / name / "__init__.py"):
+            if candidate.is_file():
+                return candidate
+    return None
+
+
+def helper_files(path, strategies_dir=STRATEGIES_DIR):
+    """strategies/ modules a strategy file imports, directly or through other helpers."""
+    strategies_dir = Path(strategies_dir).resolve()
+    files = strategy_index.build_index(strategies_dir)["files"]
+    seen, todo = set(), [Path(path).resolve()]
+    while todo:
+        current = todo.pop()
+        try:
+            imports = files[current.relative_to(strategies_dir).as_posix()]["imports"]
+        except (KeyError, ValueError):
+            continue
+        for name in imports:
+            module = _module_file(name, current.parent, strategies_dir)
+            if module is not None and module.resolve() not in seen and module.resolve() != Path(path).resolve():
+                seen.add(module.resolve())
+                todo.append(module.resolve())
+    return sorted(seen)
+
+
+def source_fingerprint(path, strategies_dir=STRATEGIES_DIR):
+    """Hash of the normalized AST of a strategy file and its strategies/ helpers, plus its params json."""
+    path = Path(path)
+    parts = [_ast_dump(path)]
+    root = Path(strategies_dir).resolve()
+    for helper in helper_files(path, strategies_dir):
+        parts.append(f"{helper.relative_to(root).as_posix()}:{_ast_dump(helper)}")
+    params = path.with_suffix(".json")
+    if params.exists():
+        parts.append(json.dumps(json.loads(params.read_text()), sort_keys=True))
+    return _sha("\n".join(parts))
+
+
+_PAIR = re.compile(r"^([A-Za-z0-9]+)/")
+
+
+def informative_assets(strategy, path):
+    """
+    Base currencies of the informative pairs a strategy reads besides its own:
+    @informative(..., 'BTC/{stake}') assets and pair strings in informative_pairs().
+    """
+    info = strategy_index.strategies().get(strategy, {})
+    assets = {m.group(1) for i in info.get("informative", []) if (m := _PAIR.match(str(i.get("asset", ""))))}
+    tree = ast.parse(Path(path).read_text(encoding="utf-8"))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name == "informative_pairs":
+            for sub in ast.walk(node):
+                text = sub.values[0] if isinstance(sub, ast.JoinedStr) and sub.values else sub
+                if isinstance(text, ast.Constant) and isinstance(text.value, str) and (m := _PAIR.match(text.value)):
+                    assets.add(m.group(1))
+    return sorted(assets)
+
+
+def normalized_config(config):
+    config = {k: v for k, v in config.items() if k not in IGNORED_CONFIG_KEYS}
+    if isinstance(config.get("exchange"), dict):
+        config["exchange"] = {k: v for k, v in config["exchange"].items() if k not in IGNORED_EXCHANGE_KEYS}
+    return config
+
+
+def config_fingerprint(config):
+    return _sha(json.dumps(normalized_config(config), sort_keys=True))
+
+
+_file_hashes = {}
+
+
+def _file_hash(path, snapshot_files):
+    """
+    Content hash of one data file: the chunk hashes of the latest snapshot if the
+    file didn't change since, otherwise sha256 of the file (memoized per mtime).
+    """
+    stat = path.stat()
+    rel = path.relative_to(DATA_DIR).as_posix()
+    snap = snapshot_files.get(rel)
+    if snap and snap.get("mtime_ns") == stat.st_mtime_ns and snap.get("size") == stat.st_size:
+        return _sha("".join(c["hash"] for c in snap["chunks"]))
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _file_hashes:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _file_hashes[key] = h.hexdigest()
+    return _file_hashes[key]
+
+
+def data_fingerprint(config, assets=(), datadir=DATA_DIR):
+    """
+    Hash over every data file (all timeframes / candle types) of the whitelisted
+    pairs and of the `assets` (base currencies, any quote). An empty whitelist is
+    filled by a pairlist at runtime: every file of the exchange counts then.
+    """
+    exchange = config.get("exchange", {}).get("name", "binance")
+    whitelist = config.get("exchange", {}).get("pair_whitelist", [])
+    prefixes = tuple(f"{pair_to_file(p)}-" for p in whitelist) + tuple(f"{a}_" for a in assets)
+    if not whitelist:
+        prefixes = ("",)
+    latest = SnapshotStore().latest()
+    snapshot_files = latest["files"] if latest else {}
+    parts = []
+    root = Path(datadir) / exchange
+    if root.exists():
+        for path in sorted(root.rglob("*.feather")):
+            if path.name.startswith(prefixes):
+                parts.append(f"{path.relative_to(root).as_posix()}:{_file_hash(path, snapshot_files)}")
+    return _sha("\n".join(parts))
+
+
+def freqtrade_version():
+    try:
+        from importlib.metadata import version
+        return version("freqtrade")
+    except Exception:
+        return "unknown"
+
+
+def fingerprint_parts(strategy, timeframe, timerange, configs=("config.json",), extra_args="", params=None):
+    config = ftconfig.deep_merge(ftconfig.load_config(*configs), params or {})
+    path = find_strategy_file(strategy)
+    return {
+        "source": source_fingerprint(path),
+        "config": config_fingerprint(config),
+        "data": data_fingerprint(config, informative_assets(strategy, path)),
+        "run": _sha(json.dumps([strategy, timeframe, timerange, extra_args, freqtrade_version()])),
+    }
+
+
+def combine(parts):
+    return _sha(json.dumps(parts, sort_keys=True))
+
+
+def load_index(path=INDEX_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index(index, path=INDEX_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # several batch processes may save at once
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=1)
+    tmp.replace(path)
+
+
+@contextmanager
+def index_lock(path=INDEX_PATH):
+    """Exclusive lock for a load_index / save_index read-modify-write across processes."""
+    lock = Path(path).with_name(Path(path).name + ".lock")
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock, "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def latest_result(results_dir=RESULTS_DIR):
+    """Archive name freqtrade wrote last (from .last_result.json)."""
+    try:
+        with open(Path(results_dir) / ".last_result.json") as f:
+            return json.load(f).get("latest_backtest")
+    except (OSError, ValueError):
+        return None
+
+
+def _archive_exists(archive):
+    """In backtest_results/ or compacted into the result store."""
+    return (RESULTS_DIR / archive).exists() or ResultStore().has_archive(archive)
+
+
+def backtest_args(strategy, timeframe, timerange, configs, extra_args=""):
+    """freqtrade command line arguments of one backtest (without the `freqtrade`)."""
+    args = ["backtesting", "--userdir", str(USER_DATA)]
+    for c in configs:
+        args += ["--config", str(c if Path(c).is_absolute() else USER_DATA / c)]
+    args += ["--strategy", strategy, "--timeframe", timeframe, f"--timerange={timerange}"]
+    return args + shlex.split(extra_args)
+
+
+def backtest_command(strategy, timeframe, timerange, configs, extra_args=""):
+    return " ".join(shlex.quote(c) for c in ["freqtrade"] + backtest_args(strategy, timeframe, timerange,
+                                                                          configs, extra_args))
+
+
+def backtest(strategy, timeframe, timerange, configs=("config.json",), extra_args="", bypass=False,
+             params=None, staging_dir=None, runner=None):
+    """
+    Run a backtest, or return the archive of an identical earlier run.
+    Runs on the backtest worker (backtest_worker.py) if one is up.
+    :param bypass: always run freqtrade (the new result replaces the cached one)
+    :param params: config overrides on top of `configs`
+    :param staging_dir: let freqtrade write there and move the archive to backtest_results/
+                        afterwards - parallel runs can't mix up .last_result.json then
+    :param runner: callable(strategy, timeframe, timerange, configs, extra_args, params, export_dir)
+                   returning the archive name; default: the worker if one is up, else the cli
+    :return: archive file name in backtest_results/ (or None if the run failed)
+    """
+    import backtest_worker  # imports this module
+
+    parts = fingerprint_parts(strategy, timeframe, timerange, configs, extra_args, params)
+    key = combine(parts)
+    index = load_index()
+    entry = index.get(key)
+    if entry and not bypass and _archive_exists(entry["archive"]):
+        print(f"cache hit: {strategy} {timeframe} {timerange} -> {entry['archive']} "
+              f"(from {time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['created']))})")
+        return entry["archive"]
+
+    export_dir = Path(staging_dir) if staging_dir else RESULTS_DIR
+    before = latest_result(export_dir)
+    if runner is None:
+        runner = backtest_worker.backtest if backtest_worker.available() else run_cli
+    archive = runner(strategy, timeframe, timerange, configs, extra_args, params,
+                     export_dir if staging_dir else None)
+    if archive and archive != before:
+        if staging_dir:
+            archive = publish_archive(export_dir, archive)
+        with index_lock():
+            index = load_index()  # may have changed while freqtrade ran
+            index[key] = {"archive": archive, "strategy": strategy, "timeframe": timeframe,
+                          "timerange": timerange, "configs": list(configs), "extra_args": extra_args,
+                          "params": params or {}, "parts": parts, "created": int(time.time())}
+            save_index(index)
+    return archive
+
+
+def publish_archive(src_dir, archive, results_dir=RESULTS_DIR):
+    """
+    Move an archive (and its .meta.json) into backtest_results/. If the name is
+    taken (two runs finished in the same second) it gets the next free second.
+    Names are claimed with O_EXCL, so parallel publishers never pick the same one.
+    :return: the archive name in results_dir
+    """
+    src, results_dir = Path(src_dir) / archive, Path(results_dir)
+    stem = src.stem
+    stamp = datetime.strptime(stem[len("backtest-result-"):], "%Y-%m-%d_%H-%M-%S")
+    results_dir.mkdir(parents=True, exist_ok=True)
+    target = results_dir / archive
+    while True:
+        try:
+            os.close(os.open(target, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            stamp += timedelta(seconds=1)
+            target = results_dir / f"backtest-result-{stamp:%Y-%m-%d_%H-%M-%S}.zip"
+    # the claimed (empty) file is replaced by the archive
+    if target.name == archive:
+        src.replace(target)
+    else:
+        # members are named after the archive
+        tmp = target.with_name(target.name + ".tmp")
+        with zipfile.ZipFile(src) as zin, zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zout:
+            for name in zin.namelist():
+                zout.writestr(target.stem + name[len(stem):] if name.startswith(stem) else name, zin.read(name))
+        tmp.replace(target)
+        src.unlink()
+    meta = src.with_suffix(".meta.json")
+    if meta.exists():
+        meta.replace(target.with_suffix(".meta.json"))
+    with open(results_dir / ".last_result.json", "w") as f:
+        json.dump({"latest_backtest": target.name}, f)
+    return target.name
+
+
+def params_config(params):
+    """Config overrides as a json file to pass as the last --config."""
+    override = CACHE_DIR / f"params-{_sha(json.dumps(params, sort_keys=True))[:12]}.json"
+    override.parent.mkdir(parents=True, exist_ok=True)
+    override.write_text(json.dumps(params))
+    return override
+
+
+def run_cli(strategy, timeframe, timerange, configs, extra_args="", params=None, export_dir=None):
+    """`freqtrade backtesting` in a subprocess, params go in as one more --config."""
+    configs = list(configs)
+    if params:
+        configs.append(params_config(params))
+    if export_dir:
+        extra_args = f"{extra_args} --export-directory {shlex.quote(str(export_dir))}".strip()
+    cmd = backtest_command(strategy, timeframe, timerange, configs, extra_args)
+    print(cmd)
+    if os.system(cmd) != 0:
+        return None
+    return latest_result(export_dir or RESULTS_DIR)
+
+
+def stale_report():
+    """
+    For every cached result: which fingerprint parts changed since it was made.
+    :return: list of dicts (archive, strategy, timeframe, timerange, status, changed)
+    """
+    report = []
+    for key, entry in load_index().items():
+        row = {k: entry[k] for k in ("archive", "strategy", "timeframe", "timerange")}
+        if not _archive_exists(entry["archive"]):
+            row.update(status="missing", changed=[])
+        else:
+            try:
+                now = fingerprint_parts(entry["strategy"], entry["timeframe"], entry["timerange"],
+                                        entry["configs"], entry.get("extra_args", ""), entry.get("params"))
+            except (FileNotFoundError, SyntaxError) as e:
+                row.update(status="error", changed=[str(e)])
+                report.append(row)
+                continue
+            changed = [p for p in now if now[p] != entry["parts"].get(p)]
+            row.update(status="stale" if changed else "fresh", changed=changed)
+        report.append(row)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest result cache.")
+    parser.add_argument("--run", metavar="STRATEGY")
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--timerange", default="20240101-")
+    parser.add_argument("--config", nargs="+", default=["config.json"])
+    parser.add_argument("--no-cache", action="store_true", help="always run freqtrade")
+    parser.add_argument("--stale", action="store_true", help="show which cached results are out of date")
+    args = parser.parse_args()
+
+    if args.run:
+        backtest(args.run, args.timeframe, args.timerange, args.config, bypass=args.no_cache)
+    if args.stale:
+        for r in stale_report():
+            print(f"{r['status']:8} {r['strategy']:20} {r['timeframe']:4} {r['timerange']:18} "
+                  f"{r['archive']:45} {','.join(r['changed'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+SQLite catalog over backtest_results/.
+
+Every backtest-result-*.zip is opened and parsed once; run id, strategy, config,
+timerange and the headline metrics of each strategy in it go into
+cache/backtest_catalog.sqlite. Later ingests only look at new or changed files.
+
+    python result_catalog.py --ingest
+    python result_catalog.py --best --strategy raindow --timeframe 1h --metric profit_total
+"""
+import argparse
+import json
+import sqlite3
+import time
+import zipfile
+from pathlib import Path
+
+from datafiles import CACHE_DIR
+from result_archive import METRICS, RESULTS_DIR, read_archive, read_meta
+from result_store import STORE_DIR, ResultStore, stored_archives
+
+CATALOG_PATH = CACHE_DIR / "backtest_catalog.sqlite"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS archives (
+    filename TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER,
+    ingested_at INTEGER
+);
+CREATE TABLE IF NOT EXISTS runs (
+    filename TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    run_id TEXT,
+    timeframe TEXT,
+    timeframe_detail TEXT,
+    timerange TEXT,
+    backtest_start_ts INTEGER,
+    backtest_end_ts INTEGER,
+    backtest_run_start_ts INTEGER,
+    trading_mode TEXT,
+    stake_currency TEXT,
+    max_open_trades INTEGER,
+    pairlist TEXT,
+    config TEXT,
+    {", ".join(f"{m} REAL" for m in METRICS)},
+    PRIMARY KEY (filename, strategy)
+);
+CREATE INDEX IF NOT EXISTS runs_strategy ON runs (strategy, timeframe);
+CREATE INDEX IF NOT EXISTS runs_run_id ON runs (run_id);
+"""
+
+
+def connect(path=CATALOG_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def run_rows(filename, result, config, meta):
+    """One catalog row per strategy in a result file."""
+    rows = []
+    for strategy, data in result.get("strategy", {}).items():
+        row = {
+            "filename": filename,
+            "strategy": strategy,
+            "run_id": meta.get(strategy, {}).get("run_id"),
+            "timeframe": data.get("timeframe"),
+            "timeframe_detail": data.get("timeframe_detail"),
+            "timerange": data.get("timerange"),
+            "backtest_start_ts": data.get("backtest_start_ts"),
+            "backtest_end_ts": data.get("backtest_end_ts"),
+            "backtest_run_start_ts": data.get("backtest_run_start_ts"),
+            "trading_mode": data.get("trading_mode"),
+            "stake_currency": data.get("stake_currency"),
+            "max_open_trades": data.get("max_open_trades"),
+            "pairlist": json.dumps(data.get("pairlist", [])),
+            "config": json.dumps(config) if config is not None else None,
+        }
+        for m in METRICS:
+            value = data.get(m)
+            row[m] = float(value) if _is_number(value) else None
+        rows.append(row)
+    return rows
+
+
+def _is_number(value):
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def ingest(results_dir=RESULTS_DIR, catalog=CATALOG_PATH, verbose=True, store_dir=STORE_DIR):
+    """
+    Add new or changed archives to the catalog.
+    :return: number of archives parsed
+    """
+    conn = connect(catalog)
+    known = {r["filename"]: (r["mtime_ns"], r["size"]) for r in conn.execute("SELECT * FROM archives")}
+    parsed = 0
+    for zip_path in sorted(Path(results_dir).glob("backtest-result-*.zip")):
+        stat = zip_path.stat()
+        if known.get(zip_path.name) == (stat.st_mtime_ns, stat.st_size):
+            continue
+        start = time.perf_counter()
+        try:
+            result, config, _ = read_archive(zip_path)
+        except (KeyError, ValueError, zipfile.BadZipFile) as e:
+            print(f"skip {zip_path.name}: {e}")
+            continue
+        rows = run_rows(zip_path.name, result, config, read_meta(zip_path))
+        with conn:
+            conn.execute("DELETE FROM runs WHERE filename = ?", (zip_path.name,))
+            for row in rows:
+                cols = ", ".join(row)
+                conn.execute(f"INSERT INTO runs ({cols}) VALUES ({', '.join('?' * len(row))})",
+                             tuple(row.values()))
+            conn.execute("INSERT OR REPLACE INTO archives VALUES (?, ?, ?, ?)",
+                         (zip_path.name, stat.st_mtime_ns, stat.st_size, int(time.time())))
+        parsed += 1
+        if verbose:
+            print(f"ingested {zip_path.name} ({', '.join(r['strategy'] for r in rows)}) "
+                  f"{time.perf_counter() - start:.2f}s")
+    # archives compacted into the result store (result_store.py) stay listed, only those
+    # not in the catalog yet are read (compacting keeps the name)
+    on_disk = {p.name for p in Path(results_dir).glob("backtest-result-*.zip")}
+    stored = set(ResultStore(store_dir).archives())
+    new = stored - set(known) - on_disk
+    for filename, result, config, meta in (stored_archives(store_dir, new) if new else ()):
+        rows = run_rows(filename, result, config, meta)
+        with conn:
+            for row in rows:
+                conn.execute(f"INSERT INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                             tuple(row.values()))
+            conn.execute("INSERT OR REPLACE INTO archives VALUES (?, ?, ?, ?)",
+                         (filename, 0, 0, int(time.time())))
+        parsed += 1
+        if verbose:
+            print(f"ingested {filename} from the result store")
+    # archives that were deleted from disk
+    present = on_disk | stored
+    with conn:
+        for filename in set(known) - present:
+            conn.execute("DELETE FROM runs WHERE filename = ?", (filename,))
+            conn.execute("DELETE FROM archives WHERE filename = ?", (filename,))
+    conn.close()
+    return parsed
+
+
+def best_runs(strategy=None, timeframe=None, metric="profit_total", limit=10, ascending=False,
+              min_trades=0, catalog=CATALOG_PATH):
+    """Top runs by one metric, optionally filtered by strategy / timeframe."""
+    if metric not in METRICS:
+        raise ValueError(f"unknown metric {metric}, use one of {', '.join(METRICS)}")
+    where, params = ["total_trades >= ?"], [min_trades]
+    if strategy:
+        where.append("strategy = ?")
+        params.append(strategy)
+    if timeframe:
+        where.append("timeframe = ?")
+        params.append(timeframe)
+    order = "ASC" if ascending else "DESC"
+    conn = connect(catalog)
+    rows = conn.execute(
+        f"SELECT filename, strategy, run_id, timeframe, timerange, total_trades, profit_total, "
+        f"max_drawdown_account, sharpe, {metric} AS metric FROM runs WHERE {' AND '.join(where)} "
+        f"AND {metric} IS NOT NULL ORDER BY {metric} {order} LIMIT ?", (*params, limit)).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog of backtest result archives.")
+    parser.add_argument("--ingest", action="store_true")
+    parser.add_argument("--best", action="store_true")
+    parser.add_argument("--strategy", default=None)
+    parser.add_argument("--timeframe", default=None)
+    parser.add_argument("--metric", default="profit_total")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--min-trades", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.ingest:
+        print(f"{ingest()} archive(s) ingested")
+    if args.best:
+        start = time.perf_counter()
+        rows = best_runs(args.strategy, args.timeframe, args.metric, args.limit, min_trades=args.min_trades)
+        for r in rows:
+            print(f"{r['filename']:45} {r['strategy']:20} {r['timeframe']:4} {r['timerange'] or '':18} "
+                  f"trades={int(r['total_trades'] or 0):>5} profit={r['profit_total'] or 0:8.2%} "
+                  f"{args.metric}={r['metric']:.4f}")
+        print(f"{len(rows)} row(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
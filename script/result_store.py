@@ -0,0 +1,408 @@
+"""
+Compact old backtest archives into one partitioned columnar store.
+
+backtest_results/ keeps every zip freqtrade writes, most of them near identical
+tuning runs of mini / advanced. `compact` moves archives older than a few days to
+    backtest_store/runs.feather                          one row per unique run
+    backtest_store/aliases.feather                       (archive, strategy) -> run
+    backtest_store/trades/strategy=<name>/<run>.feather  trades (TRADE_SCHEMA + raw json)
+    backtest_store/blobs/<hash[:2]>/<hash>               config / market change / strategy source
+A run is identified by its content (result without the run start / end time,
+plus config), so repeated identical backtests are stored once. Nothing is lost:
+`restore` writes the original archive back with identical json content.
+
+The retention policy keeps the best N runs per strategy (by a catalog metric)
+plus every run seen in the last K days and drops the rest from the store.
+
+backtest_store/ is committed like backtest_results/: `compact` deletes zips
+that are tracked in git, so commit the store together with their removal or
+the runs exist on one machine only (don't add it to .gitignore).
+
+    python result_store.py --compact --older-than 14
+    python result_store.py --retain --keep-best 5 --keep-days 30 --metric profit_total --dry-run
+    python result_store.py --restore backtest-result-2025-04-22_22-45-13.zip
+"""
+import argparse
+import hashlib
+import json
+import time
+import zipfile
+import zlib
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+
+from datafiles import USER_DATA
+from result_archive import METRICS, RESULTS_DIR, read_archive, read_meta
+from trade_extract import TRADE_SCHEMA, trade_record
+
+STORE_DIR = USER_DATA / "backtest_store"
+
+# per-execution fields, everything else of a strategy result is deterministic
+VOLATILE_KEYS = ("backtest_run_start_ts", "backtest_run_end_ts")
+STORE_TRADE_SCHEMA = TRADE_SCHEMA.append(pa.field("raw", pa.large_string()))
+
+RETENTION = {"keep_best": 5, "keep_days": 30, "metric": "profit_total"}
+
+
+def _sha(data):
+    return hashlib.sha256(data.encode() if isinstance(data, str) else data).hexdigest()
+
+
+def run_key(block, config):
+    """Content id of one strategy result (trades included, run times excluded)."""
+    block = {k: v for k, v in block.items() if k not in VOLATILE_KEYS}
+    return _sha(json.dumps([block, config], sort_keys=True))[:24]
+
+
+def archive_time(zip_path):
+    """When freqtrade wrote an archive (from its meta file, falls back to mtime)."""
+    starts = [m.get("backtest_start_time") for m in read_meta(zip_path).values()]
+    starts = [s for s in starts if s]
+    return min(starts) if starts else int(Path(zip_path).stat().st_mtime)
+
+
+class ResultStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+        self.trades_dir = self.root / "trades"
+        self.blobs_dir = self.root / "blobs"
+        self.runs = self._read("runs")
+        self.aliases = self._read("aliases")
+
+    def _read(self, name):
+        path = self.root / f"{name}.feather"
+        return pd.read_feather(path) if path.exists() else pd.DataFrame()
+
+    def _write(self, name, df):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{name}.feather"
+        tmp = path.with_name(path.name + ".tmp")
+        df.reset_index(drop=True).to_feather(tmp, compression="zstd")
+        tmp.replace(path)
+
+    def save(self):
+        self._write("runs", self.runs)
+        self._write("aliases", self.aliases)
+
+    def trades_file(self, strategy, key):
+        return self.trades_dir / f"strategy={strategy}" / f"{key}.feather"
+
+    def archives(self):
+        return sorted(set(self.aliases["filename"])) if len(self.aliases) else []
+
+    def has_archive(self, filename):
+        return filename in self.archives()
+
+    def run_key_of(self, filename, strategy):
+        if not len(self.aliases):
+            return None
+        hit = self.aliases[(self.aliases["filename"] == filename) & (self.aliases["strategy"] == strategy)]
+        return hit["run_key"].iloc[0] if len(hit) else None
+
+    # ---- compaction
+
+    def blob_file(self, digest):
+        return self.blobs_dir / digest[:2] / digest
+
+    def _put_members(self, zip_path, names):
+        """
+        Every member except the result json, each stored once by content.
+        :return: {member name without the archive stem: hash}
+        """
+        stem = Path(zip_path).stem
+        members = {}
+        with zipfile.ZipFile(zip_path) as zf:
+            for name in names:
+                if name == f"{stem}.json":
+                    continue
+                data = zf.read(name)
+                digest = _sha(data)
+                path = self.blob_file(digest)
+                if not path.exists():
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp = path.with_name(path.name + ".tmp")
+                    tmp.write_bytes(zlib.compress(data))
+                    tmp.replace(path)
+                members[name[len(stem):]] = digest
+        return members
+
+    def _put_trades(self, strategy, key, trades):
+        path = self.trades_file(strategy, key)
+        if path.exists():
+            return
+        records = [dict(trade_record(t), raw=json.dumps(t)) for t in trades]
+        table = pa.Table.from_pylist(records, schema=STORE_TRADE_SCHEMA)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        feather.write_feather(table, tmp, compression="zstd")
+        tmp.replace(path)
+
+    def add_archive(self, zip_path):
+        """
+        Put one archive into the store (does not save the tables, see compact).
+        :return: list of (strategy, run key, new run?)
+        """
+        zip_path = Path(zip_path)
+        result, config, names = read_archive(zip_path)
+        meta = read_meta(zip_path)
+        members = json.dumps(self._put_members(zip_path, names))
+        comparison = {c.get("key"): c for c in result.get("strategy_comparison", [])}
+        known = set(self.runs["run_key"]) if len(self.runs) else set()
+        runs, aliases, out = [], [], []
+        for position, (strategy, block) in enumerate(result.get("strategy", {}).items()):
+            key = run_key(block, config)
+            new = key not in known
+            if new:
+                self._put_trades(strategy, key, block.get("trades", []))
+                row = {"run_key": key, "strategy": strategy,
+                       # volatile keys stay in (values of the first archive) to keep the key order
+                       "result": json.dumps({k: v for k, v in block.items() if k != "trades"}),
+                       "config": json.dumps(config)}
+                for col in ("timeframe", "timerange", "backtest_start_ts", "backtest_end_ts"):
+                    row[col] = block.get(col)
+                for m in METRICS:
+                    value = block.get(m)
+                    row[m] = float(value) if isinstance(value, (int, float)) else None
+                runs.append(row)
+                known.add(key)
+            aliases.append({
+                "filename": zip_path.name, "strategy": strategy, "run_key": key, "position": position,
+                "volatile": json.dumps({k: block[k] for k in VOLATILE_KEYS if k in block}),
+                "comparison": json.dumps(comparison.get(strategy)),
+                "meta": json.dumps(meta.get(strategy)),
+                "run_start": int(block.get("backtest_run_start_ts") or archive_time(zip_path)),
+                "members": members, "stem": zip_path.stem,
+            })
+            out.append((strategy, key, new))
+        if len(self.aliases):
+            self.aliases = self.aliases[self.aliases["filename"] != zip_path.name]
+        self.runs = pd.concat([self.runs, pd.DataFrame(runs)], ignore_index=True) if runs else self.runs
+        self.aliases = pd.concat([self.aliases, pd.DataFrame(aliases)], ignore_index=True)
+        return out
+
+    # ---- reading back
+
+    def result_json(self, filename):
+        """The result json of a stored archive, as freqtrade wrote it."""
+        rows = self.aliases[self.aliases["filename"] == filename].sort_values("position")
+        if not len(rows):
+            raise KeyError(f"{filename} is not in the store")
+        runs = self.runs.set_index("run_key")
+        strategies, comparison = {}, []
+        for a in rows.itertuples():
+            block = {"trades": self.raw_trades(a.strategy, a.run_key)}
+            block.update(json.loads(runs.at[a.run_key, "result"]))
+            block.update(json.loads(a.volatile))
+            strategies[a.strategy] = block
+            if a.comparison != "null":
+                comparison.append(json.loads(a.comparison))
+        return {"strategy": strategies, "strategy_comparison": comparison}
+
+    def raw_trades(self, strategy, key):
+        table = feather.read_table(self.trades_file(strategy, key), columns=["raw"])
+        return [json.loads(t) for t in table.column("raw").to_pylist()]
+
+    def config(self, filename):
+        row = self.aliases[self.aliases["filename"] == filename].iloc[0]
+        return json.loads(self.runs.set_index("run_key").at[row["run_key"], "config"])
+
+    def members(self, filename):
+        """{suffix: hash} of the extra members of a stored archive."""
+        return json.loads(self.aliases[self.aliases["filename"] == filename]["members"].iloc[0])
+
+    def member(self, filename, suffix):
+        """Extra archive member by suffix, e.g. '_market_change.feather'."""
+        return zlib.decompress(self.blob_file(self.members(filename)[suffix]).read_bytes())
+
+    def restore(self, filename, results_dir=RESULTS_DIR):
+        """Write an archive (and its .meta.json) back to backtest_results/."""
+        rows = self.aliases[self.aliases["filename"] == filename]
+        stem = rows["stem"].iloc[0]
+        Path(results_dir).mkdir(parents=True, exist_ok=True)
+        target = Path(results_dir) / filename
+        tmp = target.with_name(target.name + ".tmp")
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(f"{stem}.json", json.dumps(self.result_json(filename)))
+            for suffix in self.members(filename):
+                zf.writestr(f"{stem}{suffix}", self.member(filename, suffix))
+        tmp.replace(target)
+        meta = {r.strategy: json.loads(r.meta) for r in rows.itertuples() if r.meta != "null"}
+        if meta:
+            with open(target.with_suffix(".meta.json"), "w") as f:
+                json.dump(meta, f)
+        return target
+
+    def verify(self, zip_path):
+        """True if the stored copy of an archive has the same result json and members."""
+        zip_path = Path(zip_path)
+        result, config, names = read_archive(zip_path)
+        if result != self.result_json(zip_path.name) or config != self.config(zip_path.name):
+            return False
+        with zipfile.ZipFile(zip_path) as zf:
+            return all(self.member(zip_path.name, n[len(zip_path.stem):]) == zf.read(n)
+                       for n in names if n != f"{zip_path.stem}.json")
+
+    def read_trades(self, strategies=None, run_keys=None, columns=None):
+        """Trades of many stored runs at once (hive partitioned by strategy)."""
+        if not self.trades_dir.exists():
+            return STORE_TRADE_SCHEMA.empty_table().to_pandas()
+        dataset = ds.dataset(self.trades_dir, format="ipc", partitioning="hive")
+        expr = None
+        if strategies:
+            expr = ds.field("strategy").isin(list(strategies))
+        if run_keys:
+            files = [str(self.trades_file(s, k)) for s, k in
+                     self.runs[self.runs["run_key"].isin(run_keys)][["strategy", "run_key"]].itertuples(index=False)]
+            dataset = ds.dataset(files, format="ipc", partitioning="hive",
+                                 partition_base_dir=str(self.trades_dir))
+        return dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+    def run_trades(self, filename, strategy, columns=None):
+        """Trades of one stored run, like trade_extract.read_trades."""
+        key = self.run_key_of(filename, strategy)
+        if key is None:
+            raise KeyError(f"{filename} / {strategy} is not in the store")
+        table = feather.read_table(self.trades_file(strategy, key), memory_map=True)
+        missing = [c for c in (columns or TRADE_SCHEMA.names) if c not in table.column_names]
+        if missing:
+            # stored before the column was added to TRADE_SCHEMA, rebuild it from the raw json
+            records = [trade_record(json.loads(raw)) for raw in table.column("raw").to_pylist()]
+            derived = pa.Table.from_pylist(records, schema=TRADE_SCHEMA)
+            for name in missing:
+                table = table.append_column(derived.schema.field(name), derived.column(name))
+        return (table if columns is None else table.select(columns)).to_pandas()
+
+    # ---- retention
+
+    def retained(self, keep_best=RETENTION["keep_best"], keep_days=RETENTION["keep_days"],
+                 metric=RETENTION["metric"], now=None):
+        """Run keys the policy keeps: best `keep_best` per strategy plus anything seen in `keep_days`."""
+        if not len(self.runs):
+            return set()
+        now = now or time.time()
+        last_seen = self.aliases.groupby("run_key")["run_start"].max()
+        recent = set(last_seen[last_seen >= now - keep_days * 86400].index)
+        ranked = self.runs.sort_values(metric, ascending=False, na_position="last")
+        best = set(ranked.groupby("strategy").head(keep_best)["run_key"])
+        return best | recent
+
+    def apply_retention(self, dry_run=False, **policy):
+        """
+        Drop runs outside the retention policy (trades, rows, unused blobs).
+        :return: DataFrame of the dropped runs
+        """
+        keep = self.retained(**policy)
+        dropped = self.runs[~self.runs["run_key"].isin(keep)] if len(self.runs) else self.runs
+        if dry_run or not len(dropped):
+            return dropped
+        for r in dropped.itertuples():
+            self.trades_file(r.strategy, r.run_key).unlink(missing_ok=True)
+        self.runs = self.runs[self.runs["run_key"].isin(keep)]
+        self.aliases = self.aliases[self.aliases["run_key"].isin(keep)]
+        used = {h for m in self.aliases["members"] for h in json.loads(m).values()}
+        for path in self.blobs_dir.glob("*/*"):
+            if path.name not in used:
+                path.unlink()
+        self.save()
+        return dropped
+
+
+def compact(older_than_days=RETENTION["keep_days"], delete=True, results_dir=RESULTS_DIR,
+            store_dir=STORE_DIR, verbose=True):
+    """
+    Move archives older than `older_than_days` into the store. An archive is only
+    deleted after its stored copy verified equal.
+    :return: list of compacted archive names
+    """
+    store = ResultStore(store_dir)
+    cutoff = time.time() - older_than_days * 86400
+    done = []
+    for zip_path in sorted(Path(results_dir).glob("backtest-result-*.zip")):
+        if archive_time(zip_path) >= cutoff:
+            continue
+        try:
+            runs = store.add_archive(zip_path)
+        except (KeyError, ValueError, zipfile.BadZipFile) as e:
+            print(f"skip {zip_path.name}: {e}")
+            continue
+        if not store.verify(zip_path):
+            raise RuntimeError(f"stored copy of {zip_path.name} differs, archive kept")
+        done.append(zip_path.name)
+        if verbose:
+            print(f"{zip_path.name}: " + ", ".join(f"{s}={k[:8]}{'' if new else ' (duplicate)'}"
+                                                   for s, k, new in runs))
+    store.save()
+    if delete:
+        for name in done:
+            (Path(results_dir) / name).unlink()
+            (Path(results_dir) / name).with_suffix(".meta.json").unlink(missing_ok=True)
+    return done
+
+
+def stored_archives(store_dir=STORE_DIR, filenames=None):
+    """
+    (filename, result json without trades, config, meta) of every stored archive -
+    what result_catalog needs to keep listing compacted runs.
+    :param filenames: only these archives (the others aren't parsed)
+    """
+    store = ResultStore(store_dir)
+    aliases = store.aliases
+    if len(aliases) and filenames is not None:
+        aliases = aliases[aliases["filename"].isin(list(filenames))]
+    if not len(aliases):
+        return
+    runs = store.runs.set_index("run_key")
+    for filename, rows in aliases.sort_values("position").groupby("filename", sort=True):
+        strategies, meta, config = {}, {}, None
+        for a in rows.itertuples():
+            block = json.loads(runs.at[a.run_key, "result"])
+            block.update(json.loads(a.volatile))
+            strategies[a.strategy] = block
+            if a.meta != "null":
+                meta[a.strategy] = json.loads(a.meta)
+            config = json.loads(runs.at[a.run_key, "config"])
+        yield filename, {"strategy": strategies}, config, meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar store and retention for backtest results.")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--older-than", type=float, default=RETENTION["keep_days"], help="days")
+    parser.add_argument("--keep-archives", action="store_true", help="don't delete compacted zips")
+    parser.add_argument("--retain", action="store_true", help="apply the retention policy")
+    parser.add_argument("--keep-best", type=int, default=RETENTION["keep_best"])
+    parser.add_argument("--keep-days", type=float, default=RETENTION["keep_days"])
+    parser.add_argument("--metric", default=RETENTION["metric"], choices=METRICS)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--restore", nargs="+", metavar="ARCHIVE")
+    parser.add_argument("--list", action="store_true")
+    args = parser.parse_args()
+
+    if args.compact:
+        done = compact(args.older_than, delete=not args.keep_archives)
+        print(f"{len(done)} archive(s) compacted")
+    if args.retain:
+        dropped = ResultStore().apply_retention(args.dry_run, keep_best=args.keep_best,
+                                                keep_days=args.keep_days, metric=args.metric)
+        for r in dropped.itertuples():
+            print(f"{'would drop' if args.dry_run else 'dropped'} {r.strategy:20} {r.run_key[:8]} "
+                  f"{args.metric}={getattr(r, args.metric)}")
+    if args.restore:
+        store = ResultStore()
+        for name in args.restore:
+            print(f"restored {store.restore(name)}")
+    if args.list:
+        store = ResultStore()
+        counts = store.aliases.groupby("run_key").size() if len(store.aliases) else {}
+        for r in store.runs.itertuples():
+            print(f"{r.run_key[:8]} {r.strategy:20} {r.timeframe:4} {r.timerange or '':18} "
+                  f"trades={int(r.total_trades or 0):>5} profit={r.profit_total or 0:8.2%} "
+                  f"archives={counts.get(r.run_key, 0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Compare a strategy's custom_stoploss_vector (strategies/vector_stoploss.py)
+with freqtrade's own per-candle stoploss handling.
+
+A trade is opened every `--every` candles. Each one is walked candle by candle
+through freqtrade's ft_stoploss_reached on a LocalTrade (custom_stoploss called
+once per candle, as backtesting does) and its close rate taken from
+Backtesting._get_close_rate_for_stoploss; stoploss_exits evaluates all trades
+as arrays, and the walk is repeated with PathStoploss installed (the per-trade
+blocks a backtest uses). Exit candle, stop, close rate and exit type must be
+identical in all three.
+
+Without --pair the candles are a seeded random walk (the regression fixture:
+trending, choppy and gapping stretches, prices on a 0.01 tick).
+
+    python stoploss_check.py BigZ04_TSL4
+    python stoploss_check.py BigZ04_TSL3 --every 3 --fee 0.001 --tick 0
+    python stoploss_check.py BigZ04_TSL4 --pair BTC/USDT:USDT --exchange binance --timeframe 5m
+"""
+import argparse
+import importlib.util
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from datafiles import candle_path, load_candles
+from strategy_index import STRATEGIES_DIR, find
+
+sys.path.append(str(STRATEGIES_DIR))
+
+FIXTURE_CANDLES = 20000
+FIXTURE_SEED = 7
+TICK_SIZE = 4
+
+
+def fixture(n=FIXTURE_CANDLES, seed=FIXTURE_SEED, tick=0.01, timeframe="5m"):
+    """Seeded 5m candles with trending, choppy and gapping stretches."""
+    rng = np.random.default_rng(seed)
+    drift = np.repeat(rng.normal(0, 0.0008, n // 500 + 1), 500)[:n]
+    vol = np.repeat(rng.uniform(0.001, 0.006, n // 300 + 1), 300)[:n]
+    returns = drift + rng.normal(0, 1, n) * vol
+    gap = rng.random(n) < 0.002  # opens below the stop
+    returns[gap] -= 0.04
+    close = 100 * np.exp(np.cumsum(returns))
+    open_ = np.r_[100.0, close[:-1]] * np.where(gap, 0.96, 1.0)
+    high = np.maximum(open_, close) * (1 + rng.exponential(0.002, n))
+    low = np.minimum(open_, close) * (1 - rng.exponential(0.002, n))
+    prices = {"open": open_, "high": high, "low": low, "close": close}
+    if tick:
+        decimals = max(-int(np.floor(np.log10(tick))), 0)
+        prices = {k: np.round(np.round(v / tick) * tick, decimals) for k, v in prices.items()}
+    return pd.DataFrame({"date": pd.date_range("2024-01-01", periods=n, freq=pd.Timedelta(timeframe), tz="UTC"),
+                         **prices, "volume": rng.uniform(1, 10, n)})
+
+
+def load_strategy(name):
+    from freqtrade.enums import RunMode
+
+    spec = importlib.util.spec_from_file_location(name, find(name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    strategy = getattr(module, name)({"runmode": RunMode.BACKTEST, "stake_currency": "USDT", "dry_run": True})
+    if not hasattr(strategy, "custom_stoploss_vector"):
+        raise SystemExit(f"{name} has no custom_stoploss_vector")
+    return strategy
+
+
+def per_candle(strategy, dataframe, entries, fee, tick):
+    """freqtrade's path: one ft_stoploss_reached (-> custom_stoploss) per trade and candle."""
+    from freqtrade.enums import ExitType, TradingMode
+    from freqtrade.optimize.backtesting import Backtesting, DATE_IDX, HIGH_IDX, LOW_IDX, OPEN_IDX
+    from freqtrade.persistence import LocalTrade
+
+    columns = ["date", "open", "high", "low", "close"]
+    rows = list(dataframe[columns].itertuples(index=False, name=None))
+    dates = [d.to_pydatetime() for d in dataframe["date"]]
+    backtesting = SimpleNamespace(strategy=strategy)
+    out = []
+    for entry in entries:
+        open_rate = rows[entry][OPEN_IDX]
+        trade = LocalTrade(pair="CHECK/USDT", open_rate=open_rate, open_rate_requested=open_rate,
+                           open_date=dates[entry], amount=100 / open_rate, stake_amount=100.0,
+                           fee_open=fee, fee_close=fee, is_short=False, leverage=1.0, is_open=True,
+                           trading_mode=TradingMode.SPOT, exchange="check",
+                           price_precision=tick or None, precision_mode_price=TICK_SIZE if tick else None)
+        trade.adjust_stop_loss(open_rate, strategy.stoploss, initial=True)  # as Backtesting._enter_trade
+        result = (entry, -1, np.nan, np.nan, None)
+        for j in range(entry, len(rows)):
+            row = rows[j]
+            exit_ = strategy.ft_stoploss_reached(
+                current_rate=row[OPEN_IDX], trade=trade, current_time=dates[j],
+                current_profit=trade.calc_profit_ratio(row[OPEN_IDX]), force_stoploss=0,
+                low=row[LOW_IDX], high=row[HIGH_IDX], bound_profit=trade.calc_profit_ratio(row[HIGH_IDX]))
+            if exit_.exit_type in (ExitType.STOP_LOSS, ExitType.TRAILING_STOP_LOSS):
+                trade_dur = int((row[DATE_IDX] - dataframe["date"].iloc[entry]).total_seconds() // 60)
+                close_rate = Backtesting._get_close_rate_for_stoploss(backtesting, row, trade, exit_, trade_dur)
+                result = (entry, j, trade.stop_loss, close_rate, exit_.exit_type.value)
+                break
+        out.append(result)
+    return pd.DataFrame(out, columns=["entry", "exit", "stop_loss", "close_rate", "exit_type"])
+
+
+def compare(scalar, vector):
+    """Rows where the two disagree."""
+    same = (scalar["exit"].to_numpy() == vector["exit"].to_numpy())
+    for column in ("stop_loss", "close_rate"):
+        a, b = scalar[column].to_numpy(dtype=float), vector[column].to_numpy(dtype=float)
+        same &= (a == b) | (np.isnan(a) & np.isnan(b))
+    same &= scalar["exit_type"].fillna("").to_numpy() == vector["exit_type"].fillna("").to_numpy()
+    return scalar[~same].join(vector[~same], rsuffix="_vector")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="custom_stoploss_vector vs freqtrade's per-candle stoploss.")
+    parser.add_argument("strategy")
+    parser.add_argument("--pair", help="real candles from data/ instead of the fixture")
+    parser.add_argument("--exchange", default="binance")
+    parser.add_argument("--timeframe", default="5m")
+    parser.add_argument("--candle-type", default="futures")
+    parser.add_argument("--every", type=int, default=5, help="open a trade every N candles")
+    parser.add_argument("--fee", type=float, default=0.001)
+    parser.add_argument("--tick", type=float, default=0.01, help="price tick of the stops, 0: no rounding")
+    args = parser.parse_args()
+
+    from vector_stoploss import PathStoploss, stoploss_exits
+
+    strategy = load_strategy(args.strategy)
+    if args.pair:
+        dataframe = load_candles(candle_path(args.exchange, args.pair, args.timeframe, args.candle_type))
+    else:
+        dataframe = fixture(tick=args.tick, timeframe=args.timeframe)
+    entries = np.arange(0, len(dataframe), args.every)
+
+    started = time.perf_counter()
+    vector = stoploss_exits(strategy, dataframe, entries, fee=args.fee,
+                            price_precision=args.tick or None, precision_mode=TICK_SIZE if args.tick else None)
+    vector_time = time.perf_counter() - started
+    started = time.perf_counter()
+    scalar = per_candle(strategy, dataframe, entries, args.fee, args.tick)
+    scalar_time = time.perf_counter() - started
+    path = PathStoploss(strategy)
+    if not path.active:
+        raise SystemExit(f"{args.strategy}: PathStoploss doesn't support this strategy's settings")
+    path.add_frame("CHECK/USDT", dataframe)
+    started = time.perf_counter()
+    paths = per_candle(strategy, dataframe, entries, args.fee, args.tick)
+    path_time = time.perf_counter() - started
+
+    print(f"{len(entries)} trades on {len(dataframe)} candles: "
+          f"{scalar['exit_type'].value_counts(dropna=False).to_dict()}")
+    print(f"per candle {scalar_time:.2f}s  PathStoploss {path_time:.2f}s  arrays {vector_time:.3f}s")
+    for name, other in (("arrays", vector[scalar.columns]), ("PathStoploss", paths)):
+        diff = compare(scalar, other)
+        if len(diff):
+            print(f"{name}: {len(diff)} trades differ:\n{diff.head(20).to_string()}")
+            raise SystemExit(1)
+    print("identical exits")
+
+
+if __name__ == "__main__":
+    main()
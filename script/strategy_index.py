@@ -0,0 +1,279 @@
+"""
+Static index of the strategies under strategies/ - nothing gets imported.
+
+`freqtrade list-strategies` imports every strategy module, which pulls in
+pandas_ta / ta / sklearn / requests and breaks on the first bad import. Here
+each file is parsed with `ast` only and the result is cached per file in
+cache/strategy_index.json (keyed by mtime and size), so listing and resolving
+a name to its file is a json read.
+
+Per strategy class: name, file, bases, INTERFACE_VERSION, timeframe,
+can_short, stoploss, hyperopt parameters (type, space, range, default,
+optimize), @informative decorators and the modules the file imports.
+Attributes a class doesn't set itself are inherited from its parents in the
+index (e.g. MultiMA_TSL3a(MultiMA_TSL3)).
+
+    python strategy_index.py --list
+    python strategy_index.py --show Cenderawasih_30m_1d
+    python strategy_index.py --find mini
+"""
+import argparse
+import ast
+import json
+import time
+from pathlib import Path
+
+from datafiles import CACHE_DIR, USER_DATA
+
+STRATEGIES_DIR = USER_DATA / "strategies"
+INDEX_PATH = CACHE_DIR / "strategy_index.json"
+INDEX_VERSION = 1
+
+PARAMETER_TYPES = ("IntParameter", "DecimalParameter", "RealParameter", "CategoricalParameter",
+                   "BooleanParameter")
+# class attributes copied into the index when they are literals
+ATTRIBUTES = ("INTERFACE_VERSION", "timeframe", "can_short", "stoploss", "minimal_roi", "trailing_stop",
+              "use_custom_stoploss", "startup_candle_count", "position_adjustment_enable")
+INHERITED = ATTRIBUTES + ("parameters", "informative")
+
+
+def _literal(node, names=None):
+    """Value of a literal node; names resolve against `names` (class constants)."""
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        pass
+    if isinstance(node, ast.Name) and names and node.id in names:
+        return names[node.id]
+    return None
+
+
+def _unparse(node, names=None):
+    value = _literal(node, names)
+    return value if value is not None else ast.unparse(node)
+
+
+def _base_name(node):
+    # `IStrategy`, `strategy.IStrategy`, `Generic[...]`
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return ast.unparse(node)
+
+
+def _call_name(node):
+    return _base_name(node.func) if isinstance(node, ast.Call) else None
+
+
+def parse_parameter(name, call, names):
+    """IntParameter(10, 40, default=30, space="buy") -> dict"""
+    kwargs = {k.arg: k.value for k in call.keywords if k.arg}
+    kind = _call_name(call)
+    param = {"name": name, "type": kind}
+    args = call.args
+    if kind == "CategoricalParameter":
+        param["categories"] = _unparse(args[0] if args else kwargs.get("categories"), names)
+    elif kind != "BooleanParameter":
+        if len(args) >= 2:
+            param["low"], param["high"] = _unparse(args[0], names), _unparse(args[1], names)
+        elif len(args) == 1:
+            # IntParameter([10, 40], ...)
+            param["range"] = _unparse(args[0], names)
+        for key in ("low", "high", "decimals"):
+            if key in kwargs:
+                param[key] = _unparse(kwargs[key], names)
+    param["default"] = _unparse(kwargs["default"], names) if "default" in kwargs else None
+    space = _unparse(kwargs["space"], names) if "space" in kwargs else None
+    if space is None:
+        # freqtrade derives the space from the attribute name
+        space = next((s for s in ("buy", "sell", "protection") if name.startswith(f"{s}_")), None)
+    param["space"] = space
+    param["optimize"] = _unparse(kwargs["optimize"], names) if "optimize" in kwargs else True
+    param["load"] = _unparse(kwargs["load"], names) if "load" in kwargs else True
+    return param
+
+
+def parse_informative(decorator, names):
+    """@informative('1h', 'BTC/{stake}', ...) -> dict"""
+    fields = ("timeframe", "asset", "fmt", "candle_type", "ffill")
+    info = {}
+    for field, node in zip(fields, decorator.args):
+        info[field] = _unparse(node, names)
+    for k in decorator.keywords:
+        if k.arg:
+            info[k.arg] = _unparse(k.value, names)
+    return info
+
+
+def parse_class(node, module_names):
+    names = dict(module_names)
+    info = {"name": node.name, "bases": [_base_name(b) for b in node.bases], "line": node.lineno,
+            "parameters": [], "informative": []}
+    for stmt in node.body:
+        targets = []
+        if isinstance(stmt, ast.Assign):
+            targets, value = [t.id for t in stmt.targets if isinstance(t, ast.Name)], stmt.value
+        elif isinstance(stmt, ast.AnnAssign) and isinstance(stmt.target, ast.Name) and stmt.value is not None:
+            targets, value = [stmt.target.id], stmt.value
+        for target in targets:
+            literal = _literal(value, names)
+            if literal is not None:
+                names[target] = literal
+            if target in ATTRIBUTES:
+                info[target] = literal if literal is not None else ast.unparse(value)
+            if _call_name(value) in PARAMETER_TYPES:
+                info["parameters"].append(parse_parameter(target, value, names))
+        if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for dec in stmt.decorator_list:
+                if _call_name(dec) == "informative":
+                    info["informative"].append(dict(parse_informative(dec, names), method=stmt.name))
+    return info
+
+
+def parse_file(path):
+    """Top level classes and imported modules of one file (no import, no execution)."""
+    tree = ast.parse(Path(path).read_text(encoding="utf-8", errors="replace"))
+    module_names, imports = {}, set()
+    for stmt in tree.body:
+        if isinstance(stmt, ast.Import):
+            imports.update(a.name.split(".")[0] for a in stmt.names)
+        elif isinstance(stmt, ast.ImportFrom) and stmt.module and not stmt.level:
+            imports.add(stmt.module.split(".")[0])
+        elif isinstance(stmt, ast.Assign):
+            literal = _literal(stmt.value)
+            for t in stmt.targets:
+                if isinstance(t, ast.Name) and literal is not None:
+                    module_names[t.id] = literal
+    classes = [parse_class(n, module_names) for n in tree.body if isinstance(n, ast.ClassDef)]
+    return {"classes": classes, "imports": sorted(imports)}
+
+
+def load_index(path=INDEX_PATH):
+    try:
+        with open(path) as f:
+            index = json.load(f)
+        return index if index.get("version") == INDEX_VERSION else {"version": INDEX_VERSION, "files": {}}
+    except (OSError, ValueError):
+        return {"version": INDEX_VERSION, "files": {}}
+
+
+def save_index(index, path=INDEX_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    tmp.replace(path)
+
+
+def build_index(strategies_dir=STRATEGIES_DIR, path=INDEX_PATH, verbose=False):
+    """
+    Bring the cached index up to date, re-parsing only new / changed files.
+    :return: index dict {"version", "files": {relative path: {mtime_ns, size, classes, imports, error}}}
+    """
+    strategies_dir = Path(strategies_dir)
+    index = load_index(path)
+    files = {}
+    changed = False
+    for file in sorted(strategies_dir.rglob("*.py")):
+        if "__pycache__" in file.parts:
+            continue
+        rel = file.relative_to(strategies_dir).as_posix()
+        stat = file.stat()
+        entry = index["files"].get(rel)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            files[rel] = entry
+            continue
+        entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "classes": [], "imports": [], "error": None}
+        try:
+            entry.update(parse_file(file))
+        except (SyntaxError, ValueError) as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+        if verbose:
+            print(f"parsed {rel}: {', '.join(c['name'] for c in entry['classes']) or entry['error'] or '-'}")
+        files[rel] = entry
+        changed = True
+    if changed or set(files) != set(index["files"]):
+        index["files"] = files
+        save_index(index, path)
+    return index
+
+
+def strategies(index=None):
+    """
+    {class name: info} of every strategy class - IStrategy subclasses, also
+    through parents defined in other files. Inherited attributes are filled in.
+    """
+    index = index or build_index()
+    classes = {}
+    for rel, entry in index["files"].items():
+        for cls in entry["classes"]:
+            # first definition wins, like a name lookup on sys.path would
+            classes.setdefault(cls["name"], dict(cls, file=rel, imports=entry["imports"]))
+
+    def is_strategy(name, seen=()):
+        cls = classes.get(name)
+        if cls is None or name in seen:
+            return False
+        return any(b == "IStrategy" or is_strategy(b, seen + (name,)) for b in cls["bases"])
+
+    def resolved(name, seen=()):
+        cls = dict(classes[name])
+        for base in cls["bases"]:
+            if base in classes and base not in seen:
+                parent = resolved(base, seen + (name,))
+                for key in INHERITED:
+                    if key not in cls or (key in ("parameters", "informative") and not cls[key]):
+                        if key in parent:
+                            cls[key] = parent[key]
+        return cls
+
+    return {name: resolved(name) for name in classes if is_strategy(name)}
+
+
+def find(name, strategies_dir=STRATEGIES_DIR):
+    """Path of the file that defines strategy `name`."""
+    for rel, entry in build_index(strategies_dir).get("files", {}).items():
+        if any(c["name"] == name for c in entry["classes"]):
+            return Path(strategies_dir) / rel
+    raise FileNotFoundError(f"strategy {name} not found in {strategies_dir}")
+
+
+def errors(index=None):
+    index = index or build_index()
+    return {rel: e["error"] for rel, e in index["files"].items() if e["error"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static strategy index (no imports).")
+    parser.add_argument("--list", action="store_true")
+    parser.add_argument("--show", metavar="STRATEGY")
+    parser.add_argument("--find", metavar="STRATEGY")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cache")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.rebuild:
+        INDEX_PATH.unlink(missing_ok=True)
+    index = build_index(verbose=args.rebuild)
+    if args.list:
+        found = strategies(index)
+        for name, s in sorted(found.items(), key=lambda kv: kv[0].lower()):
+            spaces = sorted({p["space"] or "-" for p in s.get("parameters", [])})
+            print(f"{name:35} {s['file']:50} tf={s.get('timeframe', '-')!s:5} "
+                  f"short={s.get('can_short', False)!s:5} v{s.get('INTERFACE_VERSION', '-')} "
+                  f"params={len(s.get('parameters', []))} {','.join(spaces)}")
+        for rel, error in errors(index).items():
+            print(f"{'(error)':35} {rel:50} {error}")
+        print(f"{len(found)} strategies in {(time.perf_counter() - start) * 1000:.0f} ms")
+    if args.show:
+        print(json.dumps(strategies(index)[args.show], indent=2, default=str))
+    if args.find:
+        print(find(args.find))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
 import argparse
 import os
-import subprocess
+
+import batch_runner
+import data_quality
+import data_snapshot
+import ftconfig
+import funding_cache
+import result_cache
+import result_catalog
+import strategy_index
+import trade_extract
 
 # freqtrade backtesting --userdir ../ --config ../config.json --strategy raindow --timeframe 5m --timerange=20240101-
 # freqtrade download-data  --userdir ../ --config ../config.json  --timerange 20220101- -t 5m 15m 30m
@@ -27,54 +36,43 @@ def switch_to_script_directory():
     os.chdir(script_dir)
     print(f"Current working directory switched to: {script_dir}")
 
-def update_data_git_repository():
-    """将 data 文件夹更新到 Git 仓库。"""
-    try:
-        # 检查是否在 Git 仓库中
-        subprocess.run(["git", "status"], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-        # 添加 data 文件夹的更改
-        subprocess.run(["git", "add", "../data"], check=True)
-        print("Data folder changes added to staging area.")
-
-        # 提交更改
-        commit_message = "Update data folder with new data"
-        subprocess.run(["git", "commit", "-m", commit_message], check=True)
-        print("Changes committed to Git repository.")
-
-        # 推送更改到远程仓库
-        subprocess.run(["git", "push"], check=True)
-        print("Changes pushed to remote repository.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred during Git operations: {e}")
-        exit(1)
-
 def run_cmd(cmd):
     print(cmd)
     os.system(cmd)
 
 
+def index_results():
+    """新的回测结果: 写入 catalog, 并把 trades 拆成列存"""
+    result_catalog.ingest()
+    trade_extract.extract_all()
+
+
 def webserver():
     cmd = "freqtrade webserver {0}".format(common)
     run_cmd(cmd)
 
 
-def test(name):
-    cmd = "freqtrade backtesting {0} --strategy {1} --timeframe 15m --timerange=20240101-".format(common, name)
-    run_cmd(cmd)
+def test(name, bypass=False):
+    # 相同的策略/配置/数据/时间段 直接复用之前的结果
+    result_cache.backtest(name, "15m", "20240101-", bypass=bypass)
+    index_results()
 
 def download():
     cmd = "freqtrade download-data {0} --timerange 20200101- -t 1m 5m 15m 30m 1h 2h 4h 8h  --exchange binance -p BTC/USDT:USDT --prepend ".format(common)
     run_cmd(cmd)
-    update_data_git_repository()
+    data_quality.build_index()
+    funding_cache.build_all()
+    # 数据不再提交到 git, 只记录一个快照
+    data_snapshot.create_snapshot("download-data")
 
 def list():
-    cmd = "freqtrade list-strategies {0}".format(common)
-    run_cmd(cmd)
+    # static index, `freqtrade list-strategies` imports every strategy
+    for name, s in sorted(strategy_index.strategies().items(), key=lambda kv: kv[0].lower()):
+        print(f"{name:35} {s['file']:50} {s.get('timeframe', '-')}")
 
-def backtest():
-    cmd = "freqtrade backtesting {0} --strategy mytest --timeframe 1h --timerange={1}".format(common, y2020)
-    run_cmd(cmd)
+def backtest(bypass=False):
+    result_cache.backtest("mytest", "1h", y2020, bypass=bypass)
+    index_results()
 
 def main():
     # 创建解析器
@@ -95,6 +93,11 @@ def main():
     # parser.add_argument("-t", "--test", action="store_true", help="backtest")
     parser.add_argument("-w", "--webserver", action="store_true", help="webserver")
     parser.add_argument("-l", "--list", action="store_true", help="list")
+    parser.add_argument("-q", "--quality", action="store_true", help="update data quality index")
+    parser.add_argument("-f", "--funding", action="store_true", help="build funding/mark sidecars")
+    parser.add_argument("--no-cache", action="store_true", help="always run freqtrade, ignore cached results")
+    parser.add_argument("--stale", action="store_true", help="report cached backtest results that are out of date")
+    parser.add_argument("--batch", metavar="SPEC", help="run a backtest matrix spec json (batch_runner.py)")
 
     parser.add_argument("-t", "--test", nargs="?", const="raindow", default=None,
                         help="Provide a name to greet. Defaults to 'hello' if not specified.")
@@ -108,7 +111,7 @@ def main():
     args = parser.parse_args()
 
     if args.test:
-        test(args.test)
+        test(args.test, bypass=args.no_cache)
 
     if args.download:
         download()
@@ -120,7 +123,23 @@ def main():
         list()
 
     if args.backtesting:
-        backtest()
+        backtest(bypass=args.no_cache)
+
+    if args.quality:
+        data_quality.build_index()
+
+    if args.funding:
+        funding_cache.build_all()
+
+    if args.stale:
+        for r in result_cache.stale_report():
+            print(f"{r['status']:8} {r['strategy']:20} {r['timeframe']:4} {r['timerange']:18} "
+                  f"{r['archive']:45} {','.join(r['changed'])}")
+
+    if args.batch:
+        table = batch_runner.run(ftconfig.load_file(args.batch))
+        if len(table):
+            print(table.to_string(index=False, float_format="%.4f"))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,220 @@
+"""
+Stream the trade lists out of backtest result archives into columnar files.
+
+The result json is read straight from the zip with ijson (incremental parser),
+one trade dict at a time, and written in record batches to
+    cache/trades/<archive stem>/<strategy>.feather
+so memory stays flat no matter how big the archive is. Later analysis reads only
+the columns it needs:
+
+    trades = read_trades("backtest-result-2025-04-01_00-34-56", "raindow",
+                         columns=["pair", "close_date", "profit_abs"])
+
+Without ijson installed the json is parsed in full as a fallback (same output).
+
+    python trade_extract.py --extract
+"""
+import argparse
+import json
+import zipfile
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from datafiles import CACHE_DIR, is_stale
+from result_archive import RESULTS_DIR
+
+try:
+    import ijson
+except ImportError:  # optional, iter_trades falls back to json.load
+    ijson = None
+
+TRADES_DIR = CACHE_DIR / "trades"
+BATCH_SIZE = 10_000
+
+TRADE_SCHEMA = pa.schema([
+    ("pair", pa.dictionary(pa.int32(), pa.string())),
+    ("open_date", pa.timestamp("ms", tz="UTC")),
+    ("close_date", pa.timestamp("ms", tz="UTC")),
+    ("trade_duration", pa.int64()),
+    ("is_short", pa.bool_()),
+    ("is_open", pa.bool_()),
+    ("leverage", pa.float64()),
+    ("stake_amount", pa.float64()),
+    ("max_stake_amount", pa.float64()),
+    ("amount", pa.float64()),
+    ("open_rate", pa.float64()),
+    ("close_rate", pa.float64()),
+    ("fee_open", pa.float64()),
+    ("fee_close", pa.float64()),
+    ("profit_ratio", pa.float64()),
+    ("profit_abs", pa.float64()),
+    ("min_rate", pa.float64()),
+    ("max_rate", pa.float64()),
+    ("enter_tag", pa.dictionary(pa.int32(), pa.string())),
+    ("exit_reason", pa.dictionary(pa.int32(), pa.string())),
+    ("nr_of_orders", pa.int32()),
+    ("orders_cost", pa.float64()),
+])
+# written to the .done marker, tables extracted with another schema are redone
+SCHEMA_TAG = ",".join(TRADE_SCHEMA.names)
+
+
+def trades_path(stem, strategy, trades_dir=TRADES_DIR):
+    return Path(trades_dir) / stem / f"{strategy}.feather"
+
+
+def _num(value):
+    return None if value is None else float(value)
+
+
+def trade_record(trade):
+    """Flatten one trade dict of the result json into the TRADE_SCHEMA columns."""
+    return {
+        "pair": trade.get("pair"),
+        "open_date": trade.get("open_timestamp"),
+        "close_date": trade.get("close_timestamp"),
+        "trade_duration": trade.get("trade_duration"),
+        "is_short": bool(trade.get("is_short", False)),
+        "is_open": bool(trade.get("is_open", False)),
+        "leverage": _num(trade.get("leverage", 1.0)),
+        "stake_amount": _num(trade.get("stake_amount")),
+        "max_stake_amount": _num(trade.get("max_stake_amount", trade.get("stake_amount"))),
+        "amount": _num(trade.get("amount")),
+        "open_rate": _num(trade.get("open_rate")),
+        "close_rate": _num(trade.get("close_rate")),
+        "fee_open": _num(trade.get("fee_open")),
+        "fee_close": _num(trade.get("fee_close")),
+        "profit_ratio": _num(trade.get("profit_ratio")),
+        "profit_abs": _num(trade.get("profit_abs")),
+        "min_rate": _num(trade.get("min_rate")),
+        "max_rate": _num(trade.get("max_rate")),
+        "enter_tag": trade.get("enter_tag"),
+        "exit_reason": trade.get("exit_reason"),
+        "nr_of_orders": len(trade.get("orders") or []),
+        # traded volume, what freqtrade reports as total volume
+        "orders_cost": float(sum(order.get("cost") or 0.0 for order in trade.get("orders") or [])),
+    }
+
+
+def iter_trades(fileobj):
+    """
+    Yield (strategy, trade dict) from a result json file object without
+    loading the whole document.
+    """
+    if ijson is None:
+        result = json.load(fileobj)
+        for strategy, data in result.get("strategy", {}).items():
+            for trade in data.get("trades", []):
+                yield strategy, trade
+        return
+
+    builder, depth, strategy = None, 0, None
+    for prefix, event, value in ijson.parse(fileobj, use_float=True):
+        if builder is None:
+            # strategy.<name>.trades.item is the start of one trade
+            if event == "start_map" and prefix.startswith("strategy.") and prefix.endswith(".trades.item"):
+                strategy = prefix[len("strategy."):-len(".trades.item")]
+                builder, depth = ijson.ObjectBuilder(), 0
+            else:
+                continue
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+            if depth == 0:
+                yield strategy, builder.value
+                builder = None
+
+
+class _TradeWriter:
+    """Buffers records and writes them as record batches to one feather file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp = self.path.with_name(self.path.name + ".tmp")
+        self.writer = pa.ipc.new_file(str(self.tmp), TRADE_SCHEMA,
+                                      options=pa.ipc.IpcWriteOptions(compression="lz4"))
+        self.buffer = []
+        self.rows = 0
+
+    def add(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.writer.write_batch(pa.RecordBatch.from_pylist(self.buffer, schema=TRADE_SCHEMA))
+            self.rows += len(self.buffer)
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        self.tmp.replace(self.path)
+
+
+def extract_archive(zip_path, trades_dir=TRADES_DIR, force=False):
+    """
+    Write one trade table per strategy of an archive.
+    :return: {strategy: rows} or None if already up to date
+    """
+    zip_path = Path(zip_path)
+    stem = zip_path.stem
+    marker = Path(trades_dir) / stem / ".done"
+    if not force and not is_stale(marker, zip_path) and marker.read_text() == SCHEMA_TAG:
+        return None
+
+    writers = {}
+    with zipfile.ZipFile(zip_path) as zf, zf.open(f"{stem}.json") as f:
+        for strategy, trade in iter_trades(f):
+            if strategy not in writers:
+                writers[strategy] = _TradeWriter(trades_path(stem, strategy, trades_dir))
+            writers[strategy].add(trade_record(trade))
+    for writer in writers.values():
+        writer.close()
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.write_text(SCHEMA_TAG)
+    return {strategy: w.rows for strategy, w in writers.items()}
+
+
+def extract_all(results_dir=RESULTS_DIR, trades_dir=TRADES_DIR, force=False, verbose=True):
+    done = {}
+    for zip_path in sorted(Path(results_dir).glob("backtest-result-*.zip")):
+        rows = extract_archive(zip_path, trades_dir, force)
+        if rows is not None:
+            done[zip_path.stem] = rows
+            if verbose:
+                print(f"{zip_path.stem}: " + ", ".join(f"{s}={n}" for s, n in rows.items()))
+    return done
+
+
+def read_trades(stem, strategy, columns=None, trades_dir=TRADES_DIR):
+    """
+    Trade table of one run as a DataFrame, reading only `columns`.
+    :param stem: archive name without .zip, e.g. backtest-result-2025-04-01_00-34-56
+    """
+    path = trades_path(stem, strategy, trades_dir)
+    if not path.exists() and (path.parent / ".done").exists():
+        # run without trades
+        return TRADE_SCHEMA.empty_table().select(columns or TRADE_SCHEMA.names).to_pandas()
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract trade lists from backtest archives.")
+    parser.add_argument("--extract", action="store_true")
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    if args.extract or args.force:
+        done = extract_all(force=args.force)
+        print(f"{len(done)} archive(s) extracted")
+
+
+if __name__ == "__main__":
+    main()
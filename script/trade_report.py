@@ -0,0 +1,340 @@
+"""
+Rebuild freqtrade's backtest breakdown tables from the stored trade tables
+(trade_extract.py) instead of re-running the backtest.
+
+All runs are stacked into one frame with a run key, so every table of every run
+is a single groupby:
+
+    runs = load_runs(strategies=["raindow"], timeframe="1h", columns=REPORT_COLUMNS)
+    tables = breakdown(runs, by="enter_tag")        # (run, key) rows
+    summary(runs)                                   # one row per run
+    print(report(runs[0]))                          # freqtrade style text
+
+Groupings: pair, enter_tag, exit_reason, mix_tag (enter_tag + exit_reason),
+month, weekday, leverage, direction. Month / weekday are taken from the close
+date like freqtrade's --breakdown.
+
+    python trade_report.py --strategy raindow --timeframe 1h
+    python trade_report.py --strategy raindow --by month weekday leverage --limit 50 --quiet
+"""
+import argparse
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from equity import load_runs
+
+REPORT_COLUMNS = ["pair", "open_date", "close_date", "trade_duration", "is_short", "is_open",
+                  "leverage", "stake_amount", "amount", "profit_ratio", "profit_abs", "enter_tag",
+                  "exit_reason", "orders_cost"]
+
+GROUPINGS = ("pair", "enter_tag", "exit_reason", "mix_tag", "month", "weekday", "leverage", "direction")
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+# groupings shown in key order instead of by profit
+ORDERED = ("month", "weekday", "leverage")
+
+TITLES = {
+    "pair": ("BACKTESTING REPORT", "Pair", "Trades"),
+    "enter_tag": ("ENTER TAG STATS", "TAG", "Entries"),
+    "exit_reason": ("EXIT REASON STATS", "Exit Reason", "Exits"),
+    "mix_tag": ("MIXED TAG STATS", "Enter Tag / Exit Reason", "Trades"),
+    "month": ("MONTH BREAKDOWN", "Month", "Trades"),
+    "weekday": ("WEEKDAY BREAKDOWN", "Weekday", "Trades"),
+    "leverage": ("LEVERAGE BREAKDOWN", "Leverage", "Trades"),
+    "direction": ("DIRECTION BREAKDOWN", "Direction", "Trades"),
+}
+
+
+def stack(runs):
+    """All trade tables in one frame, `run` is the position of the run in `runs`."""
+    frames = [r.trades for r in runs]
+    lengths = [len(f) for f in frames]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=REPORT_COLUMNS)
+    df["run"] = np.repeat(np.arange(len(runs)), lengths)
+    return df
+
+
+def _key(df, by):
+    if by in ("pair", "enter_tag", "exit_reason"):
+        return df[by].astype(object).fillna("OTHER" if by == "enter_tag" else "")
+    if by == "mix_tag":
+        return (df["enter_tag"].astype(object).fillna("OTHER") + " "
+                + df["exit_reason"].astype(object).fillna(""))
+    if by == "month":
+        return df["close_date"].dt.strftime("%Y-%m")
+    if by == "weekday":
+        return pd.Categorical(df["close_date"].dt.day_name(), categories=WEEKDAYS, ordered=True)
+    if by == "leverage":
+        return df["leverage"].fillna(1.0)
+    if by == "direction":
+        return np.where(df["is_short"], "short", "long")
+    raise ValueError(f"unknown grouping {by}, use one of {', '.join(GROUPINGS)}")
+
+
+def _aggregate(df, keys, balance):
+    """freqtrade's per-row metrics (names as in the result json) for a groupby over `keys`."""
+    profit = df["profit_abs"].to_numpy()
+    df = df.assign(win=profit > 0, draw=profit == 0, loss=profit < 0)
+    out = df.groupby(keys, observed=True, sort=True).agg(
+        trades=("profit_ratio", "size"),
+        profit_mean=("profit_ratio", "mean"),
+        profit_sum=("profit_ratio", "sum"),
+        profit_total_abs=("profit_abs", "sum"),
+        duration_avg=("trade_duration", "mean"),
+        wins=("win", "sum"),
+        draws=("draw", "sum"),
+        losses=("loss", "sum"),
+    )
+    run = out.index.get_level_values("run") if isinstance(out.index, pd.MultiIndex) else out.index
+    out["profit_total"] = out["profit_total_abs"].to_numpy() / balance[np.asarray(run)]
+    out["winrate"] = out["wins"] / out["trades"]
+    return out
+
+
+def breakdown(runs, by="pair", trades=None, total=True):
+    """
+    One breakdown table for every run.
+    :param by: one of GROUPINGS
+    :param trades: stack(runs), pass it when building several tables
+    :param total: add a TOTAL row per run
+    :return: DataFrame indexed by (run name, key)
+    """
+    df = stack(runs) if trades is None else trades
+    balance = np.array([r.starting_balance for r in runs], dtype=np.float64)
+    names = np.array([r.name for r in runs], dtype=object)
+    out = _aggregate(df.assign(key=_key(df, by)), ["run", "key"], balance)
+    if by not in ORDERED:
+        out = out.sort_values(["run", "profit_total_abs"], ascending=[True, False], kind="stable")
+    out = out.reset_index()
+    if total:
+        # empty runs still get their TOTAL row
+        totals = _aggregate(df, "run", balance).reindex(np.arange(len(runs)))
+        totals = totals.rename_axis("run").reset_index()
+        totals["key"] = "TOTAL"
+        totals[["trades", "wins", "draws", "losses"]] = totals[["trades", "wins", "draws", "losses"]].fillna(0)
+        out["_total"] = False
+        totals["_total"] = True
+        out = pd.concat([out, totals], ignore_index=True).sort_values(["run", "_total"], kind="stable")
+        out = out.drop(columns="_total")
+    out["run"] = names[out["run"].to_numpy(dtype=np.int64)]
+    return out.set_index(["run", "key"])
+
+
+def left_open(runs, trades=None):
+    """Per-pair table of the trades still open at the end of the backtest."""
+    df = stack(runs) if trades is None else trades
+    return breakdown(runs, "pair", df[df["is_open"].fillna(False).astype(bool)])
+
+
+def summary(runs, trades=None):
+    """
+    Summary metrics of every run computed from its trades (one row per run).
+    Drawdown is on realized profit in close order, like freqtrade's.
+    """
+    df = stack(runs) if trades is None else trades
+    balance = np.array([r.starting_balance for r in runs], dtype=np.float64)
+    df = df.sort_values(["run", "close_date"], kind="stable")
+    profit = df["profit_abs"].to_numpy(dtype=np.float64)
+    run = df["run"].to_numpy()
+
+    grouped = df.assign(gain=np.maximum(profit, 0), pain=np.minimum(profit, 0),
+                        win=profit > 0, draw=profit == 0, loss=profit < 0)
+    grouped = grouped.groupby("run")
+    out = grouped.agg(
+        trades=("profit_abs", "size"), profit_total_abs=("profit_abs", "sum"),
+        gain=("gain", "sum"), pain=("pain", "sum"), wins=("win", "sum"), draws=("draw", "sum"),
+        losses=("loss", "sum"), stake_mean=("stake_amount", "mean"), volume=("orders_cost", "sum"),
+        first_date=("open_date", "min"), last_date=("close_date", "max"),
+        best_trade=("profit_ratio", "max"), worst_trade=("profit_ratio", "min"),
+    ).reindex(np.arange(len(runs)))
+    out["starting_balance"] = balance
+    out["profit_total_abs"] = out["profit_total_abs"].fillna(0.0)
+    out["final_balance"] = balance + out["profit_total_abs"]
+    out["profit_total"] = out["profit_total_abs"] / balance
+    out["winrate"] = out["wins"] / out["trades"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # freqtrade reports 0 / 100 when there are no losing trades
+        out["profit_factor"] = (out["gain"] / -out["pain"]).where(out["pain"] < 0, 0.0)
+        out["expectancy"] = out["profit_total_abs"] / out["trades"]
+        avg_win = out["gain"] / out["wins"]
+        avg_loss = -out["pain"] / out["losses"]
+        out["expectancy_ratio"] = ((1 + avg_win / avg_loss) * out["winrate"] - 1).where(out["pain"] < 0, 100.0)
+
+    # best / worst trade and pair by name
+    ratio = df["profit_ratio"]
+    out["best_trade_pair"] = df.loc[ratio.groupby(run).idxmax().dropna(), ["run", "pair"]] \
+        .set_index("run")["pair"].astype(object)
+    out["worst_trade_pair"] = df.loc[ratio.groupby(run).idxmin().dropna(), ["run", "pair"]] \
+        .set_index("run")["pair"].astype(object)
+    pairs = df.groupby(["run", "pair"], observed=True)["profit_abs"].sum().reset_index()
+    pairs["profit_total"] = pairs["profit_abs"] / balance[pairs["run"].to_numpy()]
+    for label, pos in (("best_pair", pairs.groupby("run")["profit_total"].idxmax()),
+                       ("worst_pair", pairs.groupby("run")["profit_total"].idxmin())):
+        rows = pairs.loc[pos].set_index("run")
+        out[label] = rows["pair"].astype(object)
+        out[f"{label}_profit"] = rows["profit_total"]
+
+    # daily profit over the closed range, every calendar day counts
+    day = df["close_date"].dt.floor("D")
+    profit_by_day = df.assign(day=day).groupby(["run", "day"])["profit_abs"].sum()
+    full = []
+    for r, days in profit_by_day.groupby(level="run"):
+        idx = days.index.get_level_values("day")
+        full.append(days.droplevel("run").reindex(pd.date_range(idx.min(), idx.max(), freq="D"),
+                                                  fill_value=0.0).to_frame("profit").assign(run=r))
+    daily = pd.concat(full) if full else pd.DataFrame(columns=["profit", "run"])
+    days = daily.groupby("run")["profit"]
+    out["best_day"] = days.max()
+    out["worst_day"] = days.min()
+    sign = np.sign(daily["profit"].to_numpy(dtype=np.float64))
+    for label, value in (("winning_days", 1), ("draw_days", 0), ("losing_days", -1)):
+        out[label] = pd.Series(sign == value).groupby(daily["run"].to_numpy()).sum()
+
+    # duration of winners / losers
+    dur = df["trade_duration"].to_numpy(dtype=np.float64)
+    out["winner_duration_avg"] = pd.Series(dur[profit > 0]).groupby(run[profit > 0]).mean()
+    out["loser_duration_avg"] = pd.Series(dur[profit < 0]).groupby(run[profit < 0]).mean()
+
+    # realized balance curve
+    cum = df.groupby("run")["profit_abs"].cumsum().to_numpy() + balance[run]
+    peak = pd.Series(np.maximum(cum, balance[run])).groupby(run).cummax().to_numpy()
+    under = pd.DataFrame({"run": run, "dd_abs": peak - cum, "dd_rel": 1 - cum / peak, "balance": cum,
+                          "peak": peak})
+    g = under.groupby("run")
+    out["min_balance"] = g["balance"].min()
+    out["max_balance"] = g["balance"].max()
+    out["max_drawdown_abs"] = g["dd_abs"].max()
+    out["max_relative_drawdown"] = g["dd_rel"].max()
+    # absolute drawdown relative to the account high (freqtrade's max_drawdown_account)
+    high = under.loc[g["dd_abs"].idxmax()].set_index("run")["peak"] if len(under) else np.nan
+    out["max_drawdown_account"] = out["max_drawdown_abs"] / high
+
+    days_total = [((r.backtest_end - r.backtest_start) / pd.Timedelta(days=1))
+                  if r.backtest_start is not None and r.backtest_end is not None else np.nan for r in runs]
+    out["backtest_days"] = days_total
+    out["trades_per_day"] = out["trades"] / out["backtest_days"]
+    out[["wins", "draws", "losses", "trades"]] = out[["wins", "draws", "losses", "trades"]].fillna(0).astype(int)
+    out.index = [r.name for r in runs]
+    return out.drop(columns=["gain", "pain"])
+
+
+def _duration(minutes):
+    if minutes is None or pd.isna(minutes):
+        return "0:00"
+    return str(timedelta(minutes=round(float(minutes))))
+
+
+def _table(title, header, rows):
+    """freqtrade's text table: right aligned cells, title centred in a ==== line."""
+    widths = [max(len(str(c)) for c in col) for col in zip(header, *rows)]
+    line = lambda cells: "| " + " | ".join(str(c).rjust(w) for c, w in zip(cells, widths)) + " |"
+    sep = "|" + "+".join("-" * (w + 2) for w in widths) + "|"
+    out = [line(header), sep] + [line(r) for r in rows]
+    return "\n".join([f" {title} ".center(len(sep), "=")] + out)
+
+
+def _breakdown_text(records, by, stake_currency):
+    title, label, count = TITLES[by]
+    header = [label, count, "Avg Profit %", "Cum Profit %", f"Tot Profit {stake_currency}",
+              "Tot Profit %", "Avg Duration", "Win  Draw  Loss  Win%"]
+    rows = [[r["key"], int(r["trades"]), f"{r['profit_mean'] * 100:.2f}", f"{r['profit_sum'] * 100:.2f}",
+             f"{r['profit_total_abs']:.3f}", f"{r['profit_total'] * 100:.2f}", _duration(r["duration_avg"]),
+             f"{int(r['wins']):>5} {int(r['draws']):>5} {int(r['losses']):>5} {r['winrate'] * 100:>5.1f}"]
+            for r in records]
+    return _table(title, header, rows)
+
+
+def _records_by_run(table):
+    """{run name: row dicts} of a breakdown table - plain python rows format much faster."""
+    out = {}
+    for r in table.fillna(0).reset_index().to_dict("records"):
+        out.setdefault(r["run"], []).append(r)
+    return out
+
+
+def format_breakdown(table, by="pair", stake_currency="USDT"):
+    """Text of one run's breakdown table (breakdown(...).loc[[run name]])."""
+    return "\n".join(_breakdown_text(records, by, stake_currency)
+                     for records in _records_by_run(table).values())
+
+
+def format_summary(s, stake_currency="USDT"):
+    """Text of one row of summary(...)."""
+    money = lambda v: f"{v:.3f} {stake_currency}"
+    rows = [
+        ("Total/Daily Avg Trades", f"{s['trades']} / {s['trades_per_day']:.2f}"),
+        ("Starting balance", money(s["starting_balance"])),
+        ("Final balance", money(s["final_balance"])),
+        ("Absolute profit", money(s["profit_total_abs"])),
+        ("Total profit %", f"{s['profit_total']:.2%}"),
+        ("Profit factor", f"{s['profit_factor']:.2f}"),
+        ("Expectancy (Ratio)", f"{s['expectancy']:.2f} ({s['expectancy_ratio']:.2f})"),
+        ("Avg. stake amount", money(s["stake_mean"])),
+        ("Total trade volume", money(s["volume"])),
+        ("", ""),
+        ("Best Pair", f"{s['best_pair']} {s['best_pair_profit']:.2%}"),
+        ("Worst Pair", f"{s['worst_pair']} {s['worst_pair_profit']:.2%}"),
+        ("Best trade", f"{s['best_trade_pair']} {s['best_trade']:.2%}"),
+        ("Worst trade", f"{s['worst_trade_pair']} {s['worst_trade']:.2%}"),
+        ("Best day", money(s["best_day"])),
+        ("Worst day", money(s["worst_day"])),
+        ("Days win/draw/lose", f"{s['winning_days']:.0f} / {s['draw_days']:.0f} / {s['losing_days']:.0f}"),
+        ("Avg. Duration Winners", _duration(s["winner_duration_avg"])),
+        ("Avg. Duration Loser", _duration(s["loser_duration_avg"])),
+        ("", ""),
+        ("Min balance", money(s["min_balance"])),
+        ("Max balance", money(s["max_balance"])),
+        ("Max % of account underwater", f"{s['max_relative_drawdown']:.2%}"),
+        ("Absolute Drawdown (Account)", f"{s['max_drawdown_account']:.2%}"),
+        ("Absolute Drawdown", money(s["max_drawdown_abs"])),
+    ]
+    text = _table("SUMMARY METRICS", ["Metric", "Value"], rows)
+    # metric names are left aligned in freqtrade's summary
+    return "\n".join(l if not l.startswith("| ") else "| " + " | ".join(
+        c.strip().ljust(len(c)) for c in l[2:-2].split(" | ")) + " |" for l in text.splitlines())
+
+
+def report(runs, by=("pair", "enter_tag", "exit_reason"), stake_currency="USDT"):
+    """Full text report per run, as freqtrade prints it after a backtest."""
+    runs = runs if isinstance(runs, (list, tuple)) else [runs]
+    trades = stack(runs)
+    tables = {b: _records_by_run(breakdown(runs, b, trades)) for b in by}
+    opened = _records_by_run(left_open(runs, trades))
+    summaries = summary(runs, trades)
+    texts = []
+    for r in runs:
+        parts = [f"Result for {r.name}"]
+        parts += [_breakdown_text(tables[b][r.name], b, stake_currency) for b in by]
+        parts.append(_breakdown_text(opened[r.name], "pair", stake_currency)
+                     .replace("BACKTESTING REPORT", "LEFT OPEN TRADES REPORT"))
+        parts.append(format_summary(summaries.loc[r.name], stake_currency))
+        texts.append("\n".join(parts))
+    return "\n\n".join(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest reports rebuilt from stored trades.")
+    parser.add_argument("--strategy", nargs="+", default=None)
+    parser.add_argument("--timeframe", default=None)
+    parser.add_argument("--by", nargs="+", default=["pair", "enter_tag", "exit_reason"], choices=GROUPINGS)
+    parser.add_argument("--limit", type=int, default=None, help="only the last N runs")
+    parser.add_argument("--quiet", action="store_true", help="only time the tables")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    runs = load_runs(args.strategy, args.timeframe, columns=REPORT_COLUMNS)
+    runs = runs[-args.limit:] if args.limit else runs
+    if not runs:
+        print("no runs found - run `python result_catalog.py --ingest` first")
+        return
+    loaded = time.perf_counter()
+    text = report(runs, args.by)
+    if not args.quiet:
+        print(text)
+    print(f"{len(runs)} run(s): load {loaded - start:.2f}s, tables {time.perf_counter() - loaded:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,11 @@ import math
 import pandas_ta as pta
 import logging
 from logging import FATAL
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from informative_cache import share_informatives
 
 def tv_wma(df, length = 9) -> DataFrame:
     """
@@ -182,6 +187,10 @@ class Cenderawasih_30m (IStrategy):
     if int(timeframe_minutes) >= 60:
         timeframe_minutes_string = f"{timeframe_minutes//60}h"
 
+    def bot_start(self, **kwargs) -> None:
+        # the BTC informative: computed once for all pairs, in backtests too
+        share_informatives(self)
+
     @informative('1d')
     def populate_indicators_1d(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         dataframe['age_filter_ok'] = (dataframe['volume'].rolling(window=30, min_periods=30).min() > 0)
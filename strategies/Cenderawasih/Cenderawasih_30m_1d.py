@@ -16,6 +16,12 @@ import pandas_ta as pta
 # from finta import TA as fta
 import logging
 from logging import FATAL
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from incremental import IncrementalIndicators, ema, hma, mfi, rolling, rsi
+from mtf_features import AlignedFeatures
 
 def tv_wma(df, length = 9) -> DataFrame:
     """
@@ -249,6 +255,8 @@ class Cenderawasih_30m_1d (IStrategy):
     process_only_new_candles = True
     startup_candle_count = 999
 
+    feature_tensor = True
+
     timeframe_minutes = timeframe_to_minutes(timeframe)
     timeframe_minutes_string = f"{timeframe_minutes}m"
     if int(timeframe_minutes) >= 60:
@@ -259,6 +267,16 @@ class Cenderawasih_30m_1d (IStrategy):
     if int(inf_timeframe1_minutes) >= 60:
         inf_timeframe1_minutes_string = f"{inf_timeframe1_minutes//60}h"
 
+    def bot_start(self, **kwargs) -> None:
+        # dry / live: carry indicator state from one candle to the next instead of 999 rows each time
+        self.ind = IncrementalIndicators(live=self.dp.runmode.value in ("live", "dry_run"))
+        # feature_tensor: informatives as aligned arrays, not merged into the dataframe;
+        # the BTC informative is computed once for all pairs either way
+        self.mtf = AlignedFeatures(self, enabled=self.feature_tensor)
+
+    def informative_pairs(self):
+        return self.mtf.informative_pairs() if hasattr(self, "mtf") else []
+
     @informative('1d')
     def populate_indicators_1d(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         dataframe['age_filter_ok'] = (dataframe['volume'].rolling(window=30, min_periods=30).min() > 0)
@@ -281,7 +299,7 @@ class Cenderawasih_30m_1d (IStrategy):
     @informative(timeframe, 'BTC/{stake}', '{base}_{column}_{timeframe}')
     # @informative('15m', 'BTC/USDT', '{base}_{column}_{timeframe}')
     def populate_indicators_btc_inf(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-        dataframe['rsi'] = ta.RSI(dataframe, timeperiod=14)
+        dataframe['rsi'] = self.ind(metadata['pair'], dataframe, rsi(14))
 
         drop_columns = ['open', 'high', 'low', 'close', 'volume']
         dataframe.drop(columns=dataframe.columns.intersection(drop_columns), inplace=True)
@@ -290,71 +308,73 @@ class Cenderawasih_30m_1d (IStrategy):
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         
+        pair = metadata['pair']
+        self.mtf.populate(dataframe, metadata)
         # # RSI
-        dataframe['rsi'] = ta.RSI(dataframe, timeperiod=14)
+        dataframe['rsi'] = self.ind(pair, dataframe, rsi(14))
         # dataframe['rsi_fast'] = ta.RSI(dataframe, timeperiod=4)
 
         dataframe['pct_change'] = dataframe['close'].pct_change()
 
-        dataframe['vrsi'] = ta.RSI(dataframe['volume'], timeperiod=15)
-        dataframe['vrsi_45'] = ta.RSI(dataframe['volume'], timeperiod=45)
+        dataframe['vrsi'] = self.ind(pair, dataframe, rsi(15, 'volume'))
+        dataframe['vrsi_45'] = self.ind(pair, dataframe, rsi(45, 'volume'))
 
-        dataframe['close_mean_75'] = dataframe['close'].rolling(75).mean()
-        dataframe['close_median_75'] = dataframe['close'].rolling(75).median()
-        dataframe['close_mean_150'] = dataframe['close'].rolling(150).mean()
-        dataframe['close_median_150'] = dataframe['close'].rolling(150).median()
-        dataframe['close_mean_300'] = dataframe['close'].rolling(300).mean()
-        dataframe['close_median_300'] = dataframe['close'].rolling(300).median()
+        dataframe['close_mean_75'] = self.ind(pair, dataframe, rolling('mean', 75))
+        dataframe['close_median_75'] = self.ind(pair, dataframe, rolling('median', 75))
+        dataframe['close_mean_150'] = self.ind(pair, dataframe, rolling('mean', 150))
+        dataframe['close_median_150'] = self.ind(pair, dataframe, rolling('median', 150))
+        dataframe['close_mean_300'] = self.ind(pair, dataframe, rolling('mean', 300))
+        dataframe['close_median_300'] = self.ind(pair, dataframe, rolling('median', 300))
 
-        dataframe['mfi'] = ta.MFI(dataframe, 15)
-        dataframe['mfi_45'] = ta.MFI(dataframe, 45)
+        dataframe['mfi'] = self.ind(pair, dataframe, mfi(15))
+        dataframe['mfi_45'] = self.ind(pair, dataframe, mfi(45))
 
-        dataframe['live_data_ok'] = (dataframe['volume'].rolling(window=72, min_periods=72).min() > 0)
+        dataframe['live_data_ok'] = (self.ind(pair, dataframe, rolling('min', 72, 'volume')) > 0)
 
         if not self.optimize_buy_hma:
-            dataframe['hma_offset_buy1'] = tv_hma(dataframe, int(self.buy_length_hma.value)) *self.buy_offset_hma.value
+            dataframe['hma_offset_buy1'] = self.ind(pair, dataframe, hma(int(self.buy_length_hma.value))) *self.buy_offset_hma.value
 
         if not self.optimize_buy_hma1a:
-            dataframe['hma_offset_buy1a'] = tv_hma(dataframe, int(5 * self.buy_length_hma1a.value)) * 0.05 * self.buy_offset_hma1a.value
+            dataframe['hma_offset_buy1a'] = self.ind(pair, dataframe, hma(int(5 * self.buy_length_hma1a.value))) * 0.05 * self.buy_offset_hma1a.value
 
         if not self.optimize_buy_hma1b:
-            dataframe['hma_offset_buy1b'] = tv_hma(dataframe, int(5 * self.buy_length_hma1b.value)) * 0.05 * self.buy_offset_hma1b.value
+            dataframe['hma_offset_buy1b'] = self.ind(pair, dataframe, hma(int(5 * self.buy_length_hma1b.value))) * 0.05 * self.buy_offset_hma1b.value
 
         if not self.optimize_buy_hma2:
-            dataframe['hma_offset_buy2'] = tv_hma(dataframe, int(self.buy_length_hma2.value)) *self.buy_offset_hma2.value
+            dataframe['hma_offset_buy2'] = self.ind(pair, dataframe, hma(int(self.buy_length_hma2.value))) *self.buy_offset_hma2.value
 
         # if not self.optimize_buy_hma2a:
         #     dataframe['hma_offset_buy2a'] = tv_hma(dataframe, int(5 * self.buy_length_hma2a.value)) * 0.05 * self.buy_offset_hma2a.value
 
         if not self.optimize_buy_hma3:
-            dataframe['hma_offset_buy3'] = tv_hma(dataframe, int(self.buy_length_hma3.value)) *self.buy_offset_hma3.value
+            dataframe['hma_offset_buy3'] = self.ind(pair, dataframe, hma(int(self.buy_length_hma3.value))) *self.buy_offset_hma3.value
 
         # if not self.optimize_buy_hma3b:
         #     dataframe['hma_offset_buy3b'] = tv_hma(dataframe, int(5 * self.buy_length_hma3b.value)) * 0.05 * self.buy_offset_hma3b.value
 
         if not self.optimize_buy_hma4:
-            dataframe['hma_offset_buy4'] = tv_hma(dataframe, int(self.buy_length_hma4.value)) *self.buy_offset_hma4.value
+            dataframe['hma_offset_buy4'] = self.ind(pair, dataframe, hma(int(self.buy_length_hma4.value))) *self.buy_offset_hma4.value
 
         if not self.optimize_sell_ema:
-            dataframe['ema_offset_sell'] = ta.EMA(dataframe, int(5 * self.sell_length_ema.value)) * 0.05 * self.sell_offset_ema.value
+            dataframe['ema_offset_sell'] = self.ind(pair, dataframe, ema(int(5 * self.sell_length_ema.value))) * 0.05 * self.sell_offset_ema.value
 
         if not self.optimize_sell_ema2:
-            dataframe['ema_offset_sell2'] = ta.EMA(dataframe, int(self.sell_length_ema2.value)) *self.sell_offset_ema2.value
+            dataframe['ema_offset_sell2'] = self.ind(pair, dataframe, ema(int(self.sell_length_ema2.value))) *self.sell_offset_ema2.value
 
         if not self.optimize_sell_ema2a:
-            dataframe['ema_offset_sell2a'] = ta.EMA(dataframe, int(5 * self.sell_length_ema2a.value)) * 0.05 * self.sell_offset_ema2a.value
+            dataframe['ema_offset_sell2a'] = self.ind(pair, dataframe, ema(int(5 * self.sell_length_ema2a.value))) * 0.05 * self.sell_offset_ema2a.value
 
         if not self.optimize_sell_ema2b:
-            dataframe['ema_offset_sell2b'] = ta.EMA(dataframe, int(5 * self.sell_length_ema2b.value)) * 0.05 * self.sell_offset_ema2b.value
+            dataframe['ema_offset_sell2b'] = self.ind(pair, dataframe, ema(int(5 * self.sell_length_ema2b.value))) * 0.05 * self.sell_offset_ema2b.value
 
         if not self.optimize_sell_ema3:
-            dataframe['ema_offset_sell3'] = ta.EMA(dataframe, int(self.sell_length_ema3.value)) *self.sell_offset_ema3.value
+            dataframe['ema_offset_sell3'] = self.ind(pair, dataframe, ema(int(self.sell_length_ema3.value))) *self.sell_offset_ema3.value
 
         if not self.optimize_sell_ema3a:
-            dataframe['ema_offset_sell3a'] = ta.EMA(dataframe, int(5 * self.sell_length_ema3a.value)) * 0.05 * self.sell_offset_ema3a.value
+            dataframe['ema_offset_sell3a'] = self.ind(pair, dataframe, ema(int(5 * self.sell_length_ema3a.value))) * 0.05 * self.sell_offset_ema3a.value
 
         if not self.optimize_sell_ema4:
-            dataframe['ema_offset_sell4'] = ta.EMA(dataframe, int(self.sell_length_ema4.value)) *self.sell_offset_ema4.value
+            dataframe['ema_offset_sell4'] = self.ind(pair, dataframe, ema(int(self.sell_length_ema4.value))) *self.sell_offset_ema4.value
 
         return dataframe
     
@@ -388,10 +408,14 @@ class Cenderawasih_30m_1d (IStrategy):
 
         dataframe['enter_tag'] = ''
 
+        age_filter_ok_1d = self.mtf.get(dataframe, metadata, 'age_filter_ok_1d')
+        btc_rsi = self.mtf.get(dataframe, metadata, f"btc_rsi_{self.timeframe_minutes_string}")
+        pct_change_inf = self.mtf.get(dataframe, metadata, f"pct_change_{self.inf_timeframe1_minutes_string}")
+
         add_check = (
             dataframe['live_data_ok']
             &
-            dataframe['age_filter_ok_1d']
+            age_filter_ok_1d
             &
             (dataframe['close'] < dataframe['open'])
         )
@@ -418,13 +442,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1b'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -448,13 +472,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1a'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -480,13 +504,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -508,13 +532,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -534,13 +558,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -560,13 +584,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -588,13 +612,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -616,13 +640,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -638,13 +662,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -660,13 +684,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -684,13 +708,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -712,13 +736,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -742,13 +766,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 mean_above_median_300
                 &
@@ -768,13 +792,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy1'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 30)
+                (btc_rsi < 30)
                 &
                 (dataframe['rsi'] < self.buy_rsi_1.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h.value))
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] < (-0.01 * self.buy_max_red_2h.value))
+                (pct_change_inf < (-0.01 * self.buy_max_red_2h.value))
                 &
                 ~mean_above_median_300
             )
@@ -786,13 +810,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy2'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 30)
+                (btc_rsi >= 30)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 50)
+                (btc_rsi < 50)
                 &
                 (dataframe['rsi'] < self.buy_rsi_2.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_2.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_2.value))
                 &
                 mean_above_median_300
                 &
@@ -812,13 +836,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy2'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 30)
+                (btc_rsi >= 30)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 50)
+                (btc_rsi < 50)
                 &
                 (dataframe['rsi'] < self.buy_rsi_2.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_2.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_2.value))
                 &
                 mean_above_median_300
                 &
@@ -838,13 +862,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy2'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 30)
+                (btc_rsi >= 30)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 50)
+                (btc_rsi < 50)
                 &
                 (dataframe['rsi'] < self.buy_rsi_2.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_2.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_2.value))
                 &
                 mean_above_median_300
                 &
@@ -862,13 +886,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy2'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 30)
+                (btc_rsi >= 30)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 50)
+                (btc_rsi < 50)
                 &
                 (dataframe['rsi'] < self.buy_rsi_2.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_2.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_2.value))
                 &
                 mean_above_median_300
                 &
@@ -886,13 +910,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy2'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 30)
+                (btc_rsi >= 30)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 50)
+                (btc_rsi < 50)
                 &
                 (dataframe['rsi'] < self.buy_rsi_2.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_2.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_2.value))
                 &
                 mean_above_median_300
                 &
@@ -914,13 +938,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy2'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 30)
+                (btc_rsi >= 30)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 50)
+                (btc_rsi < 50)
                 &
                 (dataframe['rsi'] < self.buy_rsi_2.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_2.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_2.value))
                 &
                 mean_above_median_300
                 &
@@ -938,13 +962,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy2'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 30)
+                (btc_rsi >= 30)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 50)
+                (btc_rsi < 50)
                 &
                 (dataframe['rsi'] < self.buy_rsi_2.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_2.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_2.value))
                 &
                 ~mean_above_median_300
                 &
@@ -966,13 +990,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy2'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 30)
+                (btc_rsi >= 30)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 50)
+                (btc_rsi < 50)
                 &
                 (dataframe['rsi'] < self.buy_rsi_2.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_2.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_2.value))
                 &
                 ~mean_above_median_300
                 &
@@ -988,13 +1012,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy2'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 30)
+                (btc_rsi >= 30)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 50)
+                (btc_rsi < 50)
                 &
                 (dataframe['rsi'] < self.buy_rsi_2.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_2.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_2.value))
                 &
                 ~mean_above_median_300
                 &
@@ -1010,13 +1034,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy2'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 30)
+                (btc_rsi >= 30)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 50)
+                (btc_rsi < 50)
                 &
                 (dataframe['rsi'] < self.buy_rsi_2.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_2.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_2.value))
                 &
                 ~mean_above_median_300
                 &
@@ -1036,13 +1060,13 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy2'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 30)
+                (btc_rsi >= 30)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 50)
+                (btc_rsi < 50)
                 &
                 (dataframe['rsi'] < self.buy_rsi_2.value)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_2.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_2.value))
                 &
                 ~mean_above_median_300
                 &
@@ -1060,11 +1084,11 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy3'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 50)
+                (btc_rsi >= 50)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 70)
+                (btc_rsi < 70)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_3.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_3.value))
                 &
                 mean_above_median_300
                 &
@@ -1078,11 +1102,11 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy3'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 50)
+                (btc_rsi >= 50)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 70)
+                (btc_rsi < 70)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_3.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_3.value))
                 &
                 mean_above_median_300
                 &
@@ -1114,11 +1138,11 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy3'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 50)
+                (btc_rsi >= 50)
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] < 70)
+                (btc_rsi < 70)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_3.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_3.value))
                 &
                 ~mean_above_median_300
                 &
@@ -1132,9 +1156,9 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy4'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 70)
+                (btc_rsi >= 70)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_4.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_4.value))
                 &
                 mean_above_median_300
                 &
@@ -1196,9 +1220,9 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy4'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 70)
+                (btc_rsi >= 70)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_4.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_4.value))
                 &
                 mean_above_median_300
                 &
@@ -1212,9 +1236,9 @@ class Cenderawasih_30m_1d (IStrategy):
             (
                 (dataframe['close'] < dataframe['hma_offset_buy4'])
                 &
-                (dataframe[f"btc_rsi_{self.timeframe_minutes_string}"] >= 70)
+                (btc_rsi >= 70)
                 &
-                (dataframe[f"pct_change_{self.inf_timeframe1_minutes_string}"] > (-0.01 * self.buy_min_red_2h_4.value))
+                (pct_change_inf > (-0.01 * self.buy_min_red_2h_4.value))
                 &
                 ~mean_above_median_300
             )
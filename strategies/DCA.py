@@ -2,6 +2,7 @@
 # --- 放置于 user_data/strategies/ 目录下 ---
 
 import logging
+from dataclasses import dataclass
 from typing import Optional, Dict, List
 import pandas as pd
 import freqtrade.vendor.qtpylib.indicators as qtpylib
@@ -11,10 +12,18 @@ from freqtrade.strategy import IStrategy, IntParameter, DecimalParameter
 from pandas import DataFrame
 from datetime import datetime, timedelta, timezone
 
+from trade_state import TradeStateStore
+
 # 设置日志记录器
 logger = logging.getLogger(__name__)
 # logging.basicConfig(level=logging.INFO)
 
+@dataclass
+class DcaState:
+    dca_count: int = 0
+    last_dca_time: Optional[datetime] = None
+
+
 class SimpleDcaStrategyPlot(IStrategy): # 类名稍作修改
     """
     一个简单的 DCA 策略 (带绘图配置)，使用 adjust_trade_position 实现：
@@ -83,6 +92,14 @@ class SimpleDcaStrategyPlot(IStrategy): # 类名稍作修改
         """留空，主要依赖 ROI 和止损退出"""
         return dataframe
 
+    # --- 交易状态 ---
+    def bot_start(self, **kwargs) -> None:
+        # DCA 状态保存在内存中，每轮循环开始时批量写入数据库（已平仓交易的状态同时清除）
+        self.trade_state = TradeStateStore(DcaState)
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        self.trade_state.flush()
+
     # --- 自定义初始金额 ---
     def custom_stake_amount(self, pair: str, current_time: datetime, current_rate: float,
                             proposed_stake: float, min_stake: Optional[float], max_stake: float,
@@ -108,13 +125,9 @@ class SimpleDcaStrategyPlot(IStrategy): # 类名稍作修改
         dca_cooldown = timedelta(minutes=self.dca_cooldown_minutes.value)
 
         # 获取当前 DCA 状态
-        dca_count = trade.custom_info.get('dca_count', 0)
-        last_dca_time_str = trade.custom_info.get('last_dca_time')
-        last_dca_time = None
-        if last_dca_time_str:
-            last_dca_time = datetime.fromisoformat(last_dca_time_str)
-            if last_dca_time.tzinfo is None:
-                last_dca_time = last_dca_time.replace(tzinfo=timezone.utc)
+        state = self.trade_state.get(trade)
+        dca_count = state.dca_count
+        last_dca_time = state.last_dca_time
 
         # 检查是否已达到最大加仓次数
         if dca_count >= max_dca_entries:
@@ -159,9 +172,8 @@ class SimpleDcaStrategyPlot(IStrategy): # 类名稍作修改
                 )
 
                 # 更新状态信息
-                trade.custom_info['dca_count'] = dca_count + 1
-                trade.custom_info['last_dca_time'] = current_time.isoformat() # 记录本次加仓时间
-                trade.update(trade.custom_info)
+                # 记录本次加仓时间
+                self.trade_state.update(trade, dca_count=dca_count + 1, last_dca_time=current_time)
 
                 # 返回正数金额以执行加仓
                 return stake_to_add
@@ -13,7 +13,12 @@ from freqtrade.exchange import timeframe_to_prev_date
 import math
 import talib.abstract as ta
 import logging
+import sys
 from logging import FATAL
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from quality_index import QualityIndex
 
 logger = logging.getLogger(__name__)
 
@@ -157,6 +162,10 @@ class Matoa (IStrategy):
 
     age_filter = 30
 
+    def bot_start(self, **kwargs) -> None:
+        # scanned zero-volume runs / gaps of the candle files, backtest / hyperopt only
+        self.quality = QualityIndex.from_config(self.config)
+
     @informative('1d')
     def populate_indicators_1d(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         dataframe['age_filter_ok'] = (dataframe['volume'].rolling(window=self.age_filter, min_periods=self.age_filter).min() > 0)
@@ -169,7 +178,11 @@ class Matoa (IStrategy):
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         
-        dataframe['live_data_ok'] = (dataframe['volume'].rolling(window=72, min_periods=72).min() > 0)
+        pair = metadata['pair']
+        if self.quality is not None and self.quality.covers(pair, self.timeframe, dataframe['date']):
+            dataframe['live_data_ok'] = self.quality.live_data_ok(pair, self.timeframe, dataframe['date'])
+        else:
+            dataframe['live_data_ok'] = (dataframe['volume'].rolling(window=72, min_periods=72).min() > 0)
 
         if not self.optimize_buy_hma:
             dataframe['hma_offset_buy'] = tv_hma(dataframe, int(self.base_nb_candles_buy_hma.value)) *self.low_offset_hma.value
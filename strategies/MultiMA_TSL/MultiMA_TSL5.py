@@ -12,12 +12,17 @@ from datetime import datetime, timedelta, timezone
 from freqtrade.exchange import timeframe_to_prev_date
 import talib.abstract as ta
 import math
-import pandas_ta as pta
 import logging
+import sys
 from logging import FATAL
-import time
-import requests
-import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from lazy_import import lazy
+from mtf_features import AlignedFeatures
+
+# only needed for rsx, imported on first use
+pta = lazy("pandas_ta")
 
 logger = logging.getLogger(__name__)
 
@@ -314,6 +319,16 @@ class MultiMA_TSL5 (IStrategy):
 
     age_filter = 30
 
+    # informatives as aligned arrays instead of merged columns (False: freqtrade's merge)
+    feature_tensor = True
+
+    def bot_start(self, **kwargs) -> None:
+        # takes the @informative methods over when feature_tensor is set
+        self.mtf = AlignedFeatures(self, enabled=self.feature_tensor)
+
+    def informative_pairs(self):
+        return self.mtf.informative_pairs() if hasattr(self, "mtf") else []
+
     @informative('1d')
     def populate_indicators_1d(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         dataframe['age_filter_ok'] = (dataframe['volume'].rolling(window=self.age_filter, min_periods=self.age_filter).min() > 0)
@@ -357,7 +372,8 @@ class MultiMA_TSL5 (IStrategy):
         return dataframe
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-        
+        self.mtf.populate(dataframe, metadata)
+
         # Heiken Ashi
         heikinashi = qtpylib.heikinashi(dataframe)
         heikinashi["volume"] = dataframe["volume"]
@@ -463,14 +479,16 @@ class MultiMA_TSL5 (IStrategy):
         dataframe.loc[:, 'enter_tag'] = ''
         dataframe.loc[:, 'enter_long'] = 0
 
-        go_long_1h = ((self.buy_ema_fast_length_1h.value < self.buy_ema_slow_length_1h.value) & (dataframe[f'ema_{self.buy_ema_fast_length_1h.value}_1h'] > dataframe[f'ema_{self.buy_ema_slow_length_1h.value}_1h'])).astype('int') * 2
+        inf = lambda name: self.mtf.get(dataframe, metadata, name)
+
+        go_long_1h = ((self.buy_ema_fast_length_1h.value < self.buy_ema_slow_length_1h.value) & (inf(f'ema_{self.buy_ema_fast_length_1h.value}_1h') > inf(f'ema_{self.buy_ema_slow_length_1h.value}_1h'))).astype('int') * 2
 
-        go_long_15m = ((self.buy_ema_fast_length_15m.value < self.buy_ema_slow_length_15m.value) & (dataframe[f'ema_{self.buy_ema_fast_length_15m.value}_15m'] > dataframe[f'ema_{self.buy_ema_slow_length_15m.value}_15m'])).astype('int') * 2
+        go_long_15m = ((self.buy_ema_fast_length_15m.value < self.buy_ema_slow_length_15m.value) & (inf(f'ema_{self.buy_ema_fast_length_15m.value}_15m') > inf(f'ema_{self.buy_ema_slow_length_15m.value}_15m'))).astype('int') * 2
 
         add_check = (
             dataframe['live_data_ok']
             &
-            dataframe['age_filter_ok_1d']
+            inf('age_filter_ok_1d')
             &
             (dataframe['open'] > dataframe['close'])
             &
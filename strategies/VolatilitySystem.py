@@ -15,7 +15,8 @@ from freqtrade.strategy import (CategoricalParameter, DecimalParameter,
 from freqtrade.exchange import date_minus_candles
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 
-from technical.util import resample_to_interval, resampled_merge
+from candle_cache import LastCandles
+from resampler import merge_resampled, resample
 
 
 class VolatilitySystem(IStrategy):
@@ -57,14 +58,14 @@ class VolatilitySystem(IStrategy):
         are worth adding.
         """
         resample_int = 60 * 3
-        resampled = resample_to_interval(dataframe, resample_int)
+        resampled = resample(dataframe, resample_int)
         # Average True Range (ATR)
         resampled['atr'] = ta.ATR(resampled, timeperiod=14) * 2.0
         # Absolute close change
         resampled['close_change'] = resampled['close'].diff()
         resampled['abs_close_change'] = resampled['close_change'].abs()
 
-        dataframe = resampled_merge(dataframe, resampled, fill_na=True)
+        dataframe = merge_resampled(dataframe, resampled, resample_int, ['atr', 'close_change', 'abs_close_change'])
         dataframe['atr'] = dataframe[f'resample_{resample_int}_atr']
         dataframe['close_change'] = dataframe[f'resample_{resample_int}_close_change']
         dataframe['abs_close_change'] = dataframe[f'resample_{resample_int}_abs_close_change']
@@ -108,6 +109,10 @@ class VolatilitySystem(IStrategy):
             'exit_long'] = 1
         return dataframe
 
+    def bot_start(self, **kwargs) -> None:
+        # last / previous candle for the trade callbacks, rebuilt once per candle
+        self.candles = LastCandles(self, depth=2, columns=("enter_long", "enter_short"))
+
     def custom_stake_amount(self, pair: str, current_time: datetime, current_rate: float,
                             proposed_stake: float, min_stake: Optional[float], max_stake: float,
                             leverage: float, entry_tag: Optional[str], side: str,
@@ -124,10 +129,9 @@ class VolatilitySystem(IStrategy):
                               current_entry_profit: float, current_exit_profit: float,
                               **kwargs) -> Optional[float]:
         print(f'Adjusting position for {trade.pair} at {current_time} with profit {current_profit}')
-        dataframe, _ = self.dp.get_analyzed_dataframe(trade.pair, self.timeframe)
-        if len(dataframe) > 2:
-            last_candle = dataframe.iloc[-1].squeeze()
-            previous_candle = dataframe.iloc[-2].squeeze()
+        candles = self.candles.rows(trade.pair)
+        if len(candles) == 2:
+            last_candle, previous_candle = candles
             signal_name = 'enter_long' if not trade.is_short else 'enter_short'
             prior_date = date_minus_candles(self.timeframe, 1, current_time)
             # Only enlarge position on new signal.
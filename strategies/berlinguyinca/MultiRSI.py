@@ -3,7 +3,11 @@ from freqtrade.strategy import IStrategy
 from pandas import DataFrame
 # --------------------------------
 import talib.abstract as ta
-from technical.util import resample_to_interval, resampled_merge
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from resampler import merge_resampled, resample
 
 
 class MultiRSI(IStrategy):
@@ -34,20 +38,21 @@ class MultiRSI(IStrategy):
         dataframe['sma200'] = ta.SMA(dataframe, timeperiod=200)
 
         # resample our dataframes
-        dataframe_short = resample_to_interval(dataframe, self.get_ticker_indicator() * 2)
-        dataframe_long = resample_to_interval(dataframe, self.get_ticker_indicator() * 8)
+        short_interval = self.get_ticker_indicator() * 2
+        long_interval = self.get_ticker_indicator() * 8
+        dataframe_short, dataframe_long = resample(dataframe, [short_interval, long_interval]).values()
 
         # compute our RSI's
         dataframe_short['rsi'] = ta.RSI(dataframe_short, timeperiod=14)
         dataframe_long['rsi'] = ta.RSI(dataframe_long, timeperiod=14)
 
         # merge dataframe back together
-        dataframe = resampled_merge(dataframe, dataframe_short)
-        dataframe = resampled_merge(dataframe, dataframe_long)
+        dataframe = merge_resampled(dataframe, dataframe_short, short_interval, ['rsi'])
+        dataframe = merge_resampled(dataframe, dataframe_long, long_interval, ['rsi'])
 
         dataframe['rsi'] = ta.RSI(dataframe, timeperiod=14)
 
-        dataframe.fillna(method='ffill', inplace=True)
+        dataframe.ffill(inplace=True)
 
         return dataframe
 
@@ -9,12 +9,17 @@ import talib.abstract as ta
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 from typing import Dict, List
 from functools import reduce
-from pandas import DataFrame, DatetimeIndex, merge
+from pandas import DataFrame
 # --------------------------------
 
 import talib.abstract as ta
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 import numpy  # noqa
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from resampler import merge_resampled, resample
 
 class ReinforcedQuickie(IStrategy):
     """
@@ -175,21 +180,8 @@ class ReinforcedQuickie(IStrategy):
     def resample(self, dataframe, interval, factor):
         # defines the reinforcement logic
         # resampled dataframe to establish if we are in an uptrend, downtrend or sideways trend
-        df = dataframe.copy()
-        df = df.set_index(DatetimeIndex(df['date']))
-        ohlc_dict = {
-            'open': 'first',
-            'high': 'max',
-            'low': 'min',
-            'close': 'last'
-        }
-        df = df.resample(str(int(interval[:-1]) * factor) + 'min',
-                         label="right").agg(ohlc_dict).dropna(how='any')
-        df['resample_sma'] = ta.SMA(df, timeperiod=25, price='close')
-        df = df.drop(columns=['open', 'high', 'low', 'close'])
-        df = df.resample(interval[:-1] + 'min')
-        df = df.interpolate(method='time')
-        df['date'] = df.index
-        df.index = range(len(df))
-        dataframe = merge(dataframe, df, on='date', how='left')
-        return dataframe
+        minutes = int(interval[:-1]) * factor
+        df = resample(dataframe, minutes)
+        df['sma'] = ta.SMA(df, timeperiod=25, price='close')
+        # the last closed bucket's sma on every candle (no interpolation towards the forming one)
+        return merge_resampled(dataframe, df, minutes, ['sma'], prefix='resample_')
@@ -0,0 +1,90 @@
+"""
+Last rows of the analyzed dataframe for trade callbacks, built once per candle.
+
+adjust_trade_position / custom_stoploss / custom_exit run for every open trade
+on every loop (every candle in a backtest). Taking `dataframe.iloc[-1].squeeze()`
+there builds a pandas Series over all columns each time. LastCandles keeps the
+last `depth` rows per pair and timeframe as plain dicts and only rebuilds them
+when the dataframe has a new last candle:
+
+    from candle_cache import LastCandles
+
+    def bot_start(self, **kwargs):
+        self.candles = LastCandles(self, depth=2)
+
+    def custom_exit(self, pair, trade, current_time, ...):
+        rows = self.candles.rows(pair)            # newest first, () if no data
+        last_candle, previous_candle = rows[0], rows[1]
+
+Rows support `row["close"]` and `row.get("close")` like the Series did. Pass
+`columns=` to copy only what the callbacks read.
+
+In a backtest the cache is keyed by the last candle of the slice, so it wraps
+the strategy's ft_advise_signals: analyzing a pair again (the next hyperopt
+epoch, a new backtest on the same instance) starts a new generation for it.
+"""
+import numpy as np
+
+
+class LastCandles:
+    def __init__(self, strategy, depth=2, columns=None):
+        # strategy.dp is only set once the bot / backtest is wired up, look it up per call
+        self.strategy = strategy
+        self.depth = depth
+        self.columns = list(columns) if columns is not None else None
+        self._cache = {}
+        # pair -> times the pair was analyzed, part of the backtest key
+        self._generation = {}
+        self._is_live = None
+        self.hits = self.misses = 0
+        self._advise_signals = strategy.ft_advise_signals
+        strategy.ft_advise_signals = self.advise_signals
+
+    def advise_signals(self, dataframe, metadata):
+        pair = metadata["pair"]
+        self._generation[pair] = self._generation.get(pair, 0) + 1
+        return self._advise_signals(dataframe, metadata)
+
+    def rows(self, pair, timeframe=None):
+        """Last `depth` candles of `pair` as dicts, newest first - fewer if the dataframe is shorter."""
+        timeframe = timeframe or self.strategy.timeframe
+        dataframe, _ = self.strategy.dp.get_analyzed_dataframe(pair, timeframe)
+        n = len(dataframe)
+        if not n:
+            return ()
+        # live / dry-run: the dataframe object is replaced when a new candle gets analyzed.
+        # backtest: every call is a new slice of the same analyzed frame, the index label of
+        # the last row is the candle (and much cheaper than reading the date column)
+        cached = self._cache.get((pair, timeframe))
+        key = (self._generation.get(pair, 0), dataframe.index[-1], n)
+        if cached is not None and (cached[0] is dataframe or (not self._live() and cached[1] == key)):
+            self.hits += 1
+            return cached[2]
+        self.misses += 1
+        tail = dataframe.iloc[max(0, n - self.depth):]
+        if self.columns is not None:
+            tail = tail[[c for c in self.columns if c in tail.columns]]
+        names = list(tail.columns)
+        # one pass over the column arrays instead of a Series per row
+        values = [tail[c].to_numpy() for c in names]
+        rows = tuple({name: _scalar(column[i]) for name, column in zip(names, values)}
+                     for i in range(len(tail) - 1, -1, -1))
+        self._cache[(pair, timeframe)] = (dataframe if self._live() else None, key, rows)
+        return rows
+
+    def _live(self):
+        if self._is_live is None:
+            self._is_live = self.strategy.dp.runmode.value in ("live", "dry_run")
+        return self._is_live
+
+    def last(self, pair, timeframe=None):
+        rows = self.rows(pair, timeframe)
+        return rows[0] if rows else None
+
+    def clear(self):
+        self._cache.clear()
+
+
+def _scalar(value):
+    # numpy scalars -> python, compare and format like the values of a Series row
+    return value.item() if isinstance(value, np.generic) and not isinstance(value, np.datetime64) else value
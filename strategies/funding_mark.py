@@ -0,0 +1,81 @@
+"""
+Funding-rate / mark-price columns from the sidecars built by script/funding_cache.py.
+
+Every cache/funding/<exchange>/<pair>-<tf>-funding_mark.feather has one row per
+candle of the futures candle file (same dates, same order), so joining is a
+positional slice instead of a merge with the 8h data on every run:
+
+    from funding_mark import join_funding_mark
+
+    def populate_indicators(self, dataframe, metadata):
+        dataframe = join_funding_mark(dataframe, metadata['pair'], self.timeframe,
+                                      self.config['exchange']['name'])
+
+The sidecars describe the files on disk: candles newer than the last build
+(dry-run / live) get NaN / False.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = Path(__file__).resolve().parents[1] / "cache"
+
+FUNDING_COLUMNS = ["funding_rate", "funding_event", "mark_close"]
+
+
+def sidecar_path(exchange, pair, timeframe, cachedir=CACHE_DIR):
+    pair_file = pair.replace("/", "_").replace(":", "_")
+    return Path(cachedir) / "funding" / exchange / f"{pair_file}-{timeframe}-funding_mark.feather"
+
+
+def _dates_ns(dates):
+    """Series / Index / array of datetimes -> int64 ns since epoch."""
+    return pd.DatetimeIndex(pd.to_datetime(dates, utc=True)).tz_convert(None).as_unit("ns").asi8
+
+
+_sidecars = {}
+
+
+def load_sidecar(exchange, pair, timeframe, cachedir=CACHE_DIR):
+    """Sidecar frame, kept in memory for the life of the process."""
+    key = (exchange, pair, timeframe)
+    if key not in _sidecars:
+        path = sidecar_path(exchange, pair, timeframe, cachedir)
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found, run `python script/funding_cache.py --build` first")
+        df = pd.read_feather(path)
+        _sidecars[key] = (_dates_ns(df["date"]), df)
+    return _sidecars[key]
+
+
+def join_funding_mark(dataframe, pair, timeframe, exchange="binance", cachedir=CACHE_DIR):
+    """
+    Add FUNDING_COLUMNS to a candle dataframe.
+    If the dataframe is a contiguous slice of the candle file (the backtest case)
+    the columns are copied by position, otherwise each date is looked up.
+    """
+    side_ns, side = load_sidecar(exchange, pair, timeframe, cachedir)
+    ns = _dates_ns(dataframe["date"])
+    if not len(ns):
+        for col in FUNDING_COLUMNS:
+            dataframe[col] = side[col].iloc[:0].to_numpy()
+        return dataframe
+
+    start = np.searchsorted(side_ns, ns[0])
+    stop = start + len(ns)
+    if stop <= len(side_ns) and side_ns[start] == ns[0] and side_ns[stop - 1] == ns[-1]:
+        for col in FUNDING_COLUMNS:
+            dataframe[col] = side[col].to_numpy()[start:stop]
+        return dataframe
+
+    idx = np.searchsorted(side_ns, ns)
+    found = (idx < len(side_ns)) & (side_ns[np.minimum(idx, len(side_ns) - 1)] == ns)
+    safe = np.minimum(idx, len(side_ns) - 1)
+    for col in FUNDING_COLUMNS:
+        values = side[col].to_numpy()[safe]
+        if col == "funding_event":
+            dataframe[col] = found & values.astype(bool)
+        else:
+            dataframe[col] = np.where(found, values, np.nan)
+    return dataframe
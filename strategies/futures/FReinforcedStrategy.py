@@ -20,7 +20,11 @@ from freqtrade.strategy import (
 import talib.abstract as ta
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 from freqtrade.exchange import timeframe_to_minutes
-from technical.util import resample_to_interval, resampled_merge
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from resampler import merge_resampled, resample
 
 
 # This class is a sample. Feel free to customize it.
@@ -80,9 +84,9 @@ class FReinforcedStrategy(IStrategy):
         dataframe["bb_middleband"] = bollinger["mid"]
 
         self.resample_interval = timeframe_to_minutes(self.timeframe) * 12
-        dataframe_long = resample_to_interval(dataframe, self.resample_interval)
+        dataframe_long = resample(dataframe, self.resample_interval)
         dataframe_long["sma"] = ta.SMA(dataframe_long, timeperiod=50, price="close")
-        dataframe = resampled_merge(dataframe, dataframe_long, fill_na=True)
+        dataframe = merge_resampled(dataframe, dataframe_long, self.resample_interval, ["sma"])
 
         return dataframe
 
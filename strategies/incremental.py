@@ -0,0 +1,464 @@
+"""
+Incremental indicators for dry-run / live.
+
+With process_only_new_candles every new candle still hands populate_indicators
+the whole startup window (999 candles for Cenderawasih_30m_1d) and every
+indicator is recomputed from scratch, for every pair. Between two calls the
+frame only moved by a candle or two. IncrementalIndicators remembers each
+indicator's output per pair and carries its state over:
+
+    recursive (EMA, RSI, ATR, PMAX)   state of the filter, O(1) per new candle
+    windowed (MFI, HMA, rolling       recomputed over the last `lookback` rows
+    mean/median/min/max)              only, O(window) per new candle
+
+    from incremental import IncrementalIndicators, ema, rsi, mfi, hma, rolling
+
+    def bot_start(self, **kwargs):
+        self.ind = IncrementalIndicators(live=self.dp.runmode.value in ("live", "dry_run"))
+
+    def populate_indicators(self, dataframe, metadata):
+        pair = metadata["pair"]
+        dataframe["rsi"] = self.ind(pair, dataframe, rsi(14))
+        dataframe["close_median_75"] = self.ind(pair, dataframe, rolling("median", 75))
+
+The first call (and any call where the new frame doesn't continue the previous
+one - restart, gap, reload) is a full computation with the same values as
+talib / pandas. Every `verify_every` incremental updates the indicator is
+recomputed in full and the last VERIFY_ROWS rows are compared. Only those: a
+filter seeded at the start of the sliding window differs from a carried state
+in its first rows and converges towards the end. Beyond `rtol` the full result
+replaces the carried one and a warning is logged.
+
+Backtests / hyperopt (live=False) always compute in full and keep nothing.
+"""
+import abc
+import logging
+import math
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import talib
+
+logger = logging.getLogger(__name__)
+
+VERIFY_EVERY = 96
+VERIFY_ROWS = 100
+# an EMA 200 seeded 999 candles back is still ~1e-4 off a carried one
+RTOL = 1e-3
+# raw candle columns, read once per dataframe for all indicators
+CANDLE_COLUMNS = ("open", "high", "low", "close", "volume")
+# more new candles than this at once: recompute instead of stepping
+MAX_STEPS = 32
+
+
+def _wilder(x, n, first):
+    """
+    Wilder smoothing as talib does it: mean of x[first:first + n] at index first + n - 1,
+    then avg = (avg * (n - 1) + x) / n.
+    """
+    out = np.full(len(x), np.nan)
+    seed_at = first + n - 1
+    if len(x) <= seed_at:
+        return out
+    seeded = np.concatenate(([x[first:first + n].mean()], x[seed_at + 1:]))
+    out[seed_at:] = pd.Series(seeded).ewm(alpha=1.0 / n, adjust=False).mean().to_numpy()
+    return out
+
+
+def _rsi_value(avg_gain, avg_loss):
+    total = avg_gain + avg_loss
+    return 100.0 * avg_gain / total if total != 0 else 0.0
+
+
+def _source(a, source):
+    if source == "hl2":
+        return (a["high"] + a["low"]) / 2
+    if source == "ohlc4":
+        return (a["high"] + a["low"] + a["close"] + a["open"]) / 4
+    return a[source]
+
+
+class Indicator(abc.ABC):
+    """Base: `full(a)` -> (values, state) over arrays `a`; windowed ones recompute the last `lookback` rows."""
+    recursive = False
+    lookback = 0
+    sources = ("close",)
+    key = ()
+
+    @abc.abstractmethod
+    def full(self, a):
+        ...
+
+
+class RecursiveIndicator(Indicator):
+    """Carries `state` from row to row: `step(a, i, state)` -> (value of row i, new state)."""
+    recursive = True
+
+    @abc.abstractmethod
+    def step(self, a, i, state):
+        ...
+
+
+class EMA(RecursiveIndicator):
+    def __init__(self, length, source="close"):
+        self.length = int(length)
+        self.source = source
+        self.sources = ("high", "low", "close", "open") if source in ("hl2", "ohlc4") else (source,)
+        self.key = ("ema", self.length, source)
+        self.k = 2.0 / (self.length + 1)
+
+    def full(self, a):
+        values = talib.EMA(_source(a, self.source), timeperiod=self.length)
+        last = values[-1] if len(values) else np.nan
+        return values, (last if np.isfinite(last) else None)
+
+    def step(self, a, i, state):
+        x = a[self.source][i] if self.source in a else _source({k: v[i] for k, v in a.items()}, self.source)
+        value = state + self.k * (x - state)
+        return value, value
+
+
+class RSI(RecursiveIndicator):
+    def __init__(self, length, source="close"):
+        self.length = int(length)
+        self.source = source
+        self.sources = (source,)
+        self.key = ("rsi", self.length, source)
+
+    def full(self, a):
+        x = a[self.source]
+        n = self.length
+        out = np.full(len(x), np.nan)
+        if len(x) <= n or not np.isfinite(x).all():
+            return talib.RSI(x, timeperiod=n), None
+        diff = np.diff(x, prepend=np.nan)
+        gain = _wilder(np.where(diff > 0, diff, 0.0), n, 1)
+        loss = _wilder(np.where(diff < 0, -diff, 0.0), n, 1)
+        total = gain + loss
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[n:] = np.where(total[n:] != 0, 100.0 * gain[n:] / total[n:], 0.0)
+        return out, (gain[-1], loss[-1], x[-1])
+
+    def step(self, a, i, state):
+        avg_gain, avg_loss, prev = state
+        n = self.length
+        x = a[self.source][i]
+        change = x - prev
+        avg_gain = (avg_gain * (n - 1) + max(change, 0.0)) / n
+        avg_loss = (avg_loss * (n - 1) + max(-change, 0.0)) / n
+        return _rsi_value(avg_gain, avg_loss), (avg_gain, avg_loss, x)
+
+
+class ATR(RecursiveIndicator):
+    sources = ("high", "low", "close")
+
+    def __init__(self, length):
+        self.length = int(length)
+        self.key = ("atr", self.length)
+
+    @staticmethod
+    def true_range(high, low, prev_close):
+        return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    def full(self, a):
+        high, low, close = a["high"], a["low"], a["close"]
+        n = self.length
+        if len(close) <= n or n < 2 or not (np.isfinite(high).all() and np.isfinite(low).all()
+                                            and np.isfinite(close).all()):
+            return talib.ATR(high, low, close, timeperiod=n), None
+        tr = self.true_range(high, low, np.roll(close, 1))
+        tr[0] = np.nan
+        out = _wilder(tr, n, 1)
+        return out, (out[-1], close[-1])
+
+    def step(self, a, i, state):
+        prev_atr, prev_close = state
+        n = self.length
+        tr = self.true_range(a["high"][i], a["low"][i], prev_close)
+        value = (prev_atr * (n - 1) + tr) / n
+        return value, (value, a["close"][i])
+
+
+class PMAX(RecursiveIndicator):
+    """
+    Profit maximizer as in MultiMA_TSL5.pmax - moving average (EMA / SMA) of `src`
+    +- multiplier / 10 * ATR, trailed. The value is `pm` (0.0 while undefined).
+    """
+    sources = ("open", "high", "low", "close")
+
+    def __init__(self, period, multiplier, length, ma="ema", src="ohlc4"):
+        self.period, self.multiplier, self.length = int(period), int(multiplier), int(length)
+        if ma not in ("ema", "sma"):
+            raise ValueError(f"pmax moving average {ma} not supported incrementally")
+        self.ma, self.src = ma, src
+        self.key = ("pmax", self.period, self.multiplier, self.length, ma, src)
+        self.atr = ATR(self.period)
+        self.ema = EMA(self.length, src)
+
+    def _band(self, ma, atr):
+        offset = (self.multiplier / 10) * atr
+        return ma + offset, ma - offset
+
+    @staticmethod
+    def _trail(i, basic_ub, basic_lb, ma, ma_prev, fub_prev, flb_prev, pm_prev):
+        # the same comparisons as the original loop, one row
+        fub = basic_ub if (basic_ub < fub_prev or ma_prev > fub_prev) else fub_prev
+        flb = basic_lb if (basic_lb > flb_prev or ma_prev < flb_prev) else flb_prev
+        if pm_prev == fub_prev and ma <= fub:
+            pm = fub
+        elif pm_prev == fub_prev and ma > fub:
+            pm = flb
+        elif pm_prev == flb_prev and ma >= flb:
+            pm = flb
+        elif pm_prev == flb_prev and ma < flb:
+            pm = fub
+        else:
+            pm = 0.0
+        return fub, flb, pm
+
+    def full(self, a):
+        src = _source(a, self.src)
+        ma = talib.EMA(src, timeperiod=self.length) if self.ma == "ema" else talib.SMA(src, timeperiod=self.length)
+        atr, atr_state = self.atr.full(a)
+        basic_ub, basic_lb = self._band(ma, atr)
+        n = len(src)
+        final_ub, final_lb, pm = np.zeros(n), np.zeros(n), np.zeros(n)
+        for i in range(self.period, n):
+            final_ub[i], final_lb[i], pm[i] = self._trail(i, basic_ub[i], basic_lb[i], ma[i], ma[i - 1],
+                                                          final_ub[i - 1], final_lb[i - 1], pm[i - 1])
+        if atr_state is None or n == 0 or not np.isfinite(ma[-1]):
+            return pm, None
+        ma_state = ma[-1] if self.ma == "ema" else None
+        return pm, (ma_state, atr_state, ma[-1], final_ub[-1], final_lb[-1], pm[-1])
+
+    def step(self, a, i, state):
+        ma_state, atr_state, ma_prev, fub_prev, flb_prev, pm_prev = state
+        if self.ma == "ema":
+            ma, ma_state = self.ema.step(a, i, ma_state)
+        else:
+            ma = _source({k: v[i + 1 - self.length:i + 1] for k, v in a.items()}, self.src).mean()
+        atr, atr_state = self.atr.step(a, i, atr_state)
+        basic_ub, basic_lb = self._band(ma, atr)
+        fub, flb, pm = self._trail(i, basic_ub, basic_lb, ma, ma_prev, fub_prev, flb_prev, pm_prev)
+        return pm, (ma_state, atr_state, ma, fub, flb, pm)
+
+
+class Rolling(Indicator):
+    def __init__(self, kind, length, source="close", min_periods=None):
+        if kind not in ("mean", "median", "min", "max", "sum", "std"):
+            raise ValueError(f"unknown rolling {kind}")
+        self.kind, self.length, self.source = kind, int(length), source
+        self.min_periods = self.length if min_periods is None else int(min_periods)
+        self.sources = (source,)
+        self.lookback = self.length - 1
+        self.key = ("rolling", kind, self.length, source, self.min_periods)
+
+    def full(self, a):
+        window = pd.Series(a[self.source]).rolling(self.length, min_periods=self.min_periods)
+        return getattr(window, self.kind)().to_numpy(), None
+
+
+class MFI(Indicator):
+    sources = ("high", "low", "close", "volume")
+
+    def __init__(self, length):
+        self.length = int(length)
+        self.lookback = self.length
+        self.key = ("mfi", self.length)
+
+    def full(self, a):
+        return talib.MFI(a["high"], a["low"], a["close"], a["volume"], timeperiod=self.length), None
+
+
+class HMA(Indicator):
+    """Hull MA in the tv_hma / tv_wma form the Cenderawasih / MultiMA strategies use."""
+
+    def __init__(self, length, source="close"):
+        self.length, self.source = int(length), source
+        self.sources = (source,)
+        self.lookback = max(self.length - 2, 0) + max(math.floor(math.sqrt(self.length)) - 2, 0)
+        self.key = ("hma", self.length, source)
+
+    @staticmethod
+    def _wma(x, length):
+        # tv_wma: sum of x.shift(i) * (length - i) * length for i in 1..length-2, as one convolution
+        weights = np.array([(length - i) * length for i in range(1, length - 1)], dtype=float)
+        if not len(weights):
+            return np.zeros(len(x))
+        out = np.full(len(x), np.nan)
+        k = len(weights)
+        if len(x) > k:
+            out[k:] = np.convolve(x, weights, "valid")[:-1] / weights.sum()
+        return out
+
+    def full(self, a):
+        x = a[self.source]
+        h = 2 * self._wma(x, math.floor(self.length / 2)) - self._wma(x, self.length)
+        return self._wma(h, math.floor(math.sqrt(self.length))), None
+
+
+def ema(length, source="close"):
+    return EMA(length, source)
+
+
+def rsi(length, source="close"):
+    return RSI(length, source)
+
+
+def atr(length):
+    return ATR(length)
+
+
+def mfi(length):
+    return MFI(length)
+
+
+def hma(length, source="close"):
+    return HMA(length, source)
+
+
+def rolling(kind, length, source="close", min_periods=None):
+    return Rolling(kind, length, source, min_periods)
+
+
+def pmax(period, multiplier, length, ma="ema", src="ohlc4"):
+    return PMAX(period, multiplier, length, ma, src)
+
+
+def _warmup(values):
+    """Leading undefined rows of a full computation: (fill value, count)."""
+    if not len(values):
+        return np.nan, 0
+    fill = values[0]
+    same = np.isnan(values) if np.isnan(fill) else values == fill
+    if same.all():
+        return fill, 0
+    return fill, int(np.argmin(same))
+
+
+def _same_row(a, b):
+    return len(a) == len(b) and all(x == y or (x != x and y != y) for x, y in zip(a, b))
+
+
+class _Entry:
+    __slots__ = ("dates", "values", "state", "last_row", "updates", "warmup", "fill")
+
+
+class IncrementalIndicators:
+    def __init__(self, live=True, verify_every=VERIFY_EVERY, rtol=RTOL):
+        self.live = live
+        self.verify_every = verify_every
+        self.rtol = rtol
+        self._entries = {}
+        self._frame = None
+        self._columns = {}
+        self.stats = Counter()
+
+    def _arrays(self, dataframe, indicator, dates):
+        # several indicators on one dataframe: convert date / candle columns once
+        if dataframe is not self._frame:
+            self._frame, self._columns = dataframe, {}
+        cached = self._columns
+        a = {}
+        for c in indicator.sources:
+            if c not in cached or c not in CANDLE_COLUMNS:
+                cached[c] = dataframe[c].to_numpy(dtype=float)
+            a[c] = cached[c]
+        if dates is not None:
+            return a, dates.to_numpy(dtype="datetime64[ns]").view("int64")
+        if "date" not in cached:
+            cached["date"] = dataframe["date"].to_numpy(dtype="datetime64[ns]").view("int64")
+        return a, cached["date"]
+
+    def __call__(self, pair, dataframe, indicator, dates=None):
+        """
+        Values of `indicator` for every row of `dataframe` (numpy array).
+        :param dates: candle dates if `dataframe` has no date column (e.g. a heikinashi frame)
+        """
+        if not self.live:
+            self.stats["full"] += 1
+            return indicator.full({c: dataframe[c].to_numpy(dtype=float) for c in indicator.sources})[0]
+
+        a, dates = self._arrays(dataframe, indicator, dates)
+        n = len(dates)
+        # the same pair on another timeframe (informative) is another series
+        spacing = int(dates[1] - dates[0]) if n > 1 else 0
+        key = (pair, spacing, indicator.key)
+        entry = self._entries.get(key)
+        start = self._continues(entry, dates, a, indicator) if entry is not None else None
+        if start is None:
+            return self._full(key, dates, a, indicator)
+
+        overlap = len(entry.dates) - start
+        new = n - overlap
+        if new == 0:
+            return entry.values[start:]
+        if new > MAX_STEPS:
+            return self._full(key, dates, a, indicator)
+
+        if indicator.recursive:
+            state = entry.state
+            added = np.empty(new)
+            for j, i in enumerate(range(overlap, n)):
+                added[j], state = indicator.step(a, i, state)
+        else:
+            first = max(0, overlap - indicator.lookback)
+            added = indicator.full({c: v[first:] for c, v in a.items()})[0][-new:]
+            state = None
+        values = np.concatenate((entry.values[start:], added))
+        # rows that are still warm-up in this frame: as undefined as a full computation has them
+        values[:entry.warmup] = entry.fill
+        self.stats["incremental"] += 1
+
+        entry.updates += 1
+        if entry.updates >= self.verify_every:
+            values, state = self._verify(pair, indicator, a, values, state)
+            entry.updates = 0
+        entry.dates, entry.values, entry.state = dates, values, state
+        entry.last_row = tuple(v[-1] for v in a.values())
+        return values
+
+    def _continues(self, entry, dates, a, indicator):
+        """Row of the old frame where the new one starts, None if it doesn't continue it."""
+        old = entry.dates
+        start = int(np.searchsorted(old, dates[0]))
+        if start >= len(old) or old[start] != dates[0]:
+            return None
+        overlap = len(old) - start
+        if overlap > len(dates) or not np.array_equal(old[start:], dates[:overlap]):
+            return None
+        if indicator.recursive and entry.state is None:
+            return None
+        # candles don't change once closed - if the last one did, the data was reloaded
+        if not _same_row(tuple(v[overlap - 1] for v in a.values()), entry.last_row):
+            return None
+        return start
+
+    def _full(self, key, dates, a, indicator):
+        values, state = indicator.full(a)
+        entry = _Entry()
+        entry.dates, entry.values, entry.state, entry.updates = dates, values, state, 0
+        entry.fill, entry.warmup = _warmup(values)
+        entry.last_row = tuple(v[-1] for v in a.values()) if len(dates) else ()
+        self._entries[key] = entry
+        self.stats["full"] += 1
+        return values
+
+    def _verify(self, pair, indicator, a, values, state):
+        full, full_state = indicator.full(a)
+        self.stats["verified"] += 1
+        tail, full_tail = values[-VERIFY_ROWS:], full[-VERIFY_ROWS:]
+        if np.allclose(tail, full_tail, rtol=self.rtol, atol=0, equal_nan=True):
+            return values, state
+        with np.errstate(invalid="ignore", divide="ignore"):
+            drift = np.nanmax(np.abs(tail - full_tail) / np.abs(full_tail))
+        logger.warning(f"{pair} {indicator.key}: incremental values drifted (max rel {drift:.2e}), recomputed")
+        self.stats["drift"] += 1
+        return full, full_state
+
+    def clear(self, pair=None):
+        if pair is None:
+            self._entries.clear()
+        else:
+            self._entries = {k: v for k, v in self._entries.items() if k[0] != pair}
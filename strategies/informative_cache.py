@@ -0,0 +1,40 @@
+"""
+Compute each @informative frame once and share it between all traded pairs.
+
+`@informative(timeframe, 'BTC/{stake}')` runs its populate method for every
+pair of the whitelist - the same BTC indicators over the same candles, N times,
+and the result is prepared for the merge N times as well. freqtrade keeps
+populated informative frames in a cache keyed by (method, asset, timeframe)
+and the last informative candle, but only creates that cache in dry-run / live.
+share_informatives gives backtesting and hyperopt the same cache, so a shared
+informative is computed once per backtest and every pair merges the one
+prepared frame:
+
+    from informative_cache import share_informatives
+
+    def bot_start(self, **kwargs):
+        share_informatives(self)
+
+Informatives of the pair itself (`@informative('1d')`) are still one
+computation per pair - there is nothing to share. A method that must run for
+every pair (side effects, state) opts out with `@informative(..., cache=False)`.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAXSIZE = 500
+
+
+def share_informatives(strategy, maxsize=MAXSIZE):
+    """Enable freqtrade's informative cache in every run mode. :return: the cache, None if nothing to cache"""
+    cache = getattr(strategy, "_ft_informative_cache", None)
+    if cache is not None:
+        return cache  # dry-run / live: freqtrade created it already
+    if not any(inf_data.cache for inf_data, _ in getattr(strategy, "_ft_informative", [])):
+        return None
+    from freqtrade.strategy.informative_decorator import InformativeCache
+
+    strategy._ft_informative_cache = InformativeCache(maxsize=maxsize)
+    logger.info("Sharing informative dataframes between pairs")
+    return strategy._ft_informative_cache
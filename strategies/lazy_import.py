@@ -0,0 +1,67 @@
+"""
+Lazy module imports for strategies.
+
+    from lazy_import import lazy
+    pta = lazy("pandas_ta")
+    preprocessing = lazy("sklearn.preprocessing")
+
+`pta` is a stand-in: the real import happens on the first attribute access
+(`pta.rsx(...)`), i.e. when the indicator that needs it is first computed,
+not when freqtrade loads the strategy file. Later accesses go straight to the
+module. Import errors surface at that first access.
+
+Don't use it for modules imported for their side effects - `import pandas_ta`
+registers the `df.ta` accessor, which then only exists once something else
+touched `pta`.
+
+Strategies in sub directories of strategies/ are loaded with only their own
+directory on sys.path, they add the strategies/ directory first:
+
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+"""
+import importlib
+import sys
+import time
+
+# module name -> seconds the deferred import took
+import_times = {}
+
+
+class LazyModule:
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", sys.modules.get(name))
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            start = time.perf_counter()
+            module = importlib.import_module(self._name)
+            import_times[self._name] = time.perf_counter() - start
+            object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy(name):
+    """Module `name`, imported on first attribute access."""
+    return LazyModule(name)
+
+
+def loaded(module):
+    """True once a lazy module has been imported."""
+    return not isinstance(module, LazyModule) or module._module is not None
@@ -22,7 +22,14 @@ from pandas import DataFrame
 # --- Do not remove these libs ---
 import numpy as np  # noqa
 import pandas as pd  # noqa
-from sklearn import preprocessing
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from lazy_import import lazy
+
+# sklearn takes longer to import than the rest of the strategy, only MinMaxScaler is used
+preprocessing = lazy("sklearn.preprocessing")
 
 # --------------------------------
 # Add your lib to import here
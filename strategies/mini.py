@@ -35,6 +35,8 @@ from freqtrade.strategy import (
 import talib.abstract as ta
 from technical import qtpylib
 
+from candle_cache import LastCandles
+
 
 class mini(IStrategy):
     """
@@ -193,6 +195,10 @@ class mini(IStrategy):
     # This number is explained a bit further down
     max_dca_multiplier = 5.5
 
+    def bot_start(self, **kwargs) -> None:
+        # last / previous candle for the trade callbacks, rebuilt once per candle
+        self.candles = LastCandles(self, depth=2)
+
     # This is called when placing the initial order (opening trade)
     def custom_stake_amount(self, pair: str, current_time: datetime, current_rate: float,
                             proposed_stake: float, min_stake: float | None, max_stake: float,
@@ -263,10 +269,11 @@ class mini(IStrategy):
 
         # print(f"Adjusting position for {trade.pair}  {trade.stake_amount} at {current_time} with profit {current_profit}")
         # Obtain pair dataframe (just to show how to access it)
-        dataframe, _ = self.dp.get_analyzed_dataframe(trade.pair, self.timeframe)
+        candles = self.candles.rows(trade.pair)
+        if len(candles) < 2:
+            return None
         # Only buy when not actively falling price.
-        last_candle = dataframe.iloc[-1].squeeze()
-        previous_candle = dataframe.iloc[-2].squeeze()
+        last_candle, previous_candle = candles[0], candles[1]
         if last_candle["close"] < previous_candle["close"]:
             return None
 
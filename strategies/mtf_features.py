@@ -0,0 +1,201 @@
+"""
+@informative timeframes as aligned numpy arrays instead of merged columns.
+
+freqtrade merges every @informative frame into the strategy's dataframe with a
+date join: each informative column becomes a full-length (suffixed) column of
+the base timeframe - a 1d flag is repeated 288 times a day on 5m candles, and
+the merge copies the whole frame once per informative method.
+AlignedFeatures takes the strategy's @informative methods over and keeps per
+pair, for every informative (asset, timeframe):
+
+    columns     the informative frame's own rows, one array per column
+    index map   base candle -> row of the last informative candle closed by then
+
+A value on the base timeframe is a gather `column[index_map]`, and
+`tensor(pair)` stacks everything as timeframe x base candle x feature:
+
+    feature_tensor = True      # False: the regular merged columns
+
+    def bot_start(self, **kwargs):
+        self.mtf = AlignedFeatures(self, enabled=self.feature_tensor)
+
+    def informative_pairs(self):
+        return self.mtf.informative_pairs() if hasattr(self, "mtf") else []
+
+    def populate_indicators(self, dataframe, metadata):
+        self.mtf.populate(dataframe, metadata)
+        ...
+
+    def populate_entry_trend(self, dataframe, metadata):
+        age_ok = self.mtf.get(dataframe, metadata, "age_filter_ok_1d")   # name as merged
+
+`get` returns the merged column itself when disabled, so the strategy code is
+the same either way. The alignment is merge_informative_pair's: a candle is
+visible from the base candle that closes with it on (forward filled unless
+the decorator says ffill=False). Rows before the first informative candle are
+NaN (False for boolean columns). An informative of another asset (BTC/{stake})
+is computed once per candle and shared by all pairs - disabled, through
+freqtrade's own informative cache (informative_cache.share_informatives).
+
+This relies on freqtrade internals (strategy._ft_informative and
+informative_decorator._format_pair_name); it fails on import / construction
+if a freqtrade version doesn't have them rather than silently merging.
+"""
+import numpy as np
+
+from freqtrade.exchange import timeframe_to_seconds
+from freqtrade.strategy.informative_decorator import _format_pair_name
+
+from informative_cache import share_informatives
+
+NS_PER_SECOND = 10**9
+
+
+def _dates_ns(dataframe):
+    return dataframe["date"].to_numpy(dtype="datetime64[ns]").view("int64")
+
+
+def _pair_formats(market):
+    if not market:
+        return {}
+    return {"base": market["base"].lower(), "BASE": market["base"].upper(),
+            "quote": market["quote"].lower(), "QUOTE": market["quote"].upper()}
+
+
+class _Slot:
+    """One informative (asset, timeframe) of one pair."""
+    __slots__ = ("timeframe", "asset", "columns", "index")
+
+    def __init__(self, timeframe, asset, columns, index):
+        self.timeframe, self.asset, self.columns, self.index = timeframe, asset, columns, index
+
+    def gather(self, column, rows=slice(None)):
+        index = self.index[rows]
+        values = self.columns[column][np.maximum(index, 0)]
+        missing = index < 0
+        if missing.any():
+            if values.dtype == bool:
+                values[missing] = False
+            else:
+                values = values.astype(float if values.dtype.kind in "iuf" else object)
+                values[missing] = np.nan
+        return values
+
+
+class AlignedFeatures:
+    def __init__(self, strategy, enabled=True):
+        self.strategy = strategy
+        self.enabled = enabled
+        self._informatives = []
+        self._pairs = {}
+        self._shared = {}
+        if not hasattr(strategy, "_ft_informative"):
+            raise AttributeError(f"{type(strategy).__name__} has no _ft_informative - AlignedFeatures needs "
+                                 "a freqtrade version that collects @informative methods there")
+        if enabled:
+            # freqtrade merges whatever is in _ft_informative before populate_indicators
+            self._informatives, strategy._ft_informative = list(strategy._ft_informative), []
+        else:
+            share_informatives(strategy)
+
+    def informative_pairs(self):
+        """(pair, timeframe, candle_type) freqtrade has to provide for the taken-over methods."""
+        if not self.enabled:
+            return []
+        whitelist = self.strategy.dp.current_whitelist()
+        pairs = []
+        for inf_data, _ in self._informatives:
+            assets = dict.fromkeys(self._asset(inf_data, pair) for pair in whitelist)
+            pairs += [(asset, inf_data.timeframe, inf_data.candle_type) for asset in assets]
+        return pairs
+
+    def _asset(self, inf_data, pair):
+        if not inf_data.asset:
+            return pair
+        return _format_pair_name(self.strategy.config, inf_data.asset, self.strategy.dp.market(pair))
+
+    def _name(self, inf_data, asset, column):
+        """Column name freqtrade's merge would give `column`."""
+        fmt = inf_data.fmt or ("{base}_{quote}_{column}_{timeframe}" if inf_data.asset else "{column}_{timeframe}")
+        formatter = fmt if callable(fmt) else fmt.format
+        return formatter(column=column, asset=asset, timeframe=inf_data.timeframe,
+                         **_pair_formats(self.strategy.dp.market(asset)))
+
+    def _informative(self, inf_data, populate_fn, asset):
+        """Populated columns of one informative frame + its candle close times, shared between pairs."""
+        dp = self.strategy.dp
+        dataframe = dp.get_pair_dataframe(asset, inf_data.timeframe, inf_data.candle_type)
+        if dataframe.empty:
+            raise ValueError(f"Informative dataframe for ({asset}, {inf_data.timeframe}) is empty.")
+        key = (populate_fn.__qualname__, asset, inf_data.timeframe)
+        fingerprint = (len(dataframe), dataframe["date"].iloc[-1])
+        shared = self._shared.get(key)
+        if shared is not None and shared[0] == fingerprint:
+            return shared[1], shared[2]
+        dataframe = populate_fn(self.strategy, dataframe, {"pair": asset, "timeframe": inf_data.timeframe})
+        close = _dates_ns(dataframe) + timeframe_to_seconds(inf_data.timeframe) * NS_PER_SECOND
+        columns = {c: dataframe[c].to_numpy() for c in dataframe.columns if c != "date"}
+        self._shared[key] = (fingerprint, columns, close)
+        return columns, close
+
+    def populate(self, dataframe, metadata):
+        """Compute and align all informatives of `metadata['pair']` to `dataframe` (call in populate_indicators)."""
+        if not self.enabled:
+            return
+        pair = metadata["pair"]
+        dates = _dates_ns(dataframe)
+        base_close = dates + timeframe_to_seconds(self.strategy.timeframe) * NS_PER_SECOND
+        slots, names = [], {}
+        for inf_data, populate_fn in self._informatives:
+            asset = self._asset(inf_data, pair)
+            columns, close = self._informative(inf_data, populate_fn, asset)
+            index = np.searchsorted(close, base_close, side="right") - 1
+            if not inf_data.ffill:
+                index[close[np.maximum(index, 0)] != base_close] = -1
+            for column in columns:
+                names[self._name(inf_data, asset, column)] = (len(slots), column)
+            slots.append(_Slot(inf_data.timeframe, asset, columns, index))
+        self._pairs[pair] = (dates, slots, names)
+
+    def get(self, dataframe, metadata, name):
+        """Informative column `name` (as merged, e.g. 'rsi_1h') on the base candles of `dataframe`."""
+        if not self.enabled:
+            return dataframe[name]
+        dates, slots, names = self._pairs[metadata["pair"]]
+        slot, column = names[name]
+        return slots[slot].gather(column, self._rows(metadata["pair"], dates, dataframe))
+
+    @staticmethod
+    def _rows(pair, dates, dataframe):
+        # hyperopt hands populate_entry_trend the frame without its startup candles
+        if len(dataframe) == len(dates):
+            return slice(None)
+        frame_dates = _dates_ns(dataframe)
+        start = int(np.searchsorted(dates, frame_dates[0])) if len(frame_dates) else 0
+        end = start + len(frame_dates)
+        if end > len(dates) or (len(frame_dates) and dates[end - 1] != frame_dates[-1]):
+            raise ValueError(f"{pair}: dataframe is not a part of the one populate() aligned features to")
+        return slice(start, end)
+
+    def tensor(self, pair, features=None):
+        """
+        timeframe x base candle x feature array (float, NaN where a timeframe lacks a feature).
+        :return: (array, [(asset, timeframe)], features)
+        """
+        dates, slots, _ = self._pairs[pair]
+        n = len(dates)
+        if features is None:
+            features = list(dict.fromkeys(c for slot in slots for c in slot.columns))
+        out = np.full((len(slots), n, len(features)), np.nan)
+        for t, slot in enumerate(slots):
+            for f, column in enumerate(features):
+                if column in slot.columns:
+                    out[t, :, f] = slot.gather(column)
+        return out, [(slot.asset, slot.timeframe) for slot in slots], features
+
+    def clear(self, pair=None):
+        if pair is None:
+            self._pairs.clear()
+            self._shared.clear()
+        else:
+            self._pairs.pop(pair, None)
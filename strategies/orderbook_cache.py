@@ -0,0 +1,141 @@
+"""
+One order book snapshot per pair and bot loop, shared by pricing and strategy code.
+
+With `use_order_book: true` in exit_pricing every open trade's exit rate is a
+blocking order book request on every loop, and any `dp.orderbook` in the
+strategy fetches the same book again. OrderBookCache fetches the books of the
+pairs with open trades at once, concurrently, and serves every lookup from that
+snapshot while it's younger than `max_age` seconds:
+
+    from orderbook_cache import OrderBookCache
+
+    def bot_start(self, **kwargs):
+        self.orderbooks = OrderBookCache(self, max_age=10)
+
+    def bot_loop_start(self, current_time, **kwargs):
+        self.orderbooks.refresh()
+
+    def populate_indicators(self, dataframe, metadata):
+        ob = self.orderbooks.get(metadata["pair"], 1)
+
+The exchange's own fetch_l2_order_book is routed through the cache as well
+(install=True), so freqtrade's pricing uses the snapshot without changes to
+the config. Every request - prefetch or miss - goes through the exchange's
+original fetch_l2_order_book, so freqtrade's limit handling and retries apply.
+Books younger than `max_age` aren't fetched again by refresh(). Whitelisted
+pairs without a trade are only prefetched with whitelist=True: their entry rates
+are cached by freqtrade for 300s, most of those books would go unused. Books
+deeper than `depth` (depth of market check, dry-run order fills) and stale
+snapshots go to the exchange as before, uncached. Outside dry-run / live it does
+nothing.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+MAX_AGE = 10
+# concurrent requests per refresh, ccxt's rate limiter still applies
+WORKERS = 8
+
+
+class OrderBookCache:
+    def __init__(self, strategy, max_age=MAX_AGE, depth=None, whitelist=False, install=True):
+        """
+        :param depth: levels to fetch, default the largest order_book_top of entry / exit pricing
+        :param whitelist: prefetch every whitelisted pair, not only those with open trades
+        """
+        self.strategy = strategy
+        self.max_age = max_age
+        config = strategy.config
+        self.depth = depth or max(config.get("entry_pricing", {}).get("order_book_top", 1),
+                                  config.get("exit_pricing", {}).get("order_book_top", 1))
+        self.whitelist = whitelist
+        self._books = {}
+        self._fetch = None
+        self.hits = self.misses = 0
+        self.live = strategy.dp.runmode.value in ("live", "dry_run")
+        if self.live and install:
+            self.install()
+
+    def install(self):
+        """Route the exchange's fetch_l2_order_book (used by get_rate) through the cache."""
+        exchange = self.strategy.dp._exchange
+        if self._fetch is not None:
+            return
+        # the bound @retrier method - misses and prefetches keep freqtrade's retries
+        self._fetch = exchange.fetch_l2_order_book
+
+        def fetch_l2_order_book(pair, limit=100):
+            return self.get(pair, limit)
+
+        exchange.fetch_l2_order_book = fetch_l2_order_book
+
+    def _pairs(self):
+        from freqtrade.persistence import Trade
+
+        pairs = dict.fromkeys(trade.pair for trade in Trade.get_open_trades())
+        if self.whitelist:
+            pairs.update(dict.fromkeys(self.strategy.dp.current_whitelist()))
+        return list(pairs)
+
+    def _fresh(self, pair, now):
+        cached = self._books.get(pair)
+        return cached is not None and now - cached[0] <= self.max_age
+
+    def refresh(self, pairs=None):
+        """
+        Fetch the books of `pairs` (default: open trades, + whitelist with whitelist=True)
+        concurrently, skipping those fetched less than `max_age` seconds ago.
+        :return: number of books fetched
+        """
+        if not self.live:
+            return 0
+        started = time.monotonic()
+        pairs = self._pairs() if pairs is None else list(pairs)
+        pairs = [pair for pair in pairs if not self._fresh(pair, started)]
+        if not pairs:
+            return 0
+        fetch = self._fetch or self.strategy.dp._exchange.fetch_l2_order_book
+
+        def fetch_one(pair):
+            try:
+                return fetch(pair, self.depth)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(min(WORKERS, len(pairs))) as pool:
+            books = list(pool.map(fetch_one, pairs))
+        fetched = 0
+        for pair, book in zip(pairs, books):
+            if isinstance(book, Exception):
+                # a failing pair is fetched on demand instead
+                logger.warning(f"Order book for {pair} not prefetched: {book.__class__.__name__} {book}")
+                self._books.pop(pair, None)
+                continue
+            self._books[pair] = (started, self.depth, book)
+            fetched += 1
+        logger.debug(f"Prefetched {fetched} order books in {time.monotonic() - started:.2f}s")
+        return fetched
+
+    def get(self, pair, maximum=1):
+        """
+        Order book of `pair` with up to `maximum` levels - the snapshot while fresh enough.
+        Deeper than `depth` always comes from the exchange and isn't cached.
+        """
+        fetch = self._fetch or self.strategy.dp._exchange.fetch_l2_order_book
+        if maximum > self.depth:
+            return fetch(pair, maximum)
+        cached = self._books.get(pair)
+        if cached is None or time.monotonic() - cached[0] > self.max_age:
+            self.misses += 1
+            fetched_at = time.monotonic()
+            cached = self._books[pair] = (fetched_at, self.depth, fetch(pair, self.depth))
+        else:
+            self.hits += 1
+        book = cached[2]
+        return {**book, "bids": book["bids"][:maximum], "asks": book["asks"][:maximum]}
+
+    def clear(self):
+        self._books.clear()
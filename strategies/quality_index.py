@@ -0,0 +1,184 @@
+"""
+Read side of the data-quality index built by script/data_quality.py.
+
+For every (exchange, pair, timeframe, candle_type) the index holds the candle
+file's missing-candle gaps, duplicate timestamps, zero-volume runs and first
+traded candle (cache/quality_index-<exchange>.json). Strategies can replace
+per-run checks like
+    dataframe['volume'].rolling(72).min() > 0
+with a lookup (live_data_ok / listed_days / bad_rows). The index describes the
+files on disk, so it only applies to backtesting / hyperopt, and only to dates
+it covers (`covers`) - fall back to the rolling check otherwise:
+
+    from quality_index import QualityIndex
+
+    def bot_start(self, **kwargs):
+        self.quality = QualityIndex.from_config(self.config)   # None without an index
+
+    def populate_indicators(self, dataframe, metadata):
+        pair = metadata['pair']
+        if self.quality is not None and self.quality.covers(pair, self.timeframe, dataframe['date']):
+            dataframe['live_data_ok'] = self.quality.live_data_ok(pair, self.timeframe, dataframe['date'])
+        else:
+            dataframe['live_data_ok'] = dataframe['volume'].rolling(72, min_periods=72).min() > 0
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = Path(__file__).resolve().parents[1] / "cache"
+INDEX_VERSION = 2
+NS_PER_DAY = 86400 * 1_000_000_000
+
+
+def index_path(exchange, cachedir=CACHE_DIR):
+    return Path(cachedir) / f"quality_index-{exchange}.json"
+
+
+def entry_key(pair, timeframe, candle_type):
+    return f"{pair}|{timeframe}|{candle_type}"
+
+
+def candle_type_for(trading_mode):
+    """Candle type of the files freqtrade trades on in `trading_mode` (config['trading_mode'])."""
+    return "futures" if trading_mode == "futures" else "spot"
+
+
+def read_index_file(path):
+    try:
+        with open(path) as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "entries": {}}
+
+
+def _dates_ns(dates):
+    """Series / Index / array of datetimes -> int64 ns since epoch."""
+    return pd.DatetimeIndex(pd.to_datetime(dates, utc=True)).tz_convert(None).as_unit("ns").asi8
+
+
+class QualityIndex:
+    """
+    Runs and gaps are kept as sorted int64 arrays so that lookups for a whole
+    date column are a single searchsorted.
+
+        qi = QualityIndex.load("binance", "futures")
+        dataframe['live_data_ok'] = qi.live_data_ok(metadata['pair'], self.timeframe, dataframe['date'])
+    """
+
+    def __init__(self, entries, candle_type="spot"):
+        self.entries = entries
+        self.candle_type = candle_type
+        self._arrays = {}
+
+    @classmethod
+    def load(cls, exchange="binance", candle_type="spot", cachedir=CACHE_DIR):
+        path = index_path(exchange, cachedir)
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found, run `python script/data_quality.py --scan` first")
+        return cls(read_index_file(path)["entries"], candle_type)
+
+    @classmethod
+    def from_config(cls, config, cachedir=CACHE_DIR):
+        """Index of the configured exchange and trading mode, None outside backtesting / hyperopt or without one."""
+        if config["runmode"].value not in ("backtest", "hyperopt"):
+            return None
+        try:
+            return cls.load(config["exchange"]["name"], candle_type_for(config.get("trading_mode", "spot")),
+                            cachedir)
+        except FileNotFoundError:
+            return None
+
+    def get(self, pair, timeframe):
+        return self.entries.get(entry_key(pair, timeframe, self.candle_type))
+
+    def _entry(self, pair, timeframe):
+        entry = self.get(pair, timeframe)
+        if entry is None:
+            raise KeyError(f"{entry_key(pair, timeframe, self.candle_type)} is not in the quality index")
+        return entry
+
+    def pairs(self, timeframe=None):
+        out = set()
+        for key in self.entries:
+            pair, tf, ct = key.split("|")
+            if ct == self.candle_type and (timeframe is None or tf == timeframe):
+                out.add(pair)
+        return sorted(out)
+
+    def covers(self, pair, timeframe, dates):
+        """True if the index has `pair` and its scanned file spans all of `dates`."""
+        entry = self.get(pair, timeframe)
+        if entry is None or entry["first_date"] is None or not len(dates):
+            return False
+        dates = _dates_ns(dates)
+        return entry["first_date"] <= dates.min() and dates.max() <= entry["last_date"]
+
+    def _runs(self, pair, timeframe):
+        key = entry_key(pair, timeframe, self.candle_type)
+        if key not in self._arrays:
+            entry = self._entry(pair, timeframe)
+            runs = np.asarray(entry["zero_volume_runs"], dtype=np.int64).reshape(-1, 3)
+            gaps = np.asarray(entry["gaps"], dtype=np.int64).reshape(-1, 3)
+            self._arrays[key] = (runs[:, 0], runs[:, 1], runs[:, 2], gaps[:, 0], gaps[:, 1])
+        return self._arrays[key]
+
+    def listing_date(self, pair, timeframe="1d"):
+        """First candle with volume > 0, as a UTC Timestamp (or None)."""
+        entry = self.get(pair, timeframe)
+        if entry is None:
+            # fall back to any timeframe we know for this pair
+            dates = [e["first_trade_date"] for k, e in self.entries.items()
+                     if k.startswith(f"{pair}|") and k.endswith(f"|{self.candle_type}")
+                     and e.get("first_trade_date") is not None]
+            first = min(dates) if dates else None
+        else:
+            first = entry["first_trade_date"]
+        return None if first is None else pd.Timestamp(first, tz="UTC")
+
+    def listed_days(self, pair, dates, timeframe="1d"):
+        """Days since the first traded candle for every date (negative before listing)."""
+        first = self.listing_date(pair, timeframe)
+        dates = _dates_ns(dates)
+        if first is None:
+            return np.full(dates.shape, -1.0)
+        return (dates - first.value) / NS_PER_DAY
+
+    def live_data_ok(self, pair, timeframe, dates, window=72):
+        """
+        Time-based version of `volume.rolling(window, min_periods=window).min() > 0`,
+        computed from the stored zero-volume runs and gaps: a candle is ok if no
+        zero-volume or missing candle falls in the last `window` candles and the
+        file reaches back at least `window` candles.
+        """
+        entry = self._entry(pair, timeframe)
+        run_start, run_end, _, gap_before, gap_after = self._runs(pair, timeframe)
+        dates = _dates_ns(dates)
+        window_start = dates - (window - 1) * entry["step"]
+
+        ok = window_start >= entry["first_date"]
+        if run_start.size:
+            last = np.searchsorted(run_start, dates, side="right") - 1
+            hit = (last >= 0) & (run_end[np.maximum(last, 0)] >= window_start)
+            ok &= ~hit
+        if gap_before.size:
+            # a hole in the file means the rolling window in the stored frame is shorter
+            last = np.searchsorted(gap_after, dates, side="right") - 1
+            hit = (last >= 0) & (gap_after[np.maximum(last, 0)] > window_start)
+            ok &= ~hit
+        return ok
+
+    def bad_rows(self, pair, timeframe, dates, min_run=1):
+        """True for candles inside a zero-volume run of at least `min_run` candles."""
+        run_start, run_end, lengths, _, _ = self._runs(pair, timeframe)
+        dates = _dates_ns(dates)
+        if not run_start.size:
+            return np.zeros(dates.shape, dtype=bool)
+        last = np.searchsorted(run_start, dates, side="right") - 1
+        safe = np.maximum(last, 0)
+        return (last >= 0) & (dates <= run_end[safe]) & (lengths[safe] >= min_run)
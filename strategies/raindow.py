@@ -36,6 +36,8 @@ import talib.abstract as ta
 import pandas_ta as pta
 from technical import qtpylib
 
+from orderbook_cache import OrderBookCache
+
 
 class raindow(IStrategy):
     INTERFACE_VERSION = 3
@@ -145,6 +147,13 @@ class raindow(IStrategy):
         """
         return []
 
+    def bot_start(self, **kwargs) -> None:
+        # one order book per pair and loop for entry / exit pricing and the strategy
+        self.orderbooks = OrderBookCache(self, max_age=10)
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        self.orderbooks.refresh()
+
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
 
         # RSI
@@ -167,7 +176,7 @@ class raindow(IStrategy):
         # first check if dataprovider is available
         if self.dp:
             if self.dp.runmode.value in ("live", "dry_run"):
-                ob = self.dp.orderbook(metadata["pair"], 1)
+                ob = self.orderbooks.get(metadata["pair"], 1)
                 dataframe["best_bid"] = ob["bids"][0][0]
                 dataframe["best_ask"] = ob["asks"][0][0]
         """
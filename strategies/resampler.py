@@ -0,0 +1,97 @@
+"""
+Higher timeframe candles from the strategy's own dataframe, without pandas resample.
+
+technical.util.resample_to_interval goes through a DatetimeIndex, `.resample()`
+and `.agg()`, and resampled_merge through a date merge plus a ffill of the
+whole frame - on every populate call. Here candles are assigned to buckets
+with integer arithmetic on their epoch nanoseconds, OHLCV are segment
+reductions (`np.maximum.reduceat`, ...) over the bucket boundaries, and the
+merge back is a searchsorted gather:
+
+    from resampler import resample, merge_resampled
+
+    resampled = resample(dataframe, 180)                  # date open high low close volume
+    resampled['atr'] = ta.ATR(resampled, timeperiod=14)
+    dataframe = merge_resampled(dataframe, resampled, 180, ['atr'])   # -> resample_180_atr
+
+    short, long = resample(dataframe, [10, 40]).values()  # several intervals, dates converted once
+
+Buckets start at midnight of the first candle's day like pandas' default
+origin, so the values are the same as resample_to_interval's. A row gets the
+last bucket that has closed by the row's close - the bucket itself from its
+last candle on, never one still forming (no lookahead) - as resampled_merge +
+ffill does. A leading bucket the data starts in the middle of is kept (also
+like resample_to_interval).
+"""
+import numpy as np
+import pandas as pd
+
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_DAY = 24 * 60 * NS_PER_MINUTE
+
+
+def _dates_ns(dataframe):
+    return dataframe["date"].to_numpy(dtype="datetime64[ns]").view("int64")
+
+
+def _base_step(ns):
+    """Candle length of the dataframe (smallest gap between two rows)."""
+    if len(ns) < 2:
+        raise ValueError("Need at least two candles to resample")
+    return int(np.diff(ns).min())
+
+
+def _resample_ns(dataframe, ns, minutes, tz):
+    step = int(minutes) * NS_PER_MINUTE
+    origin = ns[0] - ns[0] % NS_PER_DAY
+    ids = (ns - origin) // step
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ns)] - 1
+    out = pd.DataFrame({"date": pd.to_datetime(origin + ids[starts] * step, utc=True).tz_convert(tz)})
+    out["open"] = dataframe["open"].to_numpy()[starts]
+    out["high"] = np.maximum.reduceat(dataframe["high"].to_numpy(), starts)
+    out["low"] = np.minimum.reduceat(dataframe["low"].to_numpy(), starts)
+    out["close"] = dataframe["close"].to_numpy()[ends]
+    if "volume" in dataframe.columns:
+        out["volume"] = np.add.reduceat(dataframe["volume"].to_numpy(), starts)
+    return out
+
+
+def resample(dataframe, minutes):
+    """
+    OHLCV of `dataframe` in `minutes` buckets, date = bucket start.
+    :param minutes: one interval, or a list of them -> {minutes: DataFrame}
+    """
+    ns = _dates_ns(dataframe)
+    if len(ns) == 0:
+        raise ValueError("Cannot resample an empty dataframe")
+    tz = dataframe["date"].dt.tz
+    if np.ndim(minutes) == 0:
+        return _resample_ns(dataframe, ns, minutes, tz)
+    return {m: _resample_ns(dataframe, ns, m, tz) for m in minutes}
+
+
+def merge_resampled(dataframe, resampled, minutes, columns=None, prefix=None):
+    """
+    Add `columns` of `resampled` (default: all but date) to `dataframe` as `resample_<minutes>_<column>`.
+    Each row gets the last bucket closed at the row's close, NaN before the first one.
+    """
+    ns = _dates_ns(dataframe)
+    bucket_close = _dates_ns(resampled) + int(minutes) * NS_PER_MINUTE
+    row_close = ns + _base_step(ns)
+    if int(minutes) * NS_PER_MINUTE <= row_close[0] - ns[0]:
+        raise ValueError("Tried to merge a faster timeframe to a slower timeframe.")
+    idx = np.searchsorted(bucket_close, row_close, side="right") - 1
+    missing = idx < 0
+    idx[missing] = 0
+    prefix = f"resample_{int(minutes)}_" if prefix is None else prefix
+    columns = [c for c in resampled.columns if c != "date"] if columns is None else columns
+    merged = {}
+    for column in columns:
+        values = resampled[column].to_numpy()
+        gathered = values[idx] if len(values) else np.full(len(ns), np.nan)
+        if missing.any():
+            gathered = gathered.astype(float if gathered.dtype.kind in "biuf" else object)
+            gathered[missing] = np.nan
+        merged[prefix + column] = gathered
+    return pd.concat([dataframe, pd.DataFrame(merged, index=dataframe.index)], axis=1)
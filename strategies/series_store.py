@@ -0,0 +1,111 @@
+"""
+Indicator values by candle time for custom_stoploss / custom_exit.
+
+Strategies used to keep `dataframe[['date', 'sar']].copy().set_index('date')`
+per pair and look rows up with `.loc` / `get_loc(..., method='ffill')` - a
+pandas index lookup per trade per candle, and backtest-only because in live
+`current_time` is not a candle date. SeriesStore keeps the dates as sorted
+int64 nanoseconds and each registered column as a contiguous numpy array.
+Lookups are offset arithmetic when the candles have no gaps and a
+searchsorted otherwise.
+
+    def bot_start(self, **kwargs):
+        self.series = SeriesStore(self.timeframe, live=self.dp.runmode.value in ("live", "dry_run"))
+
+    def populate_indicators(self, dataframe, metadata):
+        ...
+        self.series.register(metadata["pair"], dataframe, ["sar"])
+
+    def custom_stoploss(self, pair, trade, current_time, ...):
+        sar = self.series.closed(pair, "sar", current_time)   # the row dataframe.iloc[-1] has
+        entry_sl = self.series.at(pair, "stoploss_rate", trade.open_date_utc)
+
+`closed()` is the candle dp.get_analyzed_dataframe() ends with at `current_time`
+(what `dataframe.iloc[-1]` gives in a callback). That differs by run mode: live /
+dry-run it is the last candle closed by `current_time`; in backtesting freqtrade
+slices the analyzed dataframe through the candle dated `current_time` (the
+candle being simulated), so with live=False `closed()` is that candle, the same
+as `at()`. `at()` is the candle that started at or before `time`. Both return
+None when there is no such candle.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from freqtrade.exchange import timeframe_to_seconds
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US = timedelta(microseconds=1)
+
+
+def _ns(time):
+    """Aware datetime / pandas Timestamp -> int ns since epoch."""
+    value = getattr(time, "value", None)  # pd.Timestamp
+    if value is not None:
+        return int(value)
+    return (time - _EPOCH) // _US * 1000
+
+
+def _value(array, i):
+    value = array[i]
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class _Series:
+    __slots__ = ("dates", "columns", "start", "step", "regular")
+
+    def __init__(self, dates, columns, step):
+        self.dates = dates
+        self.columns = columns
+        self.start = int(dates[0]) if len(dates) else 0
+        self.step = step
+        # no missing candles: row i is at start + i * step
+        self.regular = len(dates) > 0 and int(dates[-1]) - self.start == (len(dates) - 1) * step
+
+    def index(self, t):
+        """Row of the last candle starting at or before `t` (ns), -1 if none."""
+        if self.regular:
+            if t < self.start:
+                return -1
+            return min((t - self.start) // self.step, len(self.dates) - 1)
+        return int(np.searchsorted(self.dates, t, side="right")) - 1
+
+
+class SeriesStore:
+    def __init__(self, timeframe, live=True):
+        """:param live: dry-run / live - closed() is a candle earlier than in backtesting"""
+        self.step = timeframe_to_seconds(timeframe) * 10**9
+        self.live = live
+        self._pairs = {}
+
+    def register(self, pair, dataframe, columns):
+        """Take `columns` of an analyzed dataframe (replaces what was registered for `pair`)."""
+        dates = dataframe["date"].to_numpy(dtype="datetime64[ns]").view("int64")
+        data = {c: np.ascontiguousarray(dataframe[c].to_numpy()) for c in columns}
+        self._pairs[pair] = _Series(dates, data, self.step)
+
+    def __contains__(self, pair):
+        return pair in self._pairs
+
+    def at(self, pair, column, time):
+        """`column` of the candle that started at or before `time`."""
+        series = self._pairs.get(pair)
+        if series is None:
+            return None
+        i = series.index(_ns(time))
+        return _value(series.columns[column], i) if i >= 0 else None
+
+    def closed(self, pair, column, time):
+        """`column` of the row the analyzed dataframe ends with at `time` (see the module docstring)."""
+        series = self._pairs.get(pair)
+        if series is None:
+            return None
+        i = series.index(_ns(time) - (self.step if self.live else 0))
+        return _value(series.columns[column], i) if i >= 0 else None
+
+    def row(self, pair, time, closed=True):
+        """All registered columns of one candle as a dict (see at / closed)."""
+        series = self._pairs.get(pair)
+        if series is None:
+            return None
+        i = series.index(_ns(time) - (self.step if closed and self.live else 0))
+        return {c: _value(v, i) for c, v in series.columns.items()} if i >= 0 else None
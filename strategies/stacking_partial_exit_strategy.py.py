@@ -2,6 +2,7 @@
 # --- 放置于 user_data/strategies/ 目录下 ---
 
 import logging
+from dataclasses import dataclass
 from typing import Optional, Dict, List
 import pandas as pd
 import freqtrade.vendor.qtpylib.indicators as qtpylib
@@ -11,10 +12,19 @@ from freqtrade.strategy import IStrategy, IntParameter
 from pandas import DataFrame
 from datetime import datetime, timezone # 导入 timezone 用于 adjust_trade_position
 
+from candle_cache import LastCandles
+from trade_state import TradeStateStore
+
 # 设置日志记录器
 logger = logging.getLogger(__name__)
 # logging.basicConfig(level=logging.INFO)
 
+@dataclass
+class StackState:
+    stack_count: int = 0
+    partial_exit_rsi70_done: bool = False
+
+
 class SmaRsiStackPartialStrategyPlot(IStrategy): # 类名稍作修改
     """
     策略逻辑 (带绘图):
@@ -111,6 +121,15 @@ class SmaRsiStackPartialStrategyPlot(IStrategy): # 类名稍作修改
         ] = (1, 'RSI_90_Full_Exit')
         return dataframe
 
+    def bot_start(self, **kwargs) -> None:
+        # last candle for adjust_trade_position, rebuilt once per candle
+        self.candles = LastCandles(self, depth=1, columns=("rsi", "signal_entry_stack"))
+        # 加仓次数 / 部分退出标记保存在内存中，每轮循环开始时批量写入数据库
+        self.trade_state = TradeStateStore(StackState)
+
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        self.trade_state.flush()
+
     # --- 自定义初始金额 (可选) ---
     def custom_stake_amount(self, pair: str, current_time: datetime, current_rate: float,
                             proposed_stake: float, min_stake: Optional[float], max_stake: float,
@@ -127,16 +146,16 @@ class SmaRsiStackPartialStrategyPlot(IStrategy): # 类名稍作修改
                               **kwargs) -> Optional[float]:
         logger.info(f"'{trade.pair}': Adjusting trade position.")
         # (这里的代码与上一个版本完全相同，处理加仓和 RSI>70 部分退出逻辑)
-        dataframe, _ = self.dp.get_analyzed_dataframe(trade.pair, self.ticker_interval)
-        if dataframe.empty:
+        latest_candle = self.candles.last(trade.pair, self.ticker_interval)
+        if latest_candle is None:
             logger.warning(f"'{trade.pair}': Analyzed dataframe empty in adjust_trade_position.") # 日志可能过多
             return None
-        latest_candle = dataframe.iloc[-1].squeeze()
         current_rsi = latest_candle['rsi']
 
         # --- 1. 检查部分退出 (RSI > 70) ---
         try:
-            partial_exit_done_flag = trade.custom_info.get('partial_exit_rsi70_done', False)
+            state = self.trade_state.get(trade)
+            partial_exit_done_flag = state.partial_exit_rsi70_done
 
             if current_rsi > self.rsi_partial_exit_level and not partial_exit_done_flag:
                 amount_to_sell = trade.amount * self.partial_exit_pct
@@ -145,13 +164,11 @@ class SmaRsiStackPartialStrategyPlot(IStrategy): # 类名稍作修改
                     logger.warning(f"'{trade.pair}': RSI > 70 Partial exit value below min_stake. Skipping.")
                     return None
                 logger.info(f"'{trade.pair}': RSI > {self.rsi_partial_exit_level}. Partial exit: selling {self.partial_exit_pct:.0%}.")
-                trade.custom_info['partial_exit_rsi70_done'] = True
-                trade.update(trade.custom_info)
+                self.trade_state.update(trade, partial_exit_rsi70_done=True)
                 return -stake_amount_to_sell_value
             elif current_rsi < self.rsi_partial_exit_level and partial_exit_done_flag:
                 logger.info(f"'{trade.pair}': RSI fell below {self.rsi_partial_exit_level}. Resetting partial exit flag.")
-                trade.custom_info['partial_exit_rsi70_done'] = False
-                trade.update(trade.custom_info)
+                self.trade_state.update(trade, partial_exit_rsi70_done=False)
         except Exception as e:
             logger.error(f"'{trade.pair}': Error during RSI partial exit logic: {e}")
             return None
@@ -168,8 +185,7 @@ class SmaRsiStackPartialStrategyPlot(IStrategy): # 类名稍作修改
                      logger.warning(f"'{trade.pair}': Stacking stake below min_stake. Skipping.")
                      return None
                 logger.info(f"'{trade.pair}': SMA Cross signal. Stacking (adding stake): {stake_to_add:.4f}")
-                trade.custom_info['stack_count'] = trade.custom_info.get('stack_count', 0) + 1
-                trade.update(trade.custom_info)
+                self.trade_state.update(trade, stack_count=self.trade_state.get(trade).stack_count + 1)
                 return stake_to_add
         except Exception as e:
             logger.error(f"'{trade.pair}': Error during stacking logic: {e}")
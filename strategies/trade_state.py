@@ -0,0 +1,125 @@
+"""
+Per-trade strategy state in memory, written to the database once per bot loop.
+
+Keeping counters and timestamps in trade custom data means a json round trip
+(and in live a commit per key) on every adjust_trade_position call - and in a
+backtest a scan over all custom data entries per lookup. TradeStateStore keeps
+one dataclass instance per trade with native types (datetime stays a datetime):
+
+    @dataclass
+    class DCAState:
+        dca_count: int = 0
+        last_dca_time: datetime | None = None
+
+    def bot_start(self, **kwargs):
+        self.trade_state = TradeStateStore(DCAState)
+
+    def bot_loop_start(self, current_time, **kwargs):
+        self.trade_state.flush()
+
+    def adjust_trade_position(self, trade, current_time, ...):
+        state = self.trade_state.get(trade)
+        ...
+        self.trade_state.update(trade, dca_count=state.dca_count + 1, last_dca_time=current_time)
+
+In live / dry-run, changed states are written as one custom data entry per
+trade (key "trade_state"), all in one commit at the start of the next loop.
+After a restart a state is read back from there on its first `get`.
+Backtests never touch the database: states only live in memory. Closed
+trades' states are dropped by flush() (after their last write).
+"""
+import dataclasses
+import json
+import typing
+from datetime import datetime
+
+
+class TradeStateStore:
+    def __init__(self, state_type, key="trade_state"):
+        self.state_type = state_type
+        self.key = key
+        self._states = {}
+        self._trades = {}
+        self._dirty = {}
+        # `datetime` and `datetime | None` fields go to the database as iso strings
+        hints = typing.get_type_hints(state_type)
+        self._datetime_fields = [name for name, hint in hints.items()
+                                 if hint is datetime or datetime in typing.get_args(hint)]
+        self._use_db = None
+
+    def _persistent(self):
+        if self._use_db is None:
+            from freqtrade.persistence.custom_data import CustomDataWrapper
+            self._use_db = CustomDataWrapper.use_db
+        return self._use_db
+
+    def get(self, trade):
+        """State of `trade` - restored from the database on first access in live, else fresh."""
+        state = self._states.get(trade.id)
+        if state is None:
+            state = self._restore(trade) if self._persistent() else None
+            state = state or self.state_type()
+            self._states[trade.id] = state
+            self._trades[trade.id] = trade
+        return state
+
+    def update(self, trade, **changes):
+        """Change fields of a trade's state, persisted with the next flush()."""
+        state = self.get(trade)
+        for name, value in changes.items():
+            setattr(state, name, value)
+        self._dirty[trade.id] = trade
+        return state
+
+    def forget(self, trade):
+        """Drop a (closed) trade's state from memory."""
+        self._states.pop(trade.id, None)
+        self._trades.pop(trade.id, None)
+        self._dirty.pop(trade.id, None)
+
+    def flush(self):
+        """
+        Write every changed state in one commit (no-op in backtests), then forget closed trades.
+        :return: number written
+        """
+        dirty, self._dirty = self._dirty, {}
+        written = self._write(dirty) if dirty and self._persistent() else 0
+        for trade in [t for t in self._trades.values() if not t.is_open]:
+            self.forget(trade)
+        return written
+
+    def _write(self, dirty):
+        from freqtrade.persistence.custom_data import _CustomData
+        from freqtrade.util import dt_now
+
+        session = _CustomData.session
+        for trade_id, trade in dirty.items():
+            value = json.dumps(self._encode(self._states[trade_id]))
+            entry = trade.get_custom_data_entry(self.key)
+            if entry is None:
+                entry = _CustomData(ft_trade_id=trade_id, cd_key=self.key, cd_type="dict", cd_value=value,
+                                    created_at=dt_now())
+            else:
+                entry.cd_value = value
+                entry.updated_at = dt_now()
+            session.add(entry)
+        session.commit()
+        return len(dirty)
+
+    def _encode(self, state):
+        data = dataclasses.asdict(state)
+        for name in self._datetime_fields:
+            if data[name] is not None:
+                data[name] = data[name].isoformat()
+        return data
+
+    def _restore(self, trade):
+        data = trade.get_custom_data(self.key)
+        if not isinstance(data, dict):
+            return None
+        known = {f.name for f in dataclasses.fields(self.state_type)}
+        data = {k: v for k, v in data.items() if k in known}
+        for name in self._datetime_fields:
+            if data.get(name) is not None:
+                data[name] = datetime.fromisoformat(data[name])
+        return self.state_type(**data)
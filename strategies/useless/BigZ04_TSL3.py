@@ -7,6 +7,11 @@ from pandas import DataFrame
 from datetime import datetime, timedelta
 from freqtrade.strategy import merge_informative_pair, CategoricalParameter, DecimalParameter, IntParameter, stoploss_from_open
 from functools import reduce
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from vector_stoploss import PathStoploss, piecewise_stop, stoploss_from_open as stoploss_from_open_array
 
 
 ###########################################################################################################
@@ -81,6 +86,8 @@ class BigZ04_TSL3(IStrategy):
 
     # Custom stoploss
     use_custom_stoploss = True
+    # indicator columns custom_stoploss_vector (the array version of custom_stoploss) reads
+    stoploss_columns = []
 
     # Run "populate_indicators()" only for new candle.
     process_only_new_candles = True
@@ -201,9 +208,21 @@ class BigZ04_TSL3(IStrategy):
         return False
 
 
+    def bot_start(self, **kwargs) -> None:
+        # backtesting: stops of a trade computed in blocks from custom_stoploss_vector
+        self.path_stoploss = PathStoploss(self)
+
     # new custom stoploss, both hard and trailing functions. Trailing stoploss first rises at a slower
     # rate than the current rate until a profit threshold is reached, after which it rises at a constant
     # percentage as per a normal trailing stoploss. This allows more margin for pull-backs during a rise.
+    def custom_stoploss_vector(self, profit, elapsed, columns):
+        # For profits between PF_1 and PF_2 the stoploss (sl_profit) used is linearly interpolated
+        # between the values of SL_1 and SL_2. For all profits above PL_2 the sl_profit value 
+        # rises linearly with current profit, for profits below PF_1 the hard stoploss profit is used.
+        sl_profit = piecewise_stop(profit, self.pHSL.value, self.pPF_1.value, self.pSL_1.value,
+                                   self.pPF_2.value, self.pSL_2.value)
+        return stoploss_from_open_array(sl_profit, profit)
+
     def custom_stoploss(self, pair: str, trade: 'Trade', current_time: datetime,
                         current_rate: float, current_profit: float, **kwargs) -> float:
 
@@ -13,6 +13,11 @@ import talib.abstract as ta
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 from datetime import datetime
 from freqtrade.persistence import Trade
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from series_store import SeriesStore
 
 
 class CustomStoplossWithPSAR(IStrategy):
@@ -26,24 +31,21 @@ class CustomStoplossWithPSAR(IStrategy):
     INTERFACE_VERSION: int = 3
     timeframe = '1h'
     stoploss = -0.2
-    custom_info = {}
     use_custom_stoploss = True
 
+    def bot_start(self, **kwargs) -> None:
+        # sar by candle date, filled in populate_indicators (backtest / hyperopt only, as before)
+        self.series = SeriesStore(self.timeframe, live=self.dp.runmode.value in ('live', 'dry_run'))
+
     def custom_stoploss(self, pair: str, trade: 'Trade', current_time: datetime,
                         current_rate: float, current_profit: float, **kwargs) -> float:
 
         result = 1
-        if self.custom_info and pair in self.custom_info and trade:
-            # using current_time directly (like below) will only work in backtesting/hyperopt.
-            # in live / dry-run, it'll be really the current time
-            relative_sl = None
-            if self.dp:
-                # so we need to get analyzed_dataframe from dp
-                dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-                # only use .iat[-1] in callback methods, never in "populate_*" methods.
-                # see: https://www.freqtrade.io/en/latest/strategy-customization/#common-mistakes-when-developing-strategies
-                last_candle = dataframe.iloc[-1].squeeze()
-                relative_sl = last_candle['sar']
+        if pair in self.series and trade:
+            # the candle the analyzed dataframe ends with at current_time (dataframe.iloc[-1]).
+            # never look at candles after it, see:
+            # https://www.freqtrade.io/en/latest/strategy-customization/#common-mistakes-when-developing-strategies
+            relative_sl = self.series.closed(pair, 'sar', current_time)
 
             if (relative_sl is not None):
                 # print("custom_stoploss().relative_sl: {}".format(relative_sl))
@@ -58,7 +60,7 @@ class CustomStoplossWithPSAR(IStrategy):
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         dataframe['sar'] = ta.SAR(dataframe)
         if self.dp.runmode.value in ('backtest', 'hyperopt'):
-            self.custom_info[metadata['pair']] = dataframe[['date', 'sar']].copy().set_index('date')
+            self.series.register(metadata['pair'], dataframe, ['sar'])
 
         # all "normal" indicators:
         # e.g.
@@ -13,6 +13,11 @@ import talib.abstract as ta
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 from datetime import datetime
 from freqtrade.persistence import Trade
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from series_store import SeriesStore
 
 import logging
 logger = logging.getLogger(__name__)
@@ -37,6 +42,10 @@ class FixedRiskRewardLoss(IStrategy):
     use_custom_stoploss = True
     stoploss = -0.9
 
+    def bot_start(self, **kwargs) -> None:
+        # stoploss_rate by candle date, filled in populate_indicators
+        self.series = SeriesStore(self.timeframe)
+
     def custom_stoploss(self, pair: str, trade: 'Trade', current_time: datetime,
                         current_rate: float, current_profit: float, **kwargs) -> float:
 
@@ -44,20 +53,15 @@ class FixedRiskRewardLoss(IStrategy):
             custom_stoploss using a risk/reward ratio
         """
         result = break_even_sl = takeprofit_sl = -1
-        custom_info_pair = self.custom_info.get(pair)
-        if custom_info_pair is not None:
-            # using current_time/open_date directly via custom_info_pair[trade.open_daten]
-            # would only work in backtesting/hyperopt.
-            # in live/dry-run, we have to search for nearest row before it
-            open_date_mask = custom_info_pair.index.unique().get_loc(trade.open_date_utc, method='ffill')
-            open_df = custom_info_pair.iloc[open_date_mask]
+        if pair in self.series:
+            # candle at or before open_date - open_date is a candle date in backtesting/hyperopt
+            # but not in live/dry-run
+            initial_sl_abs = self.series.at(pair, 'stoploss_rate', trade.open_date_utc)
 
             # trade might be open too long for us to find opening candle
-            if(len(open_df) != 1):
+            if initial_sl_abs is None:
                 return -1 # won't update current stoploss
 
-            initial_sl_abs = open_df['stoploss_rate']
-
             # calculate initial stoploss at open_date
             initial_sl = initial_sl_abs/current_rate-1
 
@@ -90,7 +94,7 @@ class FixedRiskRewardLoss(IStrategy):
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         dataframe['atr'] = ta.ATR(dataframe)
         dataframe['stoploss_rate'] = dataframe['close']-(dataframe['atr']*2)
-        self.custom_info[metadata['pair']] = dataframe[['date', 'stoploss_rate']].copy().set_index('date')
+        self.series.register(metadata['pair'], dataframe, ['stoploss_rate'])
 
         # all "normal" indicators:
         # e.g.
@@ -18,12 +18,16 @@ import numpy as np
 # Add your lib to import here
 # import talib.abstract as ta
 import pandas as pd
+import sys
+from pathlib import Path
 from freqtrade.strategy import IStrategy
-from numpy.lib import math
 from pandas import DataFrame
-# import talib.abstract as ta
-from ta import add_all_ta_features
-from ta.utils import dropna
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from lazy_import import lazy
+
+# `ta` imports all of its indicator modules, load it when the indicators are computed
+ta = lazy("ta")
 
 # --------------------------------
 
@@ -87,8 +91,8 @@ class GodStra(IStrategy):
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         # Add all ta features
-        dataframe = dropna(dataframe)
-        dataframe = add_all_ta_features(
+        dataframe = ta.utils.dropna(dataframe)
+        dataframe = ta.add_all_ta_features(
             dataframe, open="open", high="high", low="low", close="close", volume="volume",
             fillna=True)
         # dataframe.to_csv("df.csv", index=True)
@@ -8,6 +8,11 @@ from pandas import DataFrame
 
 import talib.abstract as ta
 import freqtrade.vendor.qtpylib.indicators as qtpylib
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # shared helpers live in strategies/
+from candle_cache import LastCandles
 
 
 class Strategy001_custom_exit(IStrategy):
@@ -124,16 +129,19 @@ class Strategy001_custom_exit(IStrategy):
             'exit_long'] = 1
         return dataframe
 
+    def bot_start(self, **kwargs) -> None:
+        # last candle for custom_exit, rebuilt once per candle
+        self.candles = LastCandles(self, depth=1, columns=("rsi",))
+
     def custom_exit(self, pair: str, trade: 'Trade', current_time: 'datetime', current_rate: float, current_profit: float, **kwargs):
         """
         Sell only when matching some criteria other than those used to generate the sell signal
         :return: str sell_reason, if any, otherwise None
         """
-        # get dataframe
-        dataframe, _ = self.dp.get_analyzed_dataframe(pair=pair, timeframe=self.timeframe)
-
         # get the current candle
-        current_candle = dataframe.iloc[-1].squeeze()
+        current_candle = self.candles.last(pair)
+        if current_candle is None:
+            return None
 
         # if RSI greater than 70 and profit is positive, then sell
         if (current_candle['rsi'] > 70) and (current_profit > 0):
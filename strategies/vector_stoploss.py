@@ -0,0 +1,335 @@
+"""
+custom_stoploss as an array function, so whole trade paths are evaluated at once.
+
+freqtrade's backtesting calls custom_stoploss once per open trade and candle,
+each call going through the strategy wrapper, a fee-exact profit and a
+precision rounded stop. A stoploss that only depends on the trade's profit,
+its age and indicator columns (the BigZ04_TSL piecewise trailing stop) can
+also be written for arrays:
+
+    from vector_stoploss import PathStoploss, piecewise_stop, stoploss_from_open as stoploss_from_open_array
+
+    stoploss_columns = []          # indicator columns the function reads
+
+    def bot_start(self, **kwargs):
+        PathStoploss(self)         # backtesting only, a no-op otherwise
+
+    def custom_stoploss_vector(self, profit, elapsed, columns):
+        # profit: ratio at the candle high, elapsed: candles since entry,
+        # columns: {name: array} of the candle dataframe.iloc[-1] would be
+        return stoploss_from_open_array(piecewise_stop(profit, -0.08, 0.016, 0.011, 0.08, 0.04), profit)
+
+custom_stoploss stays the plain float version for dry / live; both have to
+be the same function (script/stoploss_check.py compares them).
+
+stoploss_exits(strategy, dataframe, entries) runs the array function over all
+candles of all trades in (trades x candles) blocks and returns where each
+trade is stopped out - the stop freqtrade's backtesting would have, step for
+step: the stop follows the candle high and only moves up, it is checked
+against the low of the same candle, stop exits gapping below the open close
+at the open and a trailing exit in the entry candle uses the worst case rate.
+Long spot trades; ROI and exit signals are left to the caller.
+
+PathStoploss is that inside a backtest: it takes over the strategy's
+ft_stoploss_reached, computes a trade's stops for the next candles in one
+block the first time the trade is checked and afterwards only hands them to
+the trade candle by candle. Runs it can't reproduce exactly (shorts,
+leverage, futures, position adjustment, trailing_stop, timeframe_detail,
+hyperopt) and stops changed from elsewhere go through freqtrade's code.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from freqtrade.enums import ExitCheckTuple, ExitType, RunMode
+
+CHUNK = 256
+# candles a backtest trade's stops are computed ahead (most trades close before)
+PATH_CHUNK = 64
+
+# ccxt precision modes
+DECIMAL_PLACES = 2
+TICK_SIZE = 4
+
+
+def stoploss_from_open(open_relative_stop, current_profit):
+    """freqtrade's stoploss_from_open (long, no leverage) for arrays."""
+    open_relative_stop = np.asarray(open_relative_stop, dtype=float)
+    current_profit = np.asarray(current_profit, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stoploss = np.maximum(1 - ((1 + open_relative_stop) / (1 + current_profit)), 0.0)
+    # formula is undefined for current_profit -1, freqtrade returns the maximum value
+    return np.where(current_profit == -1, 1.0, stoploss)
+
+
+def piecewise_stop(profit, hsl, pf_1, sl_1, pf_2, sl_2):
+    """
+    Stop relative to the open price: `hsl` up to a profit of `pf_1`, from there linearly
+    interpolated between `sl_1` and `sl_2`, above `pf_2` it trails the profit at `sl_2`.
+    """
+    profit = np.asarray(profit, dtype=float)
+    interpolated = sl_1 + ((profit - pf_1) * (sl_2 - sl_1) / (pf_2 - pf_1))
+    trailing = sl_2 + (profit - pf_2)
+    return np.where(profit > pf_2, trailing, np.where(profit > pf_1, interpolated, hsl))
+
+
+def _decimals(tick):
+    return max(-Decimal(str(tick)).as_tuple().exponent, 0)
+
+
+def _round_up(price, price_precision, precision_mode):
+    """freqtrade's price_to_precision(..., rounding_mode=ROUND_UP) for arrays."""
+    if price_precision is None or precision_mode is None:
+        return price
+    if precision_mode == DECIMAL_PLACES:
+        ndigits = round(price_precision)
+        return np.ceil(price * (10**ndigits)) / (10**ndigits)
+    if precision_mode != TICK_SIZE:
+        raise ValueError(f"Unsupported precision mode {precision_mode}")
+    # freqtrade rounds the decimal repr of the price up to the next tick: take the
+    # smallest grid value (as float of its decimal) that is not below the price
+    decimals = _decimals(price_precision)
+    below = np.floor(price / price_precision) - 1
+    out = np.full(price.shape, np.nan)
+    for step in (3, 2, 1, 0):
+        grid = np.round((below + step) * price_precision, decimals)
+        out = np.where(grid >= price, grid, out)
+    return np.where(np.isnan(price), price, out)
+
+
+def _profit(rate, open_rate, fee_open, fee_close):
+    """Trade.calc_profit_ratio of a long spot trade."""
+    open_value = open_rate + open_rate * fee_open
+    close_value = rate - rate * fee_close
+    return np.round(close_value / open_value - 1, 8)
+
+
+def _candles(dataframe, columns):
+    return {"open": dataframe["open"].to_numpy(dtype=float), "high": dataframe["high"].to_numpy(dtype=float),
+            "low": dataframe["low"].to_numpy(dtype=float), "columns": {c: dataframe[c].to_numpy() for c in columns}}
+
+
+def _block(strategy, candles, rows, elapsed, open_rates, stops, fee_open, fee_close, price_precision, precision_mode):
+    """
+    One (trades x candles) block of stops, trades carrying in their current stop.
+    :return: stop before / after each candle, the stoploss of each candle's candidate, lows, hits
+    """
+    n = len(candles["high"])
+    active = rows < n
+    rows = np.minimum(rows, n - 1)
+    high, low = candles["high"][rows], candles["low"][rows]
+    profit = _profit(high, open_rates[:, None], fee_open, fee_close)
+    # backtesting's analyzed dataframe ends with the candle being checked
+    columns = {c: values[rows] for c, values in candles["columns"].items()}
+    pct = np.asarray(strategy.custom_stoploss_vector(profit, elapsed, columns), dtype=float)
+    pct = np.broadcast_to(pct, rows.shape)
+    # freqtrade ignores 0 / nan / inf from custom_stoploss
+    valid = (pct != 0) & np.isfinite(pct)
+    candidate = _round_up(high * (1 - np.abs(np.where(valid, pct, 0.0))), price_precision, precision_mode)
+    candidate = np.where(valid & active, candidate, -np.inf)
+    # stops only walk up; a stop already at or above the low exits before it's adjusted
+    run = np.maximum.accumulate(np.concatenate([stops[:, None], candidate], axis=1), axis=1)
+    before, after = run[:, :-1], run[:, 1:]
+    hit = (after >= low) & active
+    return before, after, np.where(valid, pct, np.nan), low, hit, active
+
+
+def stoploss_exits(strategy, dataframe, entries, open_rates=None, fee=0.0, fee_close=None,
+                   price_precision=None, precision_mode=None, chunk=CHUNK):
+    """
+    Stoploss exit of every trade, all trades and candles evaluated as arrays.
+    :param entries: row of `dataframe` each trade is opened in (it's checked from that candle on)
+    :param open_rates: entry rates, default the open of the entry candle
+    :param price_precision, precision_mode: the market's, stops are rounded up like freqtrade does
+    :return: DataFrame per trade - entry, exit (row, -1 if the stop isn't hit), candles,
+             stop_loss, close_rate, exit_type ('stop_loss' / 'trailing_stop_loss', None)
+    """
+    if strategy.trailing_stop:
+        raise ValueError("stoploss_exits covers custom_stoploss only, not trailing_stop")
+    fee_close = fee if fee_close is None else fee_close
+    entries = np.asarray(entries, dtype=np.int64)
+    candles = _candles(dataframe, getattr(strategy, "stoploss_columns", []))
+    opens, highs, lows = candles["open"], candles["high"], candles["low"]
+    n, k = len(dataframe), len(entries)
+    open_rates = opens[entries] if open_rates is None else np.asarray(open_rates, dtype=float)
+
+    initial = _round_up(open_rates * (1 - abs(strategy.stoploss)), price_precision, precision_mode)
+    stop = initial.copy()
+    exit_row = np.full(k, -1, dtype=np.int64)
+    stop_loss = np.full(k, np.nan)
+    first_pct = np.full(k, np.nan)  # stoploss set in the entry candle, for the worst case rate
+
+    pending = np.arange(k)
+    offset = 0
+    while len(pending) and offset < n:
+        rows = entries[pending, None] + offset + np.arange(chunk)
+        elapsed = np.broadcast_to(offset + np.arange(chunk), rows.shape)
+        before, after, pct, low, hit, _ = _block(strategy, candles, rows, elapsed, open_rates[pending], stop[pending],
+                                                 fee, fee_close, price_precision, precision_mode)
+        if offset == 0:
+            first_pct[pending] = pct[:, 0]
+
+        hit_any = hit.any(axis=1)
+        col = hit.argmax(axis=1)
+        trades, col = pending[hit_any], col[hit_any]
+        at = np.flatnonzero(hit_any)
+        exit_row[trades] = rows[at, col]
+        stop_loss[trades] = np.where(before[at, col] >= low[at, col], before[at, col], after[at, col])
+
+        stop[pending] = after[:, -1]
+        pending = pending[~hit_any]
+        pending = pending[entries[pending] + offset + chunk < n]
+        offset += chunk
+
+    hit = exit_row >= 0
+    trailing = hit & (stop_loss > initial)
+    close_rate = stop_loss.copy()
+    # the stop was above the candle already: exit at the open
+    gap = hit & (stop_loss > highs[np.maximum(exit_row, 0)])
+    close_rate[gap] = opens[exit_row[gap]]
+    # trailing stop hit in the entry candle: price ticked just above the open and fell to the stop
+    same = hit & ~gap & trailing & (exit_row == entries)
+    worst = opens[exit_row[same]] * (1 - np.abs(first_pct[same]))
+    close_rate[same] = np.maximum(lows[exit_row[same]], worst)
+
+    return pd.DataFrame({
+        "entry": entries,
+        "exit": exit_row,
+        "candles": np.where(hit, exit_row - entries, -1),
+        "stop_loss": stop_loss,
+        "close_rate": np.where(hit, close_rate, np.nan),
+        "exit_type": np.where(trailing, "trailing_stop_loss", np.where(hit, "stop_loss", None)),
+    })
+
+
+class _Path:
+    """Stops of one backtest trade from its first checked candle on, computed a block at a time."""
+    __slots__ = ("trade", "candles", "entry", "start", "stops", "pcts", "exit", "last", "last_stop")
+
+    def __init__(self, trade, candles, entry, start):
+        self.trade, self.candles, self.entry, self.start = trade, candles, entry, start
+        self.stops, self.pcts = np.empty(0), np.empty(0)
+        self.exit = None
+        self.last, self.last_stop = start - 1, trade.stop_loss
+
+    def follows(self, trade, row):
+        # a skipped candle or a stop set by freqtrade itself (order fill, ...) -> start over
+        return self.trade is trade and row == self.last + 1 and trade.stop_loss == self.last_stop
+
+    def extend(self, strategy, row, chunk):
+        trade = self.trade
+        while self.exit is None and self.start + len(self.stops) <= row:
+            first = self.start + len(self.stops)
+            rows = (first + np.arange(chunk))[None, :]
+            carry = np.array([self.stops[-1] if len(self.stops) else trade.stop_loss])
+            before, after, pct, low, hit, active = _block(
+                strategy, self.candles, rows, rows - self.entry, np.array([trade.open_rate]), carry,
+                trade.fee_open, trade.fee_close, trade.price_precision, trade.precision_mode_price)
+            # the stop each candle leaves the trade with; the candle that hits keeps the old one if that's hit
+            stops = np.where(before >= low, before, after)[0]
+            end = int(hit[0].argmax()) + 1 if hit[0].any() else int(active[0].sum())
+            if hit[0].any():
+                self.exit = first + end - 1
+            self.stops = np.concatenate([self.stops, stops[:end]])
+            self.pcts = np.concatenate([self.pcts, -np.abs(pct[0, :end])])
+            if end == 0:
+                break
+
+    def step(self, row):
+        """Apply candle `row` to the trade as freqtrade's adjust_stop_loss would."""
+        trade, k = self.trade, row - self.start
+        stop = self.stops[k]
+        if stop > trade.stop_loss:
+            trade.stop_loss = float(stop)
+            trade.stop_loss_pct = float(self.pcts[k])
+            trade.is_stop_loss_trailing = True
+        self.last, self.last_stop = row, trade.stop_loss
+        if row == self.exit:
+            return ExitCheckTuple(exit_type=ExitType.TRAILING_STOP_LOSS if trade.is_stop_loss_trailing
+                                  else ExitType.STOP_LOSS)
+        return ExitCheckTuple(exit_type=ExitType.NONE)
+
+
+class PathStoploss:
+    """
+    Backtesting: a trade's stops from custom_stoploss_vector, a block of candles at a time.
+    Installs itself on `strategy` (ft_advise_signals to keep each pair's candles,
+    ft_stoploss_reached to serve the stops, order_filled to forget closed trades)
+    if the run is one it reproduces exactly.
+    """
+
+    def __init__(self, strategy, chunk=PATH_CHUNK):
+        self.strategy = strategy
+        self.chunk = chunk
+        self._frames = {}
+        self._paths = {}
+        self.active = self.supported(strategy)
+        if self.active:
+            self._advise_signals = strategy.ft_advise_signals
+            self._stoploss_reached = strategy.ft_stoploss_reached
+            self._order_filled = strategy.order_filled
+            strategy.ft_advise_signals = self.advise_signals
+            strategy.ft_stoploss_reached = self.stoploss_reached
+            strategy.order_filled = self.order_filled
+
+    @staticmethod
+    def supported(strategy):
+        config = strategy.config
+        trading_mode = config.get("trading_mode") or "spot"
+        return (config.get("runmode") == RunMode.BACKTEST
+                and getattr(trading_mode, "value", trading_mode) == "spot"
+                and not config.get("timeframe_detail")
+                and strategy.use_custom_stoploss and hasattr(strategy, "custom_stoploss_vector")
+                and not strategy.trailing_stop and not strategy.position_adjustment_enable)
+
+    def add_frame(self, pair, dataframe):
+        """Candles the trades of `pair` are checked on (done by ft_advise_signals in a backtest)."""
+        rows = {date: i for i, date in enumerate(dataframe["date"].dt.to_pydatetime())}
+        self._frames[pair] = (rows, _candles(dataframe, getattr(self.strategy, "stoploss_columns", [])))
+        self._paths = {key: path for key, path in self._paths.items() if path.trade.pair != pair}
+
+    def advise_signals(self, dataframe, metadata):
+        dataframe = self._advise_signals(dataframe, metadata)
+        self.add_frame(metadata["pair"], dataframe)
+        return dataframe
+
+    def order_filled(self, pair, trade, order, current_time, **kwargs):
+        # the exit order closing the trade (ROI, exit signal, force exit, stop): it's not checked again
+        if order.ft_order_side == trade.exit_side and order.safe_amount == trade.amount:
+            self._paths.pop(id(trade), None)
+        return self._order_filled(pair=pair, trade=trade, order=order, current_time=current_time, **kwargs)
+
+    def stoploss_reached(self, current_rate, trade, current_time, current_profit, force_stoploss,
+                         low=None, high=None, bound_profit=None):
+        path = None
+        if low is not None and high is not None and not force_stoploss:
+            path = self._path(trade, current_time)
+        if path is None:
+            return self._stoploss_reached(current_rate=current_rate, trade=trade, current_time=current_time,
+                                          current_profit=current_profit, force_stoploss=force_stoploss,
+                                          low=low, high=high, bound_profit=bound_profit)
+        exit_ = path.step(self._frames[trade.pair][0][current_time])
+        if exit_.exit_type != ExitType.NONE:
+            del self._paths[id(trade)]
+        return exit_
+
+    def _path(self, trade, current_time):
+        frame = self._frames.get(trade.pair)
+        if frame is None or trade.is_short or (trade.leverage or 1.0) != 1.0 or not trade.stop_loss:
+            return None
+        rows, candles = frame
+        row = rows.get(current_time)
+        if row is None:
+            return None
+        path = self._paths.get(id(trade))
+        if path is None or not path.follows(trade, row):
+            entry = rows.get(trade.open_date_utc)
+            if entry is None or entry > row:
+                return None
+            path = self._paths[id(trade)] = _Path(trade, candles, entry, row)
+        path.extend(self.strategy, row, self.chunk)
+        if path.start + len(path.stops) <= row:
+            return None
+        return path